@@ -0,0 +1,44 @@
+"""Extraction throughput with the thread pool and with 1..N worker processes.
+
+Run from the repository root:
+    python -m benchmarks.bench_extract_scaling --pages 400 --cards 12
+"""
+import os
+import time
+import argparse
+import tempfile
+from pathlib import Path
+from benchmarks.synthetic_pages import write_corpus
+from extract_parking_data import iter_records
+from core.parsers import DEFAULT_BACKEND
+
+def run(html_files, backend, processes):
+    start = time.perf_counter()
+    count = sum(1 for _ in iter_records(html_files, [], backend, processes))
+    return time.perf_counter() - start, count
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=400)
+    parser.add_argument("--cards", type=int, default=12)
+    parser.add_argument("--max-processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--parser", default=DEFAULT_BACKEND)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as folder:
+        write_corpus(folder, args.pages, args.cards)
+        html_files = sorted(Path(folder).glob("*.html"))
+
+        print(f"{args.pages} pages × {args.cards} cards, parser={args.parser}")
+        print(f"{'mode':<14}{'seconds':>10}{'pages/s':>10}{'records':>10}{'speedup':>10}")
+        baseline, count = run(html_files, args.parser, 0)
+        print(f"{'threads':<14}{baseline:>10.2f}{args.pages / baseline:>10.1f}{count:>10}{1:>10.2f}")
+
+        counts = sorted({1, 2, 4, 8, 16, args.max_processes} & set(range(1, args.max_processes + 1)))
+        for processes in counts:
+            elapsed, count = run(html_files, args.parser, processes)
+            print(f"{f'{processes} processes':<14}{elapsed:>10.2f}{args.pages / elapsed:>10.1f}{count:>10}"
+                  f"{baseline / elapsed:>10.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""Offline benchmark suite: parse throughput, peak memory and end-to-end scraping.
+
+Run from the repository root:
+    python -m benchmarks.bench_suite                      # fixtures if recorded, else synthetic pages
+    python -m benchmarks.bench_suite --save before.json
+    python -m benchmarks.bench_suite --compare before.json
+
+Benchmarks:
+  extract_<parser>   extract_parking_data.extract_parking_data on every page
+  text_out           text_out.process_html_file on every page
+  main_http          main.main --no-browser against a local stand-in for the site,
+                     followed by extract_parking_data on the saved pages
+"""
+import os
+import io
+import gc
+import sys
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+import contextlib
+from pathlib import Path
+from benchmarks.synthetic_pages import write_corpus
+from benchmarks.fixtures import fixture_files, unpack_fixtures, FIXTURE_FOLDER
+from benchmarks.local_site import LocalSite
+from core.parsers import BACKENDS
+import extract_parking_data
+import text_out
+import main as scraper
+
+REGRESSION_THRESHOLD = 0.10   # --compare flags throughput drops larger than this
+
+def measure(fn, memory=True):
+    """Run fn() once for timing and, with memory=True, once more under tracemalloc.
+    Returns (seconds, result, peak MB). The peak covers the Python heap only;
+    what lxml allocates in C is not traced (see the max RSS line at the end)."""
+    gc.collect()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    peak = 0.0
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        fn()
+        peak = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+    return elapsed, result, peak
+
+def bench_extract(html_files, backend):
+    def run():
+        return sum(len(extract_parking_data.extract_parking_data(str(path), "https://dummy-link/" + path.name, backend))
+                   for path in html_files)
+    return measure(run)
+
+def bench_text_out(html_files):
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return sum(len(text_out.process_html_file(str(path), path.name)) for path in html_files)
+    return measure(run)
+
+def bench_main_http(workdir, airports, cards, start_days, durations):
+    """Scrape airports × start_days × durations combos from the local site, then extract them."""
+    os.makedirs(os.path.join(workdir, "core"), exist_ok=True)
+    os.makedirs(os.path.join(workdir, "json_out"), exist_ok=True)
+    with LocalSite(cards=cards) as site:
+        with open(os.path.join(workdir, "core", "airports.txt"), "w", encoding="utf-8") as f:
+            for airport in airports:
+                f.write(site.airport_url(airport) + "\n")
+        with open(os.path.join(workdir, "included_airports.yaml"), "w", encoding="utf-8") as f:
+            f.write(f"date_grids:\n  default:\n    start_days: {start_days}\n    durations: {durations}\n")
+
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                scraper.main(scraper.parse_args(["--no-browser", "--full-grid"]))
+                scrape_seconds = time.perf_counter() - start
+                extract_parking_data.main(["--no-archive", "--no-cache"])
+                total_seconds = time.perf_counter() - start
+            pages = len(list(Path("saved_pages").glob("*.html")))
+            with open(os.path.join("json_out", "parking_data.json"), "r", encoding="utf-8") as f:
+                records = sum(len(v) for v in json.load(f).values())
+        finally:
+            os.chdir(cwd)
+        return scrape_seconds, total_seconds, pages, records, site.requests
+
+def load_corpus(args, folder):
+    """(page paths, description, "fixtures" or "synthetic")."""
+    if args.corpus != "synthetic" and fixture_files():
+        paths = unpack_fixtures(folder, repeat=args.repeat)
+        return [Path(p) for p in paths], f"{len(paths)} recorded fixture pages", "fixtures"
+    if args.corpus == "fixtures":
+        sys.exit(f"[✖] --corpus fixtures: no recorded pages in {FIXTURE_FOLDER}. "
+                 "Run: python -m benchmarks.fixtures record")
+    if args.corpus == "auto":
+        # Synthetic pages only approximate the site's markup; say so where the numbers are read
+        print("=" * 78)
+        print(f"[!] No recorded fixture pages in {FIXTURE_FOLDER}:")
+        print("[!] measuring SYNTHETIC pages, not the site's real markup.")
+        print("[!] Record some with: python -m benchmarks.fixtures record")
+        print("=" * 78)
+    paths = write_corpus(folder, args.pages, args.cards)
+    return [Path(p) for p in paths], f"{len(paths)} synthetic pages × {args.cards} cards", "synthetic"
+
+def compare(results, baseline_path):
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = 0
+    print(f"\nCompared with {baseline_path}:")
+    for name, result in results.items():
+        before = baseline.get(name)
+        if not before or not before.get("pages_per_s"):
+            continue
+        if before.get("corpus", result.get("corpus")) != result.get("corpus"):
+            print(f"  {name:<16}skipped: baseline measured {before['corpus']} pages, this run {result['corpus']}")
+            continue
+        change = result["pages_per_s"] / before["pages_per_s"] - 1
+        flag = "  ❌ regression" if change < -REGRESSION_THRESHOLD else ""
+        regressions += bool(flag)
+        print(f"  {name:<16}{before['pages_per_s']:>10.1f} → {result['pages_per_s']:>10.1f} pages/s ({change:+.1%}){flag}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", choices=["auto", "fixtures", "synthetic"], default="auto")
+    parser.add_argument("--pages", type=int, default=200, help="Synthetic pages")
+    parser.add_argument("--cards", type=int, default=12, help="Cards per synthetic page")
+    parser.add_argument("--repeat", type=int, default=1, help="Copies of the fixture corpus")
+    parser.add_argument("--airports", type=int, default=2, help="Airports on the local site (main_http)")
+    parser.add_argument("--start-days", type=int, default=3)
+    parser.add_argument("--durations", type=int, default=7)
+    parser.add_argument("--skip-main", action="store_true", help="Only run the parse benchmarks")
+    parser.add_argument("--save", metavar="FILE", help="Write the results as JSON")
+    parser.add_argument("--compare", metavar="FILE", help="Compare with results saved by --save")
+    args = parser.parse_args(argv)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as folder:
+        html_files, description, corpus = load_corpus(args, os.path.join(folder, "pages"))
+        print(f"Corpus: {description}")
+        print(f"{'benchmark':<16}{'seconds':>10}{'pages/s':>10}{'records/s':>12}{'peak MB':>10}")
+
+        runs = [(f"extract_{backend}", lambda backend=backend: bench_extract(html_files, backend)) for backend in BACKENDS]
+        runs.append(("text_out", lambda: bench_text_out(html_files)))
+        for name, run in runs:
+            elapsed, records, peak = run()
+            results[name] = {"corpus": corpus, "seconds": elapsed, "pages": len(html_files), "records": records,
+                             "pages_per_s": len(html_files) / elapsed, "records_per_s": records / elapsed,
+                             "peak_mb": peak}
+            print(f"{name:<16}{elapsed:>10.2f}{len(html_files) / elapsed:>10.1f}{records / elapsed:>12.1f}{peak:>10.1f}")
+
+        if not args.skip_main:
+            airports = ["bremen", "hannover", "leipzig", "nuernberg", "stuttgart"][:args.airports]
+            scrape_seconds, total_seconds, pages, records, requests = bench_main_http(
+                os.path.join(folder, "main"), airports, args.cards, args.start_days, args.durations)
+            results["main_http"] = {"seconds": total_seconds, "scrape_seconds": scrape_seconds, "pages": pages,
+                                    "records": records, "requests": requests,
+                                    "pages_per_s": pages / total_seconds, "records_per_s": records / total_seconds}
+            print(f"{'main_http':<16}{total_seconds:>10.2f}{pages / total_seconds:>10.1f}{records / total_seconds:>12.1f}"
+                  f"{'-':>10}   ({pages} combos, {requests} requests, scraping {scrape_seconds:.2f}s)")
+
+    try:
+        import resource
+        print(f"max RSS of the benchmark process: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+    except ImportError:  # Windows
+        pass
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"[✓] Results saved to {args.save}")
+    if args.compare:
+        return 1 if compare(results, args.compare) else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""Recorded result pages for the benchmarks.
+
+    python -m benchmarks.fixtures record [SOURCE_FOLDER] [--max-pages N]
+
+copies real pages saved by main.py (saved_pages/ or old_saved_pages/) into
+benchmarks/fixtures/ as .html.gz, keeping their file names, so the benchmarks
+run on the site's actual markup without network access.
+
+    python -m benchmarks.fixtures parity
+
+checks that every parser backend gives the same cards and records as bs4 on the
+committed pages in benchmarks/fixtures/parity/: missing prices and ratings,
+a second results page, shuttle, valet and mixed types, an empty result.
+Exits with status 1 on a mismatch.
+"""
+import os
+import sys
+import gzip
+import shutil
+import argparse
+from pathlib import Path
+
+FIXTURE_FOLDER = os.path.join(os.path.dirname(__file__), "fixtures")
+PARITY_FOLDER = os.path.join(FIXTURE_FOLDER, "parity")
+SOURCE_FOLDERS = ("saved_pages", "old_saved_pages")
+
+def fixture_files(folder=FIXTURE_FOLDER):
+    return sorted(Path(folder).glob("*.html.gz"))
+
+def record_fixtures(source, max_pages=50, folder=FIXTURE_FOLDER):
+    """Copy up to max_pages pages, spread evenly over the source, into the fixture folder."""
+    pages = sorted(Path(source).rglob("*.html"))
+    if not pages:
+        print(f"[!] No .html pages found in {source}")
+        return []
+    step = max(len(pages) // max_pages, 1)
+    os.makedirs(folder, exist_ok=True)
+    recorded = []
+    for page in pages[::step][:max_pages]:
+        target = os.path.join(folder, page.name + ".gz")
+        with open(page, "rb") as src, gzip.open(target, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        recorded.append(target)
+    print(f"[✓] Recorded {len(recorded)} fixture pages from {source} into {folder}")
+    return recorded
+
+def unpack_fixtures(target, folder=FIXTURE_FOLDER, repeat=1):
+    """Write the fixture pages as plain .html files into target (repeat times,
+    with a distinct page suffix per copy). Returns the file paths."""
+    os.makedirs(target, exist_ok=True)
+    paths = []
+    for n in range(repeat):
+        for fixture in fixture_files(folder):
+            name = fixture.name[:-len(".gz")]
+            if n:
+                name = name.replace(".html", f"_page{n + 1}.html")
+            path = os.path.join(target, name)
+            with gzip.open(fixture, "rb") as src, open(path, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            paths.append(path)
+    return paths
+
+def check_parser_parity(folder=PARITY_FOLDER):
+    """Compare every parser backend against bs4 on the parity pages. Returns the number of mismatches."""
+    from extract_parking_data import check_parity
+    from core.parsers import BACKENDS
+
+    html_files = sorted(Path(folder).glob("*.html"))
+    if not html_files:
+        print(f"[!] No parity pages in {folder}")
+        return 1
+    backends = [name for name in BACKENDS if name != "bs4"]
+    if not backends:
+        print("[!] Only bs4 is installed, nothing to compare (pip install lxml).")
+    return sum(check_parity(html_files, backend) for backend in backends)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record saved result pages as benchmark fixtures.")
+    parser.add_argument("command", choices=["record", "list", "parity"])
+    parser.add_argument("source", nargs="?", default=None, help="Folder with saved pages (default: saved_pages or old_saved_pages)")
+    parser.add_argument("--max-pages", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    if args.command == "parity":
+        sys.exit(1 if check_parser_parity() else 0)
+    if args.command == "list":
+        files = fixture_files()
+        size = sum(f.stat().st_size for f in files)
+        print(f"[⋅] {len(files)} fixture pages, {size / 1e6:.1f} MB compressed")
+        return
+
+    source = args.source or next((f for f in SOURCE_FOLDERS if os.path.isdir(f)), None)
+    if source is None:
+        print("[!] No saved pages to record. Run main.py first or pass a folder.")
+        return
+    record_fixtures(source, args.max_pages)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Offline check of core/http_fetcher.py against the local stand-in for the site.
+
+    python -m benchmarks.http_check
+
+Replays the search form for recorded and synthetic result pages and checks what
+load_parking_results_http makes of them without a browser: the pages of a
+single-page result, or the failure kind for paginated, empty, blocked and
+erroring searches. Exits with status 1 if a case fails.
+"""
+import sys
+from pathlib import Path
+from benchmarks.fixtures import PARITY_FOLDER
+from benchmarks.local_site import LocalSite
+from benchmarks.synthetic_pages import generate_page
+from core.http_fetcher import create_http_session, load_parking_results_http
+from core.failures import ScrapeFailure, BLOCKED, EMPTY, ERROR, NEEDS_BROWSER
+
+DEPARTURE, RETURN = "02/03/2026", "09/03/2026"
+
+def _recorded(name):
+    return (Path(PARITY_FOLDER) / name).read_text(encoding="utf-8")
+
+# An empty result that loads the scripts block pages are made of, without being one
+QUIET_PAGE = """<html><head><title>Parken Flughafen Leipzig</title>
+<script src="/cdn-cgi/challenge-platform/h/b/scripts/jsd/main.js"></script>
+<script src="https://www.google.com/recaptcha/api.js"></script></head>
+<body><h2>0 Parkplätze gefunden</h2><div class="g-recaptcha" data-sitekey="x"></div></body></html>"""
+CHALLENGE_PAGE = """<html><head><title>Just a moment...</title></head>
+<body><div id="cf-challenge">Checking your browser before accessing parkinglist.de</div></body></html>"""
+
+# airport -> expected outcome: number of pages, or the failure kind
+CASES = {
+    "bremen": 1,
+    "hannover": NEEDS_BROWSER,
+    "frankfurt-am-main": EMPTY,
+    "leipzig": EMPTY,
+    "nuernberg": BLOCKED,
+    "stuttgart": BLOCKED,
+    "dresden": ERROR,
+}
+
+def run_checks():
+    """Run every case. Returns the number of failed ones."""
+    pages = {
+        "bremen": _recorded("parken-flughafen-bremen_2026-03-02→2026-03-09.html"),
+        "hannover": generate_page(10, airport="hannover", has_next=True),
+        "frankfurt-am-main": _recorded("parken-flughafen-frankfurt-am-main_2026-03-02→2026-03-03.html"),
+        "leipzig": QUIET_PAGE,
+        "nuernberg": CHALLENGE_PAGE,
+    }
+    failed = 0
+    with LocalSite(pages=pages, statuses={"stuttgart": 429, "dresden": 500}) as site:
+        session = create_http_session()
+        for airport, expected in CASES.items():
+            try:
+                result = len(load_parking_results_http(site.airport_url(airport), None, DEPARTURE, RETURN,
+                                                       session=session)[0])
+            except ScrapeFailure as e:
+                result = e.kind
+            if result == expected:
+                print(f"✅ {airport}: {result}")
+            else:
+                failed += 1
+                print(f"❌ {airport}: expected {expected}, got {result}")
+
+        # The search form of an airport page is parsed once, later combos only search
+        before = site.requests
+        load_parking_results_http(site.airport_url("bremen"), None, "03/03/2026", "10/03/2026", session=session)
+        if site.requests - before != 1:
+            failed += 1
+            print(f"❌ bremen: {site.requests - before} requests for a second combo, expected 1")
+    print(f"{'❌' if failed else '✅'} {len(CASES) + 1 - failed}/{len(CASES) + 1} HTTP checks passed")
+    return failed
+
+if __name__ == "__main__":
+    sys.exit(1 if run_checks() else 0)
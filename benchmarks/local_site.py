@@ -0,0 +1,90 @@
+"""Local stand-in for parkinglist.de, serving synthetic pages over HTTP.
+
+    with LocalSite(cards=12) as site:
+        site.airport_url("bremen")   # http://127.0.0.1:<port>/flughafen-parken/parken-flughafen-bremen
+
+GET /flughafen-parken/parken-flughafen-<airport>            airport page with the search form
+GET ...?param=newSearch&startDay=..&endDay=..               one results page with `cards` cards
+
+Results of an airport in `pages` are that recorded HTML instead, and an airport in
+`statuses` answers its searches with that HTTP status (429, 403, 500, ...).
+"""
+import zlib
+import threading
+from urllib.parse import urlsplit, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from benchmarks.synthetic_pages import generate_page, generate_airport_page
+
+AIRPORT_PREFIX = "/flughafen-parken/parken-flughafen-"
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive, like the real site
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        if not parts.path.startswith(AIRPORT_PREFIX):
+            self._send(404, b"not found")
+            return
+        airport = parts.path[len(AIRPORT_PREFIX):]
+        query = parse_qs(parts.query)
+        if "param" in query and airport in self.server.statuses:
+            self.server.requests += 1
+            self._send(self.server.statuses[airport], b"error")
+            return
+        if "param" in query and airport in self.server.pages:
+            html = self.server.pages[airport]
+        elif "param" in query:
+            # Same dates always give the same page, like a cached search
+            seed = zlib.crc32(f"{airport}|{query.get('startDay')}|{query.get('endDay')}".encode("utf-8"))
+            html = generate_page(self.server.cards, seed=seed, airport=airport)
+        else:
+            html = generate_airport_page(airport)
+        self.server.requests += 1
+        self._send(200, html.encode("utf-8"))
+
+    def _send(self, status, body):
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class LocalSite:
+    def __init__(self, cards=12, host="127.0.0.1", port=0, pages=None, statuses=None):
+        self.server = ThreadingHTTPServer((host, port), _Handler)
+        self.server.daemon_threads = True
+        self.server.cards = cards
+        self.server.pages = pages or {}
+        self.server.statuses = statuses or {}
+        self.server.requests = 0
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def requests(self):
+        return self.server.requests
+
+    def airport_url(self, airport):
+        return f"{self.base_url}{AIRPORT_PREFIX}{airport}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,99 @@
+import os
+import random
+import datetime
+
+AIRPORTS = ["bremen", "hannover", "leipzig", "nuernberg", "stuttgart"]
+PROVIDERS = ["myparkpoint", "BRE", "Parkservice", "Holiday Parking", "Parkvogel", "Airparks", "ParkHere"]
+SERVICES = ["Überdacht", "Shuttle inklusive", "Schlüsselabgabe", "Videoüberwachung", "24h geöffnet", "Kostenlose Stornierung"]
+
+# Header/footer markup so a page has roughly the size and tag count of a real results page
+_FILLER = "".join(
+    f'<div class="nav-item"><a href="/flughafen-parken/link-{i}">Link {i}</a><span class="sep"> | </span></div>'
+    for i in range(300)
+)
+
+def generate_card(rng, airport, index):
+    provider = rng.choice(PROVIDERS)
+    shuttle = rng.random() < 0.7
+    valet = not shuttle or rng.random() < 0.2
+    icons = []
+    if shuttle:
+        icons.append('<p class="icon" data-bg="/images/icons/Shuttle.svg"></p>')
+    if valet:
+        icons.append('<p class="icon" data-bg="/images/icons/Valet.svg"></p>')
+    icons.append('<p class="icon" data-bg="/images/icons/Camera.svg"></p>')
+    services = "".join(f"<li>{s}</li>" for s in rng.sample(SERVICES, rng.randint(1, 4)))
+    not_available = '<div class="not_available">Ausgebucht</div>' if rng.random() < 0.1 else ""
+    kind = "Shuttle-Service" if shuttle else "Valet Service"
+    price = rng.randint(15, 160) + rng.choice([0, 0.5, 0.99])
+    return f"""
+<div class="col-12 airport_search" data-id="{index}">
+  <div class="row">
+    <div class="col-3 logoIcon"><img src="/images/provider/{index}.png" alt="Parkplatz mit {kind} am Flughafen {airport.title()} - {provider}"></div>
+    <div class="col-6">
+      <h3>Parkplatz mit {kind} - {provider}</h3>
+      <div class="iconDiv">{''.join(icons)}</div>
+      <p><strong>Adresse:</strong> <span>Flughafenallee {index}, 28199 {airport.title()}</span></p>
+      <div class="air_desript"><ul>{services}</ul></div>
+    </div>
+    <div class="col-3 price">
+      {not_available}
+      <div class="kjll">{price:.2f} €</div>
+      <a class="btn btn-primary" href="/flughafen-parkplatz/{provider.lower().replace(' ', '-')}-{10000 + index}">Jetzt buchen</a>
+    </div>
+  </div>
+</div>"""
+
+def generate_page(n_cards=10, seed=0, airport="bremen", has_next=False):
+    rng = random.Random(seed)
+    cards = "".join(generate_card(rng, airport, i) for i in range(n_cards))
+    return f"""<!DOCTYPE html>
+<html lang="de"><head><meta charset="utf-8">
+<title>Parken Flughafen {airport.title()}- Top Anbieter vergleichen!</title>
+<script>window.dataLayer = window.dataLayer || [];</script>
+<style>.airport_search {{ margin: 0; }}</style>
+</head><body>
+<header>{_FILLER}</header>
+<main>
+<h2>{n_cards} Parkplätze am Flughafen {airport.title()} gefunden</h2>
+<form id="searchForm"><input id="startDay_input" name="startDay"><input id="endDay_input" name="endDay"></form>
+{cards}
+<div class="pagination"><div class="pag_text{'' if has_next else ' disabled'}">Next</div></div>
+</main>
+<footer>{_FILLER}</footer>
+</body></html>"""
+
+def generate_airport_page(airport="bremen"):
+    """Airport landing page: the date search form, no results yet."""
+    return f"""<!DOCTYPE html>
+<html lang="de"><head><meta charset="utf-8">
+<title>Parken Flughafen {airport.title()}- Top Anbieter vergleichen!</title>
+</head><body>
+<header>{_FILLER}</header>
+<main>
+<form id="searchForm" method="get">
+  <input id="startDay_input" name="startDay" value="">
+  <input id="endDay_input" name="endDay" value="">
+  <input type="hidden" name="airport" value="{airport}">
+  <button type="submit"><span>Search</span></button>
+</form>
+</main>
+<footer>{_FILLER}</footer>
+</body></html>"""
+
+def write_corpus(folder, n_pages=100, cards_per_page=10, start=datetime.date(2025, 12, 1)):
+    """Write n_pages synthetic pages named like main.py saves them. Returns the file paths."""
+    os.makedirs(folder, exist_ok=True)
+    paths = []
+    for i in range(n_pages):
+        airport = AIRPORTS[i % len(AIRPORTS)]
+        from_date = start + datetime.timedelta(days=(i // len(AIRPORTS)) % 5)
+        to_date = from_date + datetime.timedelta(days=1 + (i // (len(AIRPORTS) * 5)) % 14)
+        page = 1 + i // (len(AIRPORTS) * 70)
+        suffix = f"_page{page}" if page > 1 else ""
+        name = f"parken-flughafen-{airport}_{from_date:%Y-%m-%d}→{to_date:%Y-%m-%d}{suffix}.html"
+        path = os.path.join(folder, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(generate_page(cards_per_page, seed=i, airport=airport))
+        paths.append(path)
+    return paths
@@ -1,10 +1,26 @@
+import os
+import sys
+import json
+import time
 import yaml
-from selenium import webdriver
+import requests
+from urllib.parse import urljoin
+from bs4 import BeautifulSoup
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
 
+try:
+    from lxml import html as lxml_html
+except ImportError:  # lxml is optional, BeautifulSoup is always available
+    lxml_html = None
+
+CATALOGUE_URL = "https://www.parkinglist.de/flughafen-parken/parken-flughafen-dresden"
+CATALOGUE_CACHE = "airport_catalogue.json"
+CATALOGUE_TTL = 7 * 24 * 3600   # Seconds before the cached airport catalogue is fetched again
+DROPDOWN_ID = "abflughafen"
+
 def load_included_airports(yaml_file="included_airports.yaml"):
     try:
         with open(yaml_file, "r", encoding="utf-8") as f:
@@ -14,37 +30,123 @@ def load_included_airports(yaml_file="included_airports.yaml"):
         print(f"[!] Error reading YAML file: {e}")
         return []
 
-def generate_airport_list(output_file="airports.txt", yaml_file="included_airports.yaml"):
-    included_airports = load_included_airports(yaml_file)
-    if not included_airports:
-        print("[!] No airports to include. Check your YAML file.")
-        return
+def load_date_grids(yaml_file="included_airports.yaml", allowed_keys=None):
+    """Per-airport date grids from the optional `date_grids` section (keyword -> settings).
 
-    # Start browser
-    driver = webdriver.Chrome()
-    driver.get("https://www.parkinglist.de/flughafen-parken/parken-flughafen-dresden")
+    With allowed_keys, a setting not in it raises ValueError naming the airport and the key,
+    instead of failing later when the grid is applied.
+    """
+    try:
+        with open(yaml_file, "r", encoding="utf-8") as f:
+            data = yaml.safe_load(f) or {}
+            date_grids = data.get("date_grids") or {}
+    except Exception as e:
+        print(f"[!] Error reading YAML file: {e}")
+        return {}
+    if allowed_keys is not None:
+        for keyword, grid in date_grids.items():
+            if grid is not None and not isinstance(grid, dict):
+                raise ValueError(f"date_grids.{keyword} in {yaml_file} must be a mapping of settings, got {grid!r}")
+            unknown = sorted(set(grid or {}) - set(allowed_keys))
+            if unknown:
+                raise ValueError(f"Unknown date_grids setting '{unknown[0]}' for '{keyword}' in {yaml_file} "
+                                 f"(allowed: {', '.join(allowed_keys)})")
+    return date_grids
 
-    airport_urls = []
+def grid_for_airport(date_grids, airport_url):
+    """Grid settings of the first keyword found in the URL, else the `default` entry."""
+    for keyword, grid in date_grids.items():
+        if keyword != "default" and keyword.lower() in airport_url.lower():
+            return grid or {}
+    return date_grids.get("default") or {}
 
-    try:
-        wait = WebDriverWait(driver, 10)
-        select_element = wait.until(EC.presence_of_element_located((By.ID, "abflughafen")))
-        options = select_element.find_elements(By.TAG_NAME, "option")
+def parse_airport_options(html, page_url=CATALOGUE_URL):
+    """Airport page URLs from the #abflughafen dropdown, sorted and without duplicates."""
+    if lxml_html is not None:
+        values = lxml_html.fromstring(html).xpath(f'//select[@id="{DROPDOWN_ID}"]/option/@value')
+    else:
+        select = BeautifulSoup(html, "html.parser").find("select", id=DROPDOWN_ID)
+        values = [option.get("value") for option in select.find_all("option")] if select else []
+    return sorted({urljoin(page_url, value.strip()) for value in values
+                   if value and "parken-flughafen" in value})
 
-        for option in options:
-            url = option.get_attribute("value")
-            if url and "parken-flughafen" in url:
-                # Include URL only if any keyword is found
-                if any(keyword.lower() in url.lower() for keyword in included_airports):
-                    airport_urls.append(url.strip())
+def fetch_airport_catalogue_http(url=CATALOGUE_URL, session=None, timeout=20):
+    """Read the airport dropdown with a plain HTTP request. Returns [] if it isn't in the HTML."""
+    from core.http_fetcher import create_http_session
+    session = session or create_http_session()
+    response = session.get(url, timeout=timeout)
+    response.raise_for_status()
+    return parse_airport_options(response.text, response.url)
 
+def fetch_airport_catalogue_browser(driver, url=CATALOGUE_URL):
+    """Read the airport dropdown in a browser, for when it is only rendered by JavaScript."""
+    driver.get(url)
+    try:
+        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.ID, DROPDOWN_ID)))
     except TimeoutException:
-        print("[!] Dropdown with ID 'abflughafen' was not found – maybe the site layout changed.")
-    finally:
-        driver.quit()
+        print(f"[!] Dropdown with ID '{DROPDOWN_ID}' was not found – maybe the site layout changed.")
+        return []
+    return parse_airport_options(driver.page_source, driver.current_url)
+
+def load_cached_catalogue(cache_file=CATALOGUE_CACHE):
+    """(airport URLs, age in seconds) of the cached catalogue, or (None, None) if there is none."""
+    try:
+        with open(cache_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data["airports"], time.time() - data["fetched_at"]
+    except (OSError, ValueError, KeyError):
+        return None, None
 
-    # Remove duplicates and sort
-    unique_urls = sorted(set(airport_urls))
+def save_cached_catalogue(airports, cache_file=CATALOGUE_CACHE, source=CATALOGUE_URL):
+    tmp_path = cache_file + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"fetched_at": time.time(), "source": source, "airports": airports}, f, indent=2)
+    os.replace(tmp_path, cache_file)
+
+def airport_catalogue(cache_file=CATALOGUE_CACHE, max_age=CATALOGUE_TTL, driver_factory=None, refresh=False):
+    """Every airport page URL of the site, from the cache while it is younger than max_age.
+
+    Otherwise fetched over HTTP; a browser is only used when the dropdown isn't in the
+    plain HTML, and then it comes from driver_factory() (the caller's scraping browser).
+    A stale cache is still used when fetching fails.
+    """
+    cached, age = load_cached_catalogue(cache_file)
+    if cached and not refresh and age < max_age:
+        print(f"[⋅] Using cached airport catalogue ({len(cached)} airports, {age / 3600:.1f}h old).")
+        return cached
+
+    airports = []
+    try:
+        airports = fetch_airport_catalogue_http()
+        if not airports:
+            print("[⋅] Airport dropdown not in the page HTML.")
+    except requests.RequestException as e:
+        print(f"[!] Could not fetch the airport catalogue over HTTP: {e}")
+    if not airports and driver_factory is not None:
+        print("[⋅] Reading the airport dropdown in the browser...")
+        airports = fetch_airport_catalogue_browser(driver_factory())
+
+    if airports:
+        save_cached_catalogue(airports, cache_file)
+        print(f"[✓] Airport catalogue updated: {len(airports)} airports.")
+        return airports
+    if cached:
+        print(f"[!] Using the cached airport catalogue from {age / 86400:.1f} days ago.")
+        return cached
+    return []
+
+def generate_airport_list(output_file="airports.txt", yaml_file="included_airports.yaml",
+                          driver_factory=None, refresh=False):
+    included_airports = load_included_airports(yaml_file)
+    if not included_airports:
+        print("[!] No airports to include. Check your YAML file.")
+        return
+
+    catalogue = airport_catalogue(driver_factory=driver_factory, refresh=refresh)
+
+    # Include URL only if any keyword is found
+    unique_urls = [url for url in catalogue
+                   if any(keyword.lower() in url.lower() for keyword in included_airports)]
 
     # Save to file
     with open(output_file, "w", encoding="utf-8") as f:
@@ -53,6 +155,17 @@ def generate_airport_list(output_file="airports.txt", yaml_file="included_airpor
 
     print(f"[✓] Saved {len(unique_urls)} filtered airport URLs to {output_file}")
 
-# Run directly
+# Run directly: python -m core.airport_loader [--refresh]
 if __name__ == "__main__":
-    generate_airport_list()
+    from core.browser_controller import create_driver
+    drivers = []
+
+    def start_browser():
+        drivers.append(create_driver(headless=True))
+        return drivers[-1]
+
+    try:
+        generate_airport_list(driver_factory=start_browser, refresh="--refresh" in sys.argv[1:])
+    finally:
+        for driver in drivers:
+            driver.quit()
@@ -1,12 +1,107 @@
+import undetected_chromedriver as uc
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
 import time
 import os
+import json
+import random
+from core import metrics
+from core.parsers import BROWSER_EXTRACT_JS, parse_page, page_size
+from core.failures import (ScrapeFailure, BLOCKED_MARKERS, BLOCKED, EMPTY, LAYOUT, TIMEOUT, ERROR,
+                           has_blocked_marker, VISIBLE_TEXT_LIMIT)
+
+RESULTS_SELECTOR = "div.airport_search"
+SPINNER_SELECTOR = ".loader, .spinner, .loading, .lds-ring, .fa-spinner"
+QUIET_WINDOW = 1.5   # Seconds the result list must stay unchanged to count as rendered
+POLL_INTERVAL = 0.25
+
+# Requests Chrome drops when resource blocking is on (Network.setBlockedURLs wildcards).
+# None of them is needed for the result markup we save.
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*cookiebot.com*", "*tally.so*",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*facebook.net*", "*hotjar.com*",
+]
+
+# Airport page whose search form is currently loaded, per browser session
+_loaded_airport = {}
+
+_SEARCH_FORM_READY_JS = """
+const button = document.evaluate('//span[text()="Search"]/..', document, null,
+    XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+return !!(document.getElementById('startDay_input') && document.getElementById('endDay_input') && button);
+"""
+
+# Text on a page without cards that means the search ran and found nothing
+EMPTY_MARKERS = ["keine parkplätze", "keine ergebnisse", "no results"]
+
+HTML_SAMPLE_RATE = 0.05   # Share of pages still collected as HTML with extract_in_browser
+
+SCREENSHOT_FOLDER = "screenshots"
+SCREENSHOT_ENV = "PARKING_SCREENSHOTS"   # Inherited by worker processes
+SCREENSHOT_INTERVAL = 600   # Seconds between two screenshots of the same failure kind
+SCREENSHOT_LIMIT = 200      # No new screenshots once the folder holds this many files
+_last_screenshot = {}
+
+# Returns a cheap fingerprint of the results area: card count, total markup length,
+# whether a loading spinner is still visible and, only while there are no cards,
+# whether the page is a block page ("blocked") or an empty result ("empty").
+_RESULTS_STATE_JS = """
+const cards = document.querySelectorAll(arguments[0]);
+let size = 0;
+cards.forEach(c => { size += c.innerHTML.length; });
+const spinnerVisible = Array.from(document.querySelectorAll(arguments[1]))
+    .some(el => el.offsetParent !== null);
+let verdict = "";
+if (cards.length === 0 && document.body) {
+    const text = (document.title + " " + document.body.innerText.slice(0, arguments[4])).toLowerCase();
+    if (arguments[2].some(m => text.includes(m))) verdict = "blocked";
+    else if (arguments[3].some(m => text.includes(m))) verdict = "empty";
+}
+return [cards.length, size, spinnerVisible, verdict];
+"""
+
+def create_driver(headless=False, profile_dir=None, block_resources=False):
+    options = uc.ChromeOptions()
+    # Maximized window (for better element rendering)
+    options.add_argument("--start-maximized")
+    # Optional: enable headless mode (runs browser in background, no GUI)
+    if headless:
+        options.add_argument("--headless=new")  # Use "new" for better stability
+
+    # Performance and compatibility flags
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--window-size=1920,1080")
+    options.add_argument("--disable-blink-features=AutomationControlled")
+
+    # Separate profile per worker so parallel browsers don't share state
+    if profile_dir:
+        os.makedirs(profile_dir, exist_ok=True)
+        options.add_argument(f"--user-data-dir={os.path.abspath(profile_dir)}")
+
+    driver = uc.Chrome(options=options, use_subprocess=True)
+    if block_resources:
+        block_requests(driver)
+    return driver
+
+def block_requests(driver, patterns=BLOCKED_URL_PATTERNS):
+    """Make Chrome drop images, fonts and third-party trackers before they are downloaded."""
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(patterns)})
+    print(f"[⋅] Blocking {len(patterns)} resource patterns.")
 
 def initialize_session(driver):
     """Accept cookies and close Tally popup once at the beginning."""
+    with metrics.stage("initialize_session"):
+        _initialize_session(driver)
+
+def _initialize_session(driver):
     wait = WebDriverWait(driver, 5)
     print("[⋅] Initializing session (cookies & popup)...")
 
@@ -30,53 +125,239 @@ def initialize_session(driver):
         print("[⋅] No Tally popup.")
         driver.switch_to.default_content()
 
-def load_parking_results(url, driver, departure_date, return_date, wait_time=22): #You can increase it from 22 to 30 or more depending on your system speed
+def wait_for_results_ready(driver, timeout, previous_card=None, quiet_window=QUIET_WINDOW):
+    """Wait until result cards are present, no spinner is visible and the DOM
+    has been stable for `quiet_window` seconds. Returns the time it took.
+
+    Fails fast with ScrapeFailure on a block page, or on an empty result that stays
+    the same for `quiet_window` seconds, instead of waiting for the timeout."""
+    start = time.monotonic()
+    deadline = start + timeout
+
+    # After a pagination click the old cards are still in the DOM until the
+    # site swaps them out; wait for that before looking at the new ones.
+    if previous_card is not None:
+        try:
+            WebDriverWait(driver, timeout).until(EC.staleness_of(previous_card))
+        except TimeoutException:
+            print("[!] Previous results were not replaced before timeout.")
+
+    last_state = None
+    stable_since = None
+    while True:
+        now = time.monotonic()
+        try:
+            state = driver.execute_script(_RESULTS_STATE_JS, RESULTS_SELECTOR, SPINNER_SELECTOR,
+                                          list(BLOCKED_MARKERS), EMPTY_MARKERS, VISIBLE_TEXT_LIMIT)
+        except Exception:
+            state = None
+
+        if state and state[3] == "blocked":
+            raise ScrapeFailure(BLOCKED, "Block or captcha page instead of results")
+        if state and (state[0] > 0 or state[3] == "empty") and not state[2]:
+            if state != last_state:
+                last_state = state
+                stable_since = now
+            elif now - stable_since >= quiet_window:
+                if state[0] == 0:
+                    raise ScrapeFailure(EMPTY, "The search found no parking offers")
+                return now - start
+        else:
+            last_state = None
+            stable_since = None
+
+        if now >= deadline:
+            raise TimeoutException(f"Results not ready after {timeout}s (last state: {state})")
+        time.sleep(POLL_INTERVAL)
+
+def open_search_page(driver, url, reuse_page=False):
+    """Make sure the search form of `url` is loaded. Returns True if the page
+    already in the browser was reused instead of loading it again."""
+    if reuse_page and _loaded_airport.get(driver.session_id) == url:
+        try:
+            if driver.execute_script(_SEARCH_FORM_READY_JS):
+                print(f"[⋅] Reusing loaded page: {url}")
+                return True
+        except WebDriverException:
+            pass
+        print("[!] Search form missing or stale. Reloading page.")
     driver.get(url)
+    _loaded_airport[driver.session_id] = url
     print(f"[⋅] Page loaded: {url}")
+    return False
+
+def save_failure_screenshot(driver, kind):
+    """Screenshot the browser after a failure, if screenshots are enabled.
+
+    Rate-limited: at most one per failure kind every SCREENSHOT_INTERVAL seconds per
+    process, and none once the folder holds SCREENSHOT_LIMIT files.
+    """
+    if not os.environ.get(SCREENSHOT_ENV):
+        return None
+    now = time.monotonic()
+    last = _last_screenshot.get(kind)
+    if last is not None and now - last < SCREENSHOT_INTERVAL:
+        return None
+    os.makedirs(SCREENSHOT_FOLDER, exist_ok=True)
+    if len(os.listdir(SCREENSHOT_FOLDER)) >= SCREENSHOT_LIMIT:
+        return None
+    _last_screenshot[kind] = now
+    screenshot_path = os.path.join(SCREENSHOT_FOLDER, f"{kind}_{int(time.time())}_{os.getpid()}.png")
+    try:
+        driver.save_screenshot(screenshot_path)
+    except WebDriverException:
+        return None
+    print(f"[✖] Screenshot saved: {screenshot_path}")
+    return screenshot_path
+
+def enable_screenshots(enabled=True):
+    """Turn failure screenshots on for this process and the workers it starts."""
+    if enabled:
+        os.environ[SCREENSHOT_ENV] = "1"
+    else:
+        os.environ.pop(SCREENSHOT_ENV, None)
+
+def _page_failure_kind(driver, default):
+    """BLOCKED if the current page looks like a block/captcha page, else default."""
+    try:
+        text = driver.execute_script("return document.title + ' ' + (document.body ? document.body.innerText : '')"
+                                     ".slice(0, arguments[0]);", VISIBLE_TEXT_LIMIT)
+        return BLOCKED if has_blocked_marker(text or "") else default
+    except WebDriverException:
+        return default
+
+def collect_page(driver, airport, page_number, extract_in_browser=False):
+    """Content of the rendered results page: its HTML or, with extract_in_browser,
+    the [title, place, cards] the parsers in core/parsers.py would return for it.
+
+    The HTML is still collected for a sample of the pages (checked against the HTML
+    parser) and whenever the in-browser extraction fails or finds no cards.
+    """
+    if not extract_in_browser:
+        return driver.page_source
+    with metrics.stage("browser_extract", airport=airport, page=page_number) as info:
+        try:
+            parsed = driver.execute_script(BROWSER_EXTRACT_JS)
+        except WebDriverException as e:
+            print(f"[!] In-browser extraction failed, keeping the HTML: {e.msg}")
+            info["status"] = "failed"
+            return driver.page_source
+        info["bytes"] = page_size(parsed)
+        if parsed[2] and random.random() >= HTML_SAMPLE_RATE:
+            return parsed
+        html = driver.page_source
+        if parsed[2] and json.loads(json.dumps(parse_page(html))) != parsed:
+            print(f"[!] In-browser extraction differs from the HTML parser on page {page_number}, keeping the HTML.")
+            info["status"] = "mismatch"
+        return html
+
+def load_parking_results(url, driver, departure_date, return_date, wait_time=22, reuse_page=False, # Upper bound per page; results are collected as soon as they are rendered
+                         extract_in_browser=False):
+    """Search one date combo and collect every results page as (page_number, html), or
+    (page_number, [title, place, cards]) for pages extracted in the browser (see collect_page).
+
+    Returns (pages, url). Raises ScrapeFailure (core/failures.py) with the kind of
+    failure when the combo couldn't be scraped, so the caller can retry it.
+    """
+    airport = url.split("/")[-1]
+    with metrics.stage("load_parking_results", airport=airport) as info:
+        try:
+            collected_pages, url = _load_parking_results(url, airport, driver, departure_date, return_date, wait_time,
+                                                         reuse_page, extract_in_browser)
+        except ScrapeFailure as e:
+            info["status"] = e.kind
+            print(f"[✖] {e.kind}: {e}")
+            _loaded_airport.pop(driver.session_id, None)
+            if e.kind != EMPTY:
+                save_failure_screenshot(driver, e.kind)
+            raise
+        info["pages"] = len(collected_pages)
+        info["bytes"] = sum(page_size(content) for _, content in collected_pages)
+    return collected_pages, url
+
+def _load_parking_results(url, airport, driver, departure_date, return_date, wait_time, reuse_page, extract_in_browser):
     wait = WebDriverWait(driver, wait_time)
     collected_pages = []
     page_number = 1
 
     try:
+        with metrics.stage("page_load", airport=airport) as info:
+            reused = open_search_page(driver, url, reuse_page)
+            info["reused"] = reused
+
+        search_start = time.perf_counter()
+        if not driver.execute_script(_SEARCH_FORM_READY_JS):
+            metrics.record("search_click", time.perf_counter() - search_start, "failed", airport=airport)
+            raise ScrapeFailure(_page_failure_kind(driver, LAYOUT), f"Search form not found on {url}")
+
         # Set date fields
         driver.execute_script(f"document.getElementById('startDay_input').value = '{departure_date}'")
         driver.execute_script(f"document.getElementById('endDay_input').value = '{return_date}'")
         print(f"[✓] Dates set: {departure_date} → {return_date}")
 
+        # On a reused page the previous combo's results are still shown until the new search replaces them
+        previous_card = None
+        if reused:
+            cards = driver.find_elements(By.CSS_SELECTOR, RESULTS_SELECTOR)
+            previous_card = cards[0] if cards else None
+
         # Click the "Search" button
         try:
             search_btn = wait.until(EC.element_to_be_clickable((By.XPATH, '//span[text()="Search"]/..')))
             driver.execute_script("arguments[0].scrollIntoView(true);", search_btn)
             driver.execute_script("arguments[0].click();", search_btn)
             print("[→] Clicked Search.")
+            metrics.record("search_click", time.perf_counter() - search_start, airport=airport)
         except Exception as e:
-            print(f"[!] Could not click Search button. Details: {e}")
-            return [], url
+            metrics.record("search_click", time.perf_counter() - search_start, "failed", airport=airport)
+            raise ScrapeFailure(_page_failure_kind(driver, LAYOUT), f"Could not click Search button: {e}") from e
 
         # Pagination loop
         while True:
             print(f"[⏳] Waiting for results page {page_number}...")
-            time.sleep(wait_time)
-            html = driver.page_source
-            collected_pages.append((page_number, html))
+            wait_start = time.perf_counter()
+            wait_status = "error"
+            try:
+                elapsed = wait_for_results_ready(driver, wait_time, previous_card)
+                print(f"[✓] Page {page_number} ready in {elapsed:.2f}s")
+                wait_status = "ok"
+            except TimeoutException as e:
+                print(f"[!] {e.msg}")
+                wait_status = "timeout"
+            except ScrapeFailure as e:
+                wait_status = e.kind
+                raise
+            finally:
+                metrics.record("results_wait", time.perf_counter() - wait_start, wait_status, airport=airport, page=page_number)
+            if wait_status == "timeout" and not driver.find_elements(By.CSS_SELECTOR, RESULTS_SELECTOR):
+                # Nothing rendered at all; with cards, keep collecting whatever is shown after wait_time
+                raise ScrapeFailure(_page_failure_kind(driver, TIMEOUT),
+                                    f"No results on page {page_number} after {wait_time}s")
+            collected_pages.append((page_number, collect_page(driver, airport, page_number, extract_in_browser)))
             print(f"[✓] Page {page_number} collected.")
 
             # Check for next page
+            next_start = time.perf_counter()
             try:
                 next_button = driver.find_element(By.XPATH, '//div[@class="pag_text" and not(contains(@class, "disabled")) and text()="Next"]')
                 driver.execute_script("arguments[0].scrollIntoView(true);", next_button)
-                time.sleep(2)
+                cards = driver.find_elements(By.CSS_SELECTOR, RESULTS_SELECTOR)
+                previous_card = cards[0] if cards else None
+                WebDriverWait(driver, 5).until(EC.element_to_be_clickable(next_button))
                 next_button.click()
+                metrics.record("pagination", time.perf_counter() - next_start, airport=airport, page=page_number)
                 page_number += 1
             except:
                 print("[!] Next button not found. Ending pagination.")
                 break
 
+    except ScrapeFailure:
+        raise
+    except TimeoutException as e:
+        raise ScrapeFailure(TIMEOUT, f"Timed out while processing {url}: {e.msg}") from e
     except Exception as e:
         print(f"[✖] General error while processing {url}:\n{e}")
-        os.makedirs("screenshots", exist_ok=True)
-        screenshot_path = f"screenshots/error_{int(time.time())}.png"
-        driver.save_screenshot(screenshot_path)
-        print(f"[✖] Screenshot saved: {screenshot_path}")
+        message = str(e).strip().splitlines()
+        raise ScrapeFailure(ERROR, message[0] if message else type(e).__name__) from e
 
     return collected_pages, url
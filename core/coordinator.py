@@ -0,0 +1,321 @@
+import os
+import gzip
+import json
+import time
+import threading
+import requests
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from core.page_saver import save_pages
+from core.progress_journal import ProgressJournal, format_counts, IN_FLIGHT
+from core.scrape_session import ScrapeSession
+from core.failures import ScrapeFailure, ERROR
+
+DEFAULT_ADDRESS = "127.0.0.1:8765"
+LEASE_SECONDS = 120        # A node that sends no heartbeat for this long loses its combo
+HEARTBEAT_INTERVAL = 30
+IDLE_WAIT = 15             # Longest a node waits before asking again while other nodes still hold combos
+UNREACHABLE_LIMIT = 300    # A node gives up after the coordinator was unreachable this long
+DELIVERY_ATTEMPTS = 3      # Tries to deliver pages (or a failure) before the node releases the combo
+TOKEN_ENV = "PARKING_COORDINATOR_TOKEN"   # Shared secret every request must carry, when set
+
+class Coordinator:
+    """Hands out the combos of a progress journal to scraping nodes under leases.
+
+    The HTTP server below exposes it to remote nodes; CoordinatorClient has the same
+    methods, so run_node() also works against a Coordinator in the same process.
+    Pages delivered by the nodes are saved here, into the usual saved_pages/ (or page
+    store), so extract_parking_data.py writes the same json_out/ as a local run.
+    """
+
+    def __init__(self, journal_path, lease=LEASE_SECONDS, store_folder=None):
+        self.journal_path = journal_path
+        self.lease = lease
+        self.store_folder = store_folder
+        self._local = threading.local()
+        self._save_lock = threading.Lock()
+
+    def _journal(self):
+        # One connection per server thread; the journal is safe for concurrent claims
+        journal = getattr(self._local, "journal", None)
+        if journal is None:
+            journal = self._local.journal = ProgressJournal(self.journal_path)
+        return journal
+
+    def claim(self, worker):
+        """{"airport_url", "combo", "lease"}, {"wait": seconds} or {"done": True}."""
+        journal = self._journal()
+        unit = journal.claim(worker, lease=self.lease)
+        if unit is not None:
+            airport_url, combo = unit
+            return {"airport_url": airport_url, "combo": combo, "lease": self.lease}
+        counts = journal.counts()
+        if not counts.get("pending") and not counts.get("in_flight"):
+            return {"done": True}
+        # Retries that aren't due yet, or combos other nodes hold and may still lose
+        retry_at = journal.next_retry_at()
+        wait = IDLE_WAIT if retry_at is None else min(max(retry_at - time.time(), 1), IDLE_WAIT)
+        return {"wait": wait}
+
+    def heartbeat(self, worker, airport_url, combo):
+        return {"held": self._journal().renew(worker, self.lease, airport_url, combo)}
+
+    def release(self, worker, airport_url, combo):
+        return {"released": self._journal().release(worker, airport_url, combo)}
+
+    def complete(self, worker, airport_url, combo, pages):
+        journal = self._journal()
+        state = journal.state(airport_url, combo)
+        if state is None or state[0] == "done":
+            # Unknown combo, or delivered already by the node it was reissued to
+            return {"accepted": False}
+        try:
+            with self._save_lock:
+                save_pages(pages, airport_url, combo, store_folder=self.store_folder)
+        except Exception as e:
+            # e.g. --browser-extract pages sent to a --page-store coordinator
+            error = f"saving the pages failed: {type(e).__name__}: {e}"
+            print(f"[✖] {worker}: {error}")
+            if state == (IN_FLIGHT, worker):
+                journal.mark_failed(airport_url, combo, error, ERROR)
+            return {"accepted": False, "error": error}
+        journal.mark_done(airport_url, combo)
+        return {"accepted": True}
+
+    def fail(self, worker, airport_url, combo, kind, error):
+        journal = self._journal()
+        if journal.state(airport_url, combo) != (IN_FLIGHT, worker):
+            return {"accepted": False, "delay": None}
+        return {"accepted": True, "delay": journal.mark_failed(airport_url, combo, error, kind)}
+
+    def expire_leases(self):
+        return self._journal().expire_leases()
+
+    def status(self):
+        return self._journal().counts()
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        try:
+            if self.headers.get("Content-Encoding") == "gzip":
+                body = gzip.decompress(body)
+            payload = json.loads(body or b"{}")
+            coordinator = self.server.coordinator
+            routes = {
+                "/claim": lambda: coordinator.claim(payload["worker"]),
+                "/heartbeat": lambda: coordinator.heartbeat(payload["worker"], payload["airport_url"],
+                                                            payload["combo"]),
+                "/release": lambda: coordinator.release(payload["worker"], payload["airport_url"], payload["combo"]),
+                "/complete": lambda: coordinator.complete(payload["worker"], payload["airport_url"],
+                                                          payload["combo"], payload["pages"]),
+                "/fail": lambda: coordinator.fail(payload["worker"], payload["airport_url"], payload["combo"],
+                                                  payload["kind"], payload["error"]),
+            }
+            if self.path not in routes:
+                self._send(404, {"error": f"unknown path {self.path}"})
+                return
+            result = routes[self.path]()
+        except (KeyError, TypeError, ValueError, OSError) as e:
+            self._send(400, {"error": f"{type(e).__name__}: {e}"})
+            return
+        except Exception as e:
+            # Answer instead of dropping the connection, so the node knows what happened
+            self._send(500, {"error": f"{type(e).__name__}: {e}"})
+            return
+        self._send(200, result)
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        if self.path != "/status":
+            self._send(404, {"error": f"unknown path {self.path}"})
+            return
+        self._send(200, self.server.coordinator.status())
+
+    def _authorized(self):
+        token = os.environ.get(TOKEN_ENV)
+        if token and self.headers.get("X-Coordinator-Token") != token:
+            self._send(403, {"error": "wrong or missing token"})
+            return False
+        return True
+
+    def _send(self, status, result):
+        body = json.dumps(result, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def parse_address(address):
+    host, _, port = address.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+def start_server(coordinator, address=DEFAULT_ADDRESS):
+    """Serve the coordinator over HTTP in a background thread. Returns the server."""
+    server = ThreadingHTTPServer(parse_address(address), _Handler)
+    server.daemon_threads = True
+    server.coordinator = coordinator
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def run_coordinator(journal_path, address=DEFAULT_ADDRESS, store_folder=None, lease=LEASE_SECONDS):
+    """Serve the journal's combos to nodes until every one is done or given up."""
+    coordinator = Coordinator(journal_path, lease=lease, store_folder=store_folder)
+    server = start_server(coordinator, address)
+    host, port = server.server_address[:2]
+    print(f"[⋅] Coordinator listening on http://{host}:{port} — start nodes with: python3 main.py --node http://<this host>:{port}")
+    last_counts = None
+    try:
+        while True:
+            for worker in sorted(set(coordinator.expire_leases())):
+                print(f"[!] {worker} stopped sending heartbeats, its combinations are handed out again.")
+            counts = coordinator.status()
+            if counts != last_counts:
+                print(f"[⋅] Progress: {format_counts(counts)}")
+                last_counts = counts
+            if not counts.get("pending") and not counts.get("in_flight"):
+                break
+            time.sleep(5)
+        # Stay up a little longer, so idle nodes learn that the work is done
+        time.sleep(IDLE_WAIT + 1)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+class CoordinatorClient:
+    """A node's connection to a coordinator over HTTP; same methods as Coordinator."""
+
+    def __init__(self, base_url, timeout=60):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+        token = os.environ.get(TOKEN_ENV)
+        if token:
+            self.session.headers["X-Coordinator-Token"] = token
+        self._lock = threading.Lock()   # The heartbeat thread shares the session
+
+    def _post(self, path, payload, compress=False):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        if compress:
+            data = gzip.compress(data)
+            headers["Content-Encoding"] = "gzip"
+        with self._lock:
+            response = self.session.post(self.base_url + path, data=data, headers=headers, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def claim(self, worker):
+        return self._post("/claim", {"worker": worker})
+
+    def heartbeat(self, worker, airport_url, combo):
+        return self._post("/heartbeat", {"worker": worker, "airport_url": airport_url, "combo": combo})
+
+    def release(self, worker, airport_url, combo):
+        return self._post("/release", {"worker": worker, "airport_url": airport_url, "combo": combo})
+
+    def complete(self, worker, airport_url, combo, pages):
+        return self._post("/complete", {"worker": worker, "airport_url": airport_url, "combo": combo,
+                                        "pages": pages}, compress=True)
+
+    def fail(self, worker, airport_url, combo, kind, error):
+        return self._post("/fail", {"worker": worker, "airport_url": airport_url, "combo": combo,
+                                    "kind": kind, "error": error})
+
+def _deliver(call, description):
+    """Call the coordinator up to DELIVERY_ATTEMPTS times. Returns its reply, or None if every try failed."""
+    for attempt in range(1, DELIVERY_ATTEMPTS + 1):
+        try:
+            return call()
+        except requests.RequestException as e:
+            print(f"[!] Could not {description} (try {attempt}/{DELIVERY_ATTEMPTS}): {e}")
+            if attempt < DELIVERY_ATTEMPTS:
+                time.sleep(2 ** attempt)
+    return None
+
+def _release(coordinator, worker, airport_url, combo):
+    try:
+        coordinator.release(worker, airport_url, combo)
+        print(f"[⋅] {worker}: released {combo['from_raw']} → {combo['to_raw']} for another try.")
+    except requests.RequestException:
+        # Its heartbeats have stopped, so its lease expires instead
+        print(f"[!] {worker}: could not release {combo['from_raw']} → {combo['to_raw']}, its lease will expire.")
+
+def run_node(coordinator, worker, headless=True, use_http=False, no_browser=False, reuse_page=False,
+             block_resources=False, extract_in_browser=False):
+    """Scrape combos handed out by the coordinator until it reports that all are done.
+
+    A background thread sends heartbeats for the combo in hand only, so it keeps its
+    lease while the browser waits for results, and a combo the node gave up on expires.
+    """
+    stop = threading.Event()
+    holding = {}
+
+    def send_heartbeats():
+        while not stop.wait(HEARTBEAT_INTERVAL):
+            unit = holding.get("unit")
+            if unit is None:
+                continue
+            try:
+                coordinator.heartbeat(worker, *unit)
+            except Exception as e:
+                print(f"[!] Heartbeat failed: {e}")
+
+    threading.Thread(target=send_heartbeats, daemon=True).start()
+    session = ScrapeSession(name=worker, headless=headless, block_resources=block_resources, use_http=use_http,
+                            no_browser=no_browser, reuse_page=reuse_page, extract_in_browser=extract_in_browser)
+    unreachable_since = None
+    try:
+        while True:
+            try:
+                reply = coordinator.claim(worker)
+                unreachable_since = None
+            except requests.RequestException as e:
+                unreachable_since = unreachable_since or time.monotonic()
+                if time.monotonic() - unreachable_since > UNREACHABLE_LIMIT:
+                    print(f"[✖] Coordinator unreachable for {UNREACHABLE_LIMIT}s, stopping: {e}")
+                    break
+                print(f"[!] Coordinator unreachable, retrying: {e}")
+                time.sleep(IDLE_WAIT)
+                continue
+            if reply.get("done"):
+                print("[✓] Coordinator reports all combinations done.")
+                break
+            if "wait" in reply:
+                time.sleep(reply["wait"])
+                continue
+
+            airport_url, combo = reply["airport_url"], reply["combo"]
+            holding["unit"] = (airport_url, combo)
+            try:
+                pages, _ = session.scrape(airport_url, combo)
+            except ScrapeFailure as e:
+                reply = _deliver(lambda: coordinator.fail(worker, airport_url, combo, e.kind, str(e)),
+                                 "report the failure")
+                if reply is None:
+                    _release(coordinator, worker, airport_url, combo)
+                holding["unit"] = None
+                continue
+
+            reply = _deliver(lambda: coordinator.complete(worker, airport_url, combo, pages),
+                             f"deliver {len(pages)} page(s)")
+            if reply is None:
+                _release(coordinator, worker, airport_url, combo)
+            elif reply.get("accepted"):
+                print(f"[✓] Delivered {len(pages)} page(s) for {combo['from_raw']} → {combo['to_raw']}")
+            elif reply.get("error"):
+                print(f"[✖] The coordinator couldn't save {combo['from_raw']} → {combo['to_raw']}: {reply['error']}")
+            else:
+                print(f"[⋅] {combo['from_raw']} → {combo['to_raw']} was already delivered by another node.")
+            holding["unit"] = None
+    finally:
+        stop.set()
+        session.quit()
@@ -0,0 +1,345 @@
+import os
+import json
+import time
+import queue
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from core.page_saver import save_pages
+from core.progress_journal import ProgressJournal, wait_for_retry
+from core.worker_pool import RETRY_POLL
+from core.scrape_session import ScrapeSession, PROFILE_ROOT, report_failure
+from core.failures import ScrapeFailure, RESTART_KINDS
+
+try:
+    import psutil
+except ImportError:  # Memory is read from /proc then (Linux only)
+    psutil = None
+
+DEFAULT_ADDRESS = "127.0.0.1:8766"
+MAX_PAGES = 500        # Result pages a browser scrapes before it is replaced by a fresh one
+MAX_RSS_MB = 1500      # Memory of a browser (Chrome and all its child processes) that gets it replaced
+IDLE_CHECK = 60        # A browser idle for longer is checked for a response before it gets a combo
+
+def _proc_tree_rss(root_pid):
+    """RSS in bytes of a process and all its descendants, from /proc."""
+    if not os.path.exists(f"/proc/{root_pid}/statm"):
+        return None
+    children = {}
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat", "r") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # The command name in parentheses may contain spaces; the parent pid follows it
+        ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        children.setdefault(ppid, []).append(int(name))
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    total, stack = 0, [root_pid]
+    while stack:
+        pid = stack.pop()
+        try:
+            with open(f"/proc/{pid}/statm", "r") as f:
+                total += int(f.read().split()[1]) * page_size
+        except OSError:
+            pass  # Exited in the meantime
+        stack.extend(children.get(pid, []))
+    return total
+
+def browser_rss(driver):
+    """Memory of the driver's Chrome with its renderer and GPU processes in bytes, or None if unknown."""
+    pid = getattr(driver, "browser_pid", None)
+    if not pid:
+        return None
+    if psutil is not None:
+        try:
+            root = psutil.Process(pid)
+            return sum(p.memory_info().rss for p in [root, *root.children(recursive=True)])
+        except psutil.Error:
+            return None
+    return _proc_tree_rss(pid)
+
+class BrowserSlot:
+    """One browser of the pool and its counters since it was (re)started."""
+
+    def __init__(self, slot_id, session):
+        self.id = slot_id
+        self.name = f"daemon-{slot_id}"
+        self.session = session
+        self.started_at = None
+        self.pages = 0
+        self.combos = 0
+        self.rss = None
+        self.recycles = 0
+        self.last_recycle = None
+        self.error = None
+        self.busy = False
+        self.last_used = None
+
+    def stats(self):
+        return {
+            "slot": self.id,
+            "state": "busy" if self.busy else "idle" if self.session.driver is not None else "down",
+            "pages": self.pages,
+            "combos": self.combos,
+            "uptime": round(time.time() - self.started_at) if self.started_at else None,
+            "rss_mb": round(self.rss / 2 ** 20, 1) if self.rss is not None else None,
+            "recycles": self.recycles,
+            "last_recycle": self.last_recycle,
+            "error": self.error,
+        }
+
+class WarmBrowserPool:
+    """Browsers that stay open between scrape cycles, each with its session (cookies & popup)
+    already set up, so a cycle starts scraping right away.
+
+    A browser is replaced by a fresh one after max_pages result pages, when its memory
+    passes max_rss_mb, or (with a clean profile) after a blocked or broken session.
+    """
+
+    def __init__(self, size, headless=True, block_resources=False, use_http=False,
+                 max_pages=MAX_PAGES, max_rss_mb=MAX_RSS_MB):
+        self.slots = [BrowserSlot(i, ScrapeSession(name=f"Browser {i}", headless=headless,
+                                                   profile_dir=os.path.join(PROFILE_ROOT, f"daemon_{i}"),
+                                                   block_resources=block_resources, use_http=use_http))
+                      for i in range(size)]
+        self.max_pages = max_pages
+        self.max_rss = max_rss_mb * 2 ** 20
+        self.warm_url = None
+
+    def _warm(self, slot):
+        slot.session.start(self.warm_url)
+        slot.started_at = time.time()
+        slot.pages = slot.combos = 0
+        slot.rss = browser_rss(slot.session.driver)
+        slot.error = None
+
+    def _stop(self, slot):
+        slot.session.quit()
+
+    def _recycle(self, slot, reason):
+        print(f"[⋅] Browser {slot.id}: recycling ({reason}).")
+        self._stop(slot)
+        slot.recycles += 1
+        slot.last_recycle = reason
+        self._warm(slot)
+
+    def _ensure_ready(self, slot):
+        """Start the slot's browser if it is down, replace it if it stopped responding while idle."""
+        if slot.session.driver is None:
+            self._warm(slot)
+            return
+        if slot.last_used is not None and time.time() - slot.last_used < IDLE_CHECK:
+            return
+        try:
+            slot.session.driver.execute_script("return 1")
+        except Exception as e:
+            self._recycle(slot, f"not responding: {type(e).__name__}")
+
+    def start(self, warm_url):
+        """Open and warm every browser in parallel. Browsers that fail to start are retried next cycle."""
+        self.warm_url = warm_url
+        threads = [threading.Thread(target=self._start_slot, args=(slot,)) for slot in self.slots]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        ready = sum(slot.session.driver is not None for slot in self.slots)
+        print(f"[✓] {ready}/{len(self.slots)} browsers warm.")
+
+    def _start_slot(self, slot):
+        try:
+            self._ensure_ready(slot)
+        except Exception as e:
+            slot.error = f"start failed: {e}"
+            print(f"[✖] Browser {slot.id}: {slot.error}")
+            self._stop(slot)
+
+    def drain(self, journal_path, store_folder=None, reuse_page=False, extract_in_browser=False):
+        """Scrape every pending combo of the journal with the pool's browsers; returns when none are left."""
+        threads = [threading.Thread(target=self._scrape, args=(slot, journal_path, store_folder,
+                                                               reuse_page, extract_in_browser))
+                   for slot in self.slots]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        journal = ProgressJournal(journal_path)
+        try:
+            for slot in self.slots:
+                lost = journal.fail_in_flight(slot.name, "browser thread exited")
+                if lost:
+                    print(f"[!] Browser {slot.id} stopped with {lost} combination(s) in flight.")
+        finally:
+            journal.close()
+
+    def _scrape(self, slot, journal_path, store_folder, reuse_page, extract_in_browser):
+        journal = ProgressJournal(journal_path)
+        slot.session.reuse_page = reuse_page
+        slot.session.extract_in_browser = extract_in_browser
+        try:
+            while True:
+                unit = journal.claim(slot.name)
+                if unit is None:
+                    # Other browsers may still fail combos back to pending
+                    if wait_for_retry(journal, max_wait=RETRY_POLL):
+                        continue
+                    break
+                airport_url, combo = unit
+                slot.busy = True
+                try:
+                    self._ensure_ready(slot)
+                    pages, url = slot.session.scrape(airport_url, combo)
+                except ScrapeFailure as e:
+                    report_failure(journal, airport_url, combo, e, name=slot.session.name)
+                    if e.kind in RESTART_KINDS:
+                        # The session threw its browser away; warm the replacement before the next claim
+                        slot.recycles += 1
+                        slot.last_recycle = e.kind
+                        self._warm(slot)
+                    continue
+                finally:
+                    slot.busy = False
+                    slot.last_used = time.time()
+
+                save_pages(pages, url, combo, store_folder=store_folder)
+                journal.mark_done(airport_url, combo)
+                slot.pages += len(pages)
+                slot.combos += 1
+                slot.rss = browser_rss(slot.session.driver)
+                if slot.pages >= self.max_pages:
+                    self._recycle(slot, f"{slot.pages} pages")
+                elif slot.rss is not None and slot.rss > self.max_rss:
+                    self._recycle(slot, f"{slot.rss / 2 ** 20:.0f} MB")
+        except Exception as e:
+            slot.error = f"crashed: {e}"
+            print(f"[✖] Browser {slot.id} {slot.error}")
+            self._stop(slot)
+        finally:
+            journal.close()
+
+    def stats(self):
+        slots = [slot.stats() for slot in self.slots]
+        ready = sum(slot.session.driver is not None for slot in self.slots)
+        rss = [s["rss_mb"] for s in slots if s["rss_mb"] is not None]
+        return {
+            "status": "ok" if ready == len(slots) else "degraded" if ready else "down",
+            "browsers": len(slots),
+            "ready": ready,
+            "rss_mb": round(sum(rss), 1) if rss else None,
+            "recycles": sum(s["recycles"] for s in slots),
+            "slots": slots,
+        }
+
+    def close(self):
+        for slot in self.slots:
+            self._stop(slot)
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path in ("/health", "/stats"):
+            self._send(200, self.server.scrape_daemon.health())
+        else:
+            self._send(404, {"error": f"unknown path {self.path}"})
+
+    def do_POST(self):
+        if self.path != "/run":
+            self._send(404, {"error": f"unknown path {self.path}"})
+            return
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        try:
+            airports = json.loads(body or b"{}").get("airports")
+        except (ValueError, AttributeError) as e:
+            self._send(400, {"error": f"{type(e).__name__}: {e}"})
+            return
+        # Names are matched as substrings of the airport URLs; a bare string would match by its letters
+        if airports is not None and (not isinstance(airports, list) or not airports
+                                     or not all(isinstance(name, str) and name.strip() for name in airports)):
+            self._send(400, {"error": "airports must be a non-empty list of airport names, e.g. [\"bremen\"]"})
+            return
+        self._send(202, {"queued": self.server.scrape_daemon.submit(airports)})
+
+    def _send(self, status, result):
+        body = json.dumps(result, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class ScrapeDaemon:
+    """Runs scrape cycles with a warm browser pool: every `interval` hours and whenever
+    a job is posted to the local control server.
+
+        GET  /health            pool health and memory of every browser
+        POST /run               queue a cycle; {"airports": ["frankfurt", ...]} limits it
+                                to the airports whose URL contains one of the names
+    """
+
+    def __init__(self, pool, run_cycle, interval_hours=0, address=DEFAULT_ADDRESS):
+        self.pool = pool
+        self.run_cycle = run_cycle
+        self.interval = interval_hours * 3600
+        self.address = address
+        self.jobs = queue.Queue()
+        self.cycles = 0
+        self.current = None
+        self.last_cycle = None
+
+    def submit(self, airports=None):
+        self.jobs.put(airports)
+        return self.jobs.qsize()
+
+    def health(self):
+        health = self.pool.stats()
+        health.update(cycles=self.cycles, running=self.current, queued=self.jobs.qsize(),
+                      last_cycle=self.last_cycle)
+        return health
+
+    def _schedule(self, stop):
+        while not stop.wait(self.interval):
+            self.submit()
+
+    def run(self):
+        host, _, port = self.address.rpartition(":")
+        server = ThreadingHTTPServer((host or "127.0.0.1", int(port)), _Handler)
+        server.daemon_threads = True
+        server.scrape_daemon = self
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        print(f"[⋅] Daemon listening on http://{host}:{server.server_address[1]} (GET /health, POST /run)")
+
+        stop = threading.Event()
+        if self.interval:
+            threading.Thread(target=self._schedule, args=(stop,), daemon=True).start()
+        self.submit()   # First cycle right away
+        try:
+            while True:
+                airports = self.jobs.get()
+                self.current = {"airports": airports, "started_at": time.time()}
+                start = time.time()
+                try:
+                    self.run_cycle(airports)
+                    status = "ok"
+                except Exception as e:
+                    status = f"error: {e}"
+                    print(f"❌ Cycle failed: {e}")
+                self.cycles += 1
+                self.current = None
+                self.last_cycle = {"airports": airports, "finished_at": time.time(),
+                                   "duration": round(time.time() - start, 1), "status": status}
+                stats = self.pool.stats()
+                print(f"[⋅] Cycle {self.cycles} finished in {self.last_cycle['duration']}s — "
+                      f"{stats['ready']}/{stats['browsers']} browsers ready, "
+                      f"{stats['rss_mb'] or '?'} MB, {stats['recycles']} recycles so far")
+        except KeyboardInterrupt:
+            print("[⋅] Stopping the daemon.")
+        finally:
+            stop.set()
+            server.shutdown()
+            server.server_close()
+            self.pool.close()
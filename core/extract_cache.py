@@ -0,0 +1,87 @@
+import json
+import sqlite3
+import hashlib
+import threading
+from datetime import datetime
+from core.parsers import EXTRACTOR_VERSION, BACKENDS, DEFAULT_BACKEND
+
+DEFAULT_CACHE_PATH = "extract_cache.sqlite"
+
+def cache_version(backend=None):
+    """Version an entry is stored under: EXTRACTOR_VERSION and the parser backend that wrote it,
+    so --parser bs4 never gets lxml output (or the other way round) from the cache."""
+    return f"{EXTRACTOR_VERSION}:{backend or DEFAULT_BACKEND}"
+
+class ExtractCache:
+    """Parsed pages keyed by (content hash, EXTRACTOR_VERSION and parser backend).
+
+    Only the parser output (title, place, cards) is cached. Records are still built
+    from it on every run, so changes to record building never need a version bump;
+    bump EXTRACTOR_VERSION in core/parsers.py when what the parser extracts changes.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS parsed_pages (
+                content_hash TEXT NOT NULL,
+                extractor_version TEXT NOT NULL,
+                parsed TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                PRIMARY KEY (content_hash, extractor_version)
+            )""")
+        self.conn.commit()
+
+    def get(self, content_hash, backend=None):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT parsed FROM parsed_pages WHERE content_hash = ? AND extractor_version = ?",
+                (content_hash, cache_version(backend))).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        title, place, cards = json.loads(row[0])
+        return title, place, cards
+
+    def put(self, content_hash, parsed, backend=None):
+        data = json.dumps(parsed, ensure_ascii=False)
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO parsed_pages (content_hash, extractor_version, parsed, created_at) "
+                "VALUES (?, ?, ?, ?)",
+                (content_hash, cache_version(backend), data, datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+            self.conn.commit()
+
+    def prune(self):
+        """Delete entries written by other extractor versions or by no longer installed
+        backends. Returns the number removed."""
+        versions = [cache_version(backend) for backend in BACKENDS]
+        with self.lock:
+            cursor = self.conn.execute(
+                f"DELETE FROM parsed_pages WHERE extractor_version NOT IN ({', '.join('?' * len(versions))})",
+                versions)
+            self.conn.commit()
+        self.conn.execute("VACUUM")
+        return cursor.rowcount
+
+    def close(self):
+        self.conn.close()
+
+_open_caches = {}
+_open_lock = threading.Lock()
+
+def get_cache(path):
+    """One cache connection per process and path (threads share it, processes open their own)."""
+    with _open_lock:
+        if path not in _open_caches:
+            _open_caches[path] = ExtractCache(path)
+        return _open_caches[path]
+
+def content_hash(content):
+    return hashlib.sha256(content).hexdigest()
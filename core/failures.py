@@ -0,0 +1,69 @@
+import random
+from bs4 import BeautifulSoup
+
+# Failure kinds of a scrape attempt
+TIMEOUT = "timeout"              # page or results didn't load in time
+EMPTY = "empty"                  # page loaded but has no result cards
+BLOCKED = "blocked"              # captcha, rate limit or access denied
+LAYOUT = "layout"                # search form, inputs or button not where we expect them
+NEEDS_BROWSER = "needs_browser"  # --no-browser run hit results only the browser can page through
+ERROR = "error"                  # anything else (driver crash, worker exit, ...)
+
+# kind -> (attempts before giving up, base retry delay in seconds)
+RETRY_POLICY = {
+    TIMEOUT: (4, 30),
+    EMPTY: (2, 60),
+    BLOCKED: (3, 300),
+    LAYOUT: (2, 120),
+    NEEDS_BROWSER: (1, 0),
+    ERROR: (3, 30),
+}
+MAX_RETRY_DELAY = 1800
+
+# After these the browser session is thrown away and a fresh one started
+RESTART_KINDS = (BLOCKED, ERROR)
+
+# Matched against the visible text and title of a page, never its markup: ordinary pages load
+# Cloudflare's /cdn-cgi/challenge-platform script and reCAPTCHA tags too.
+BLOCKED_MARKERS = (
+    "captcha", "just a moment", "checking your browser", "verify you are human", "access denied",
+    "zugriff verweigert", "too many requests", "unusual traffic", "ungewöhnlichen datenverkehr",
+)
+VISIBLE_TEXT_LIMIT = 20000   # Characters of body text searched, as in the browser's check
+
+class ScrapeFailure(Exception):
+    """A combo could not be scraped; kind says why and decides how it is retried."""
+
+    def __init__(self, kind, message):
+        super().__init__(message)
+        self.kind = kind
+
+def visible_text(html):
+    """Title and body text of a page without scripts, styles or attributes, like the browser's innerText."""
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(["script", "style", "noscript", "template"]):
+        tag.decompose()
+    title = soup.title.get_text(" ") if soup.title else ""
+    body = (soup.body or soup).get_text(" ")[:VISIBLE_TEXT_LIMIT]
+    return f"{title} {body}".lower()
+
+def has_blocked_marker(text):
+    text = text.lower()
+    return any(marker in text for marker in BLOCKED_MARKERS)
+
+def looks_blocked(html):
+    return has_blocked_marker(visible_text(html))
+
+def classify_empty_page(html):
+    """Kind of a page without result cards: a block page or a genuinely empty result."""
+    return BLOCKED if html and looks_blocked(html) else EMPTY
+
+def max_attempts(kind):
+    return RETRY_POLICY.get(kind, RETRY_POLICY[ERROR])[0]
+
+def retry_delay(kind, attempt, rng=random):
+    """Exponential backoff from the kind's base delay, with ±50% jitter so that
+    combos failing together don't all come back at the same moment."""
+    base = RETRY_POLICY.get(kind, RETRY_POLICY[ERROR])[1]
+    delay = min(base * 2 ** max(attempt - 1, 0), MAX_RETRY_DELAY)
+    return delay * rng.uniform(0.5, 1.5)
@@ -1,28 +1,40 @@
 import os
+import shutil
 import subprocess
+from core.progress_journal import ProgressJournal, DEFAULT_JOURNAL_PATH
+from core.pipeline import LIVE_FOLDER
 
-def finalize_progress(airport_file="core/airports.txt", log_file="progress.log"):
+def finalize_progress(airport_file="core/airports.txt", journal_path=DEFAULT_JOURNAL_PATH, extract_args=(),
+                      live_folder=LIVE_FOLDER):
     # Verifică dacă lista de aeroporturi este goală
     airports_empty = not os.path.exists(airport_file) or os.stat(airport_file).st_size == 0
-    log_exists = os.path.exists(log_file) and os.stat(log_file).st_size > 0
+    journal = ProgressJournal(journal_path)
+    try:
+        journal_exists = journal.has_entries()
+        if airports_empty and journal_exists:
+            print("[✓] All airports processed. Clearing progress journal...")
+            # Golește jurnalul
+            journal.reset()
+    finally:
+        journal.close()
 
     if airports_empty:
-        if log_exists:
-            print("[✓] All airports processed. Clearing progress log...")
-            # Golește logul
-            open(log_file, "w", encoding="utf-8").close()
-
+        if journal_exists:
             # Rulează extract_parking_data.py
             print("[⋅] Running extract_parking_data.py ...")
             try:
-                subprocess.run(["python", "extract_parking_data.py"], check=True)
+                subprocess.run(["python", "extract_parking_data.py", *extract_args], check=True)
                 print("[✓] extract_parking_data.py finished successfully.")
+                # The full extraction supersedes the records the --pipeline wrote during the cycle
+                if os.path.isdir(live_folder):
+                    shutil.rmtree(live_folder, ignore_errors=True)
+                    print(f"[⋅] Cleared {live_folder}")
             except subprocess.CalledProcessError as e:
                 print(f"[❌] Failed to run extract_parking_data.py: {e}")
         else:
-            print("[⋅] Log is already empty or doesn't exist. Nothing to clear.")
+            print("[⋅] Journal is already empty. Nothing to clear.")
     else:
-        print("[!] Airports still remain. Progress log not cleared.")
+        print("[!] Airports still remain. Progress journal not cleared.")
 
 if __name__ == "__main__":
     finalize_progress()
@@ -0,0 +1,177 @@
+import requests
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup
+from urllib.parse import urljoin, urlsplit
+from core.browser_controller import load_parking_results
+from core.failures import ScrapeFailure, BLOCKED, TIMEOUT, LAYOUT, NEEDS_BROWSER, ERROR, classify_empty_page
+from core import metrics
+
+try:
+    from lxml import etree, html as lxml_html
+except ImportError:  # lxml is optional, BeautifulSoup is always available
+    lxml_html = None
+
+SEARCH_PARAM = "param=newSearch"
+START_FIELD_ID = "startDay_input"
+END_FIELD_ID = "endDay_input"
+REQUEST_TIMEOUT = 20
+DEFAULT_USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                      "(KHTML, like Gecko) Chrome/120.0 Safari/537.36")
+
+def create_http_session(driver=None, pool_size=10):
+    """Create a keep-alive session, reusing cookies and user agent from an initialized browser."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    user_agent = DEFAULT_USER_AGENT
+    if driver is not None:
+        try:
+            user_agent = driver.execute_script("return navigator.userAgent") or user_agent
+        except Exception:
+            pass
+        for cookie in driver.get_cookies():
+            session.cookies.set(cookie["name"], cookie["value"],
+                                domain=cookie.get("domain"), path=cookie.get("path", "/"))
+    session.headers.update({
+        "User-Agent": user_agent,
+        "Accept-Language": "de-DE,de;q=0.9,en;q=0.8",
+    })
+    # Search forms are parsed once per airport page and reused for every combo
+    session.search_forms = {}
+    return session
+
+def parse_search_form(html, page_url):
+    """Return (action_url, method, fields, start_name, end_name) for the date search form."""
+    soup = BeautifulSoup(html, "html.parser")
+    start_input = soup.find(id=START_FIELD_ID)
+    end_input = soup.find(id=END_FIELD_ID)
+    if not start_input or not end_input:
+        return None
+
+    form = start_input.find_parent("form")
+    fields = {}
+    if form is not None:
+        for field in form.find_all(["input", "select", "textarea"]):
+            name = field.get("name")
+            if not name or field.get("type") in ("submit", "button", "image"):
+                continue
+            if field.get("type") in ("checkbox", "radio") and not field.has_attr("checked"):
+                continue
+            if field.name == "select":
+                option = field.find("option", selected=True) or field.find("option")
+                fields[name] = option.get("value", option.get_text()) if option else ""
+            else:
+                fields[name] = field.get("value", "")
+        action = form.get("action") or page_url
+        method = (form.get("method") or "get").lower()
+    else:
+        action, method = page_url, "get"
+
+    # The site's results URL is always the airport page with ?param=newSearch
+    action = urljoin(page_url, action)
+    if SEARCH_PARAM not in action:
+        action += ("&" if urlsplit(action).query else "?") + SEARCH_PARAM
+
+    start_name = start_input.get("name") or START_FIELD_ID
+    end_name = end_input.get("name") or END_FIELD_ID
+    return action, method, fields, start_name, end_name
+
+def parse_results_page(html):
+    """Parse a results page once for count_result_cards and has_next_page: lxml if installed, else bs4."""
+    if lxml_html is None:
+        return BeautifulSoup(html, "html.parser")
+    try:
+        return lxml_html.document_fromstring(html.encode("utf-8"), parser=lxml_html.HTMLParser(encoding="utf-8"))
+    except etree.ParserError:  # Nothing but whitespace
+        return lxml_html.document_fromstring("<html></html>")
+
+def _xpath_divs(name):
+    return f"//div[contains(concat(' ', normalize-space(@class), ' '), ' {name} ')]"
+
+def count_result_cards(page):
+    if isinstance(page, BeautifulSoup):
+        return len(page.find_all("div", class_="airport_search"))
+    return len(page.xpath(_xpath_divs("airport_search")))
+
+def has_next_page(page):
+    if isinstance(page, BeautifulSoup):
+        buttons = [(div.get("class", []), div.get_text(strip=True)) for div in page.find_all("div", class_="pag_text")]
+    else:
+        buttons = [(div.get("class", "").split(), "".join(t.strip() for t in div.itertext()))
+                   for div in page.xpath(_xpath_divs("pag_text"))]
+    return any("disabled" not in classes and text == "Next" for classes, text in buttons)
+
+def fetch_parking_results(url, session, departure_date, return_date, timeout=REQUEST_TIMEOUT):
+    """Replay the search form over HTTP. Returns the results HTML or None."""
+    form = session.search_forms.get(url)
+    if form is None:
+        response = session.get(url, timeout=timeout)
+        response.raise_for_status()
+        form = parse_search_form(response.text, response.url)
+        if form is None:
+            print(f"[!] Search form not found on {url}")
+            return None
+        session.search_forms[url] = form
+
+    action, method, fields, start_name, end_name = form
+    payload = dict(fields)
+    payload[start_name] = departure_date
+    payload[end_name] = return_date
+
+    if method == "post":
+        response = session.post(action, data=payload, headers={"Referer": url}, timeout=timeout)
+    else:
+        response = session.get(action, params=payload, headers={"Referer": url}, timeout=timeout)
+    response.raise_for_status()
+    return response.text
+
+def load_parking_results_http(url, driver, departure_date, return_date, session=None, reuse_page=False,
+                              extract_in_browser=False):
+    """Same contract as load_parking_results, but tries a plain HTTP request first.
+
+    Falls back to the browser when the response has no result cards or when the
+    results span several pages (pagination is driven by the site's JavaScript).
+    Without a browser, raises ScrapeFailure with the kind of failure.
+    """
+    if session is None:
+        session = create_http_session(driver)
+    failure = None
+    with metrics.stage("http_fetch", airport=url.split("/")[-1]) as info:
+        try:
+            html = fetch_parking_results(url, session, departure_date, return_date)
+            if html is None:
+                failure = (LAYOUT, "search form not found")
+        except requests.HTTPError as e:
+            print(f"[!] HTTP fetch failed for {url}: {e}")
+            html = None
+            status = e.response.status_code if e.response is not None else None
+            failure = (BLOCKED if status in (403, 429) else ERROR, str(e))
+        except requests.RequestException as e:
+            print(f"[!] HTTP fetch failed for {url}: {e}")
+            html = None
+            failure = (TIMEOUT if isinstance(e, (requests.Timeout, requests.ConnectionError)) else ERROR, str(e))
+        info["bytes"] = len(html.encode("utf-8")) if html else 0
+        if not html:
+            info["status"] = failure[0] if failure else "failed"
+
+    if html:
+        page = parse_results_page(html)
+        cards = count_result_cards(page)
+        if cards and not has_next_page(page):
+            print(f"[✓] HTTP fetch: {cards} results for {departure_date} → {return_date}")
+            return [(1, html)], url
+        fallback = ", using browser" if driver is not None else ""
+        if cards:
+            print(f"[⋅] Results are paginated{fallback}.")
+            failure = (NEEDS_BROWSER, f"{cards} results on several pages")
+        else:
+            print(f"[⋅] No results over HTTP{fallback}.")
+            failure = (classify_empty_page(html), "no result cards")
+
+    if driver is None:
+        kind, message = failure or (ERROR, "empty response")
+        raise ScrapeFailure(kind, message)
+    return load_parking_results(url, driver, departure_date, return_date, reuse_page=reuse_page,
+                                extract_in_browser=extract_in_browser)
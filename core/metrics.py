@@ -0,0 +1,151 @@
+import os
+import sys
+import json
+import math
+import time
+import threading
+from contextlib import contextmanager
+
+DEFAULT_METRICS_PATH = "metrics.jsonl"
+ENV_VAR = "PARKING_METRICS"   # Inherited by worker processes and the finalizer's extraction run
+
+_lock = threading.Lock()
+_file = None
+_file_path = None
+
+def configure(path=DEFAULT_METRICS_PATH):
+    """Turn metrics on for this process and every process it starts (None turns them off)."""
+    if path:
+        os.environ[ENV_VAR] = path
+    else:
+        os.environ.pop(ENV_VAR, None)
+
+def enabled():
+    return bool(os.environ.get(ENV_VAR))
+
+def record(stage, duration, status="ok", **fields):
+    """Append one measurement to the metrics file. Does nothing when metrics are off."""
+    global _file, _file_path
+    path = os.environ.get(ENV_VAR)
+    if not path:
+        return
+    entry = {"ts": round(time.time(), 3), "pid": os.getpid(), "stage": stage,
+             "duration": round(duration, 4), "status": status}
+    entry.update((k, v) for k, v in fields.items() if v is not None)
+    line = json.dumps(entry, ensure_ascii=False) + "\n"
+    with _lock:
+        if _file is None or _file_path != path:
+            # Line buffered append: each entry is one write, so processes don't interleave lines
+            _file = open(path, "a", encoding="utf-8", buffering=1)
+            _file_path = path
+        _file.write(line)
+
+@contextmanager
+def stage(name, **fields):
+    """Time a block as one stage. Yields a dict for extra fields (bytes, pages, ...);
+    set its "status" to "failed" for failures that don't raise."""
+    info = dict(fields)
+    start = time.perf_counter()
+    try:
+        yield info
+    except BaseException as e:
+        info.setdefault("status", "error")
+        info["error"] = type(e).__name__
+        raise
+    finally:
+        status = info.pop("status", "ok")
+        record(name, time.perf_counter() - start, status, **info)
+
+def load(path=DEFAULT_METRICS_PATH):
+    entries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    pass  # A line cut off by a crash
+    return entries
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(q / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+def aggregate(entries, by=("stage",)):
+    """Group entries by the given fields -> {key: {count, failures, p50, p95, total, bytes, pages}}."""
+    groups = {}
+    for entry in entries:
+        key = tuple(entry.get(field, "-") for field in by)
+        groups.setdefault(key, []).append(entry)
+
+    result = {}
+    for key, group in groups.items():
+        durations = sorted(e["duration"] for e in group)
+        result[key] = {
+            "count": len(group),
+            "failures": sum(e["status"] != "ok" for e in group),
+            "p50": percentile(durations, 50),
+            "p95": percentile(durations, 95),
+            "total": sum(durations),
+            "bytes": sum(e.get("bytes", 0) for e in group),
+            "pages": sum(e.get("pages", 0) for e in group),
+        }
+    return result
+
+def print_summary(entries):
+    for by in (("stage",), ("stage", "airport")):
+        print(f"\n{' / '.join(by)}")
+        print(f"{'':<48} {'count':>7} {'failed':>7} {'p50 s':>8} {'p95 s':>8} {'total s':>9} {'MB':>8} {'pages':>7}")
+        for key, s in sorted(aggregate(entries, by).items()):
+            print(f"{' / '.join(map(str, key)):<48} {s['count']:>7} {s['failures']:>7} {s['p50']:>8.3f} "
+                  f"{s['p95']:>8.3f} {s['total']:>9.1f} {s['bytes'] / 1e6:>8.2f} {s['pages']:>7}")
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def prometheus_text(entries):
+    """Prometheus text exposition format, one summary per stage and airport."""
+    lines = [
+        "# HELP parking_stage_duration_seconds Duration of scrape pipeline stages.",
+        "# TYPE parking_stage_duration_seconds summary",
+    ]
+    stats = aggregate(entries, ("stage", "airport"))
+    for (stage_name, airport), s in sorted(stats.items()):
+        labels = f'stage="{_label(stage_name)}",airport="{_label(airport)}"'
+        lines.append(f'parking_stage_duration_seconds{{{labels},quantile="0.5"}} {s["p50"]}')
+        lines.append(f'parking_stage_duration_seconds{{{labels},quantile="0.95"}} {s["p95"]}')
+        lines.append(f"parking_stage_duration_seconds_sum{{{labels}}} {round(s['total'], 4)}")
+        lines.append(f"parking_stage_duration_seconds_count{{{labels}}} {s['count']}")
+    for name, help_text, field in (
+            ("parking_stage_failures_total", "Failed stage runs.", "failures"),
+            ("parking_stage_bytes_total", "Bytes handled by a stage.", "bytes"),
+            ("parking_stage_pages_total", "Result pages handled by a stage.", "pages")):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} counter")
+        for (stage_name, airport), s in sorted(stats.items()):
+            lines.append(f'{name}{{stage="{_label(stage_name)}",airport="{_label(airport)}"}} {s[field]}')
+    return "\n".join(lines) + "\n"
+
+if __name__ == "__main__":
+    # python -m core.metrics [summary|prometheus] [metrics.jsonl] [output.prom]
+    command = sys.argv[1] if len(sys.argv) > 1 else "summary"
+    path = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_METRICS_PATH
+    if not os.path.exists(path):
+        print(f"[!] No metrics file at {path}. Run with --metrics first.")
+        sys.exit(1)
+    entries = load(path)
+    if command == "prometheus":
+        text = prometheus_text(entries)
+        if len(sys.argv) > 3:
+            with open(sys.argv[3], "w", encoding="utf-8") as f:
+                f.write(text)
+            print(f"[✓] Prometheus metrics written to {sys.argv[3]}")
+        else:
+            sys.stdout.write(text)
+    else:
+        print(f"[⋅] {len(entries)} measurements from {path}")
+        print_summary(entries)
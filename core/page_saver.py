@@ -0,0 +1,43 @@
+import os
+import json
+from core.page_store import get_store
+from core.parsers import page_size
+from core import metrics
+
+PARSED_SUFFIX = ".json"   # Pages extracted in the browser (main.py --browser-extract)
+
+def save_pages(pages, url, combo, output_folder="saved_pages", store_folder=None):
+    """Write each (page_number, content) to its own file: HTML as .html, cards extracted
+    in the browser as .json with the [title, place, cards] of core/parsers.py."""
+    name = url.split("/")[-1]
+    with metrics.stage("save_pages", airport=name, pages=len(pages),
+                       bytes=sum(page_size(content) for _, content in pages)):
+        return _save_pages(pages, name, combo, output_folder, store_folder)
+
+def _save_pages(pages, name, combo, output_folder, store_folder):
+    if store_folder:
+        store = get_store(store_folder)
+        for page_number, html in pages:
+            store.put(name, combo["from_raw"], combo["to_raw"], page_number, html)
+        print(f"[✓] Stored {len(pages)} page(s) for {name} {combo['from_raw']} → {combo['to_raw']} in {store_folder}")
+        return []
+
+    os.makedirs(output_folder, exist_ok=True)
+    saved_files = []
+    for page_number, content in pages:
+        suffix = f"_page{page_number}" if page_number > 1 else ""
+        extension = ".html" if isinstance(content, str) else PARSED_SUFFIX
+        filename = f"{name}_{combo['from_raw']}→{combo['to_raw']}{suffix}{extension}"
+        output_file = os.path.join(output_folder, filename)
+
+        if isinstance(content, str):
+            # Bytes, not text mode: the extract cache hashes exactly what core/pipeline.py
+            # hashed, and newline translation (Windows) would change them
+            with open(output_file, "wb") as f:
+                f.write(content.encode("utf-8"))
+        else:
+            with open(output_file, "w", encoding="utf-8") as f:
+                json.dump(content, f, ensure_ascii=False)
+        print(f"[✓] Saved: {output_file}")
+        saved_files.append(output_file)
+    return saved_files
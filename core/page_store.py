@@ -0,0 +1,193 @@
+import os
+import sqlite3
+import hashlib
+import threading
+from collections import namedtuple
+from datetime import datetime
+import zstandard as zstd
+
+DEFAULT_STORE_FOLDER = "page_store"
+COMPRESSION_LEVEL = 10
+DICT_SIZE = 112640          # zstd's default dictionary size (110 KiB)
+DICT_SAMPLE_PAGES = 500
+
+StoredPage = namedtuple("StoredPage", "store_folder airport from_date to_date page content_hash saved_at")
+
+class PageStore:
+    """Content-addressed, zstd-compressed store for result pages.
+
+    page_store/
+      manifest.sqlite          pages (airport, from, to, page) -> content hash, blobs, dictionaries
+      blobs/ab/abcdef....zst   one compressed blob per distinct page content
+
+    Identical pages are stored once. After train_dictionary() new blobs are compressed
+    with a dictionary shared by all pages, which is where most of the gain comes from
+    because result pages share almost all of their markup.
+    """
+
+    def __init__(self, folder=DEFAULT_STORE_FOLDER):
+        self.folder = folder
+        self.blob_folder = os.path.join(folder, "blobs")
+        os.makedirs(self.blob_folder, exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(os.path.join(folder, "manifest.sqlite"), timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS pages (
+                airport TEXT NOT NULL,
+                from_date TEXT NOT NULL,
+                to_date TEXT NOT NULL,
+                page INTEGER NOT NULL,
+                content_hash TEXT NOT NULL,
+                saved_at TEXT NOT NULL,
+                extracted_at TEXT,
+                PRIMARY KEY (airport, from_date, to_date, page)
+            );
+            CREATE INDEX IF NOT EXISTS pages_pending ON pages (extracted_at);
+            CREATE TABLE IF NOT EXISTS blobs (
+                content_hash TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                stored_size INTEGER NOT NULL,
+                dict_id INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS dictionaries (
+                dict_id INTEGER PRIMARY KEY,
+                data BLOB NOT NULL,
+                created_at TEXT NOT NULL
+            );
+        """)
+        self.conn.commit()
+        self._compressor = None
+        self._dict_id = None
+        self._decompressors = {}
+
+    def _blob_path(self, content_hash):
+        return os.path.join(self.blob_folder, content_hash[:2], content_hash + ".zst")
+
+    def _current_compressor(self):
+        if self._compressor is None:
+            row = self.conn.execute("SELECT dict_id, data FROM dictionaries ORDER BY created_at DESC LIMIT 1").fetchone()
+            if row:
+                self._dict_id = row[0]
+                self._compressor = zstd.ZstdCompressor(level=COMPRESSION_LEVEL, dict_data=zstd.ZstdCompressionDict(row[1]))
+            else:
+                self._dict_id = 0
+                self._compressor = zstd.ZstdCompressor(level=COMPRESSION_LEVEL)
+        return self._dict_id, self._compressor
+
+    def _decompressor(self, dict_id):
+        if dict_id not in self._decompressors:
+            if dict_id:
+                row = self.conn.execute("SELECT data FROM dictionaries WHERE dict_id = ?", (dict_id,)).fetchone()
+                self._decompressors[dict_id] = zstd.ZstdDecompressor(dict_data=zstd.ZstdCompressionDict(row[0]))
+            else:
+                self._decompressors[dict_id] = zstd.ZstdDecompressor()
+        return self._decompressors[dict_id]
+
+    def put(self, airport, from_date, to_date, page, html):
+        """Store one page and record it in the manifest. Returns its content hash."""
+        content = html.encode("utf-8")
+        page_hash = hashlib.sha256(content).hexdigest()
+        saved_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+        with self.lock:
+            known = self.conn.execute("SELECT 1 FROM blobs WHERE content_hash = ?", (page_hash,)).fetchone()
+            if not known:
+                dict_id, compressor = self._current_compressor()
+                compressed = compressor.compress(content)
+                # The row insert takes SQLite's write lock until commit, so when several
+                # processes store the same page only the one that inserted writes the blob.
+                cursor = self.conn.execute(
+                    "INSERT OR IGNORE INTO blobs (content_hash, size, stored_size, dict_id) VALUES (?, ?, ?, ?)",
+                    (page_hash, len(content), len(compressed), dict_id))
+                if cursor.rowcount:
+                    blob_path = self._blob_path(page_hash)
+                    os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                    tmp_path = f"{blob_path}.{os.getpid()}.tmp"
+                    with open(tmp_path, "wb") as f:
+                        f.write(compressed)
+                    os.replace(tmp_path, blob_path)
+            # A re-scraped combo replaces the older version and is extracted again
+            self.conn.execute("INSERT OR REPLACE INTO pages (airport, from_date, to_date, page, content_hash, saved_at, extracted_at) "
+                              "VALUES (?, ?, ?, ?, ?, ?, NULL)",
+                              (airport, from_date, to_date, page, page_hash, saved_at))
+            self.conn.commit()
+        return page_hash
+
+    def read_bytes(self, content_hash):
+        with self.lock:
+            row = self.conn.execute("SELECT dict_id FROM blobs WHERE content_hash = ?", (content_hash,)).fetchone()
+            if row is None:
+                raise KeyError(content_hash)
+            decompressor = self._decompressor(row[0])
+        with open(self._blob_path(content_hash), "rb") as f:
+            return decompressor.decompress(f.read())
+
+    def read_html(self, content_hash):
+        return self.read_bytes(content_hash).decode("utf-8")
+
+    def iter_pages(self, pending_only=True):
+        query = "SELECT airport, from_date, to_date, page, content_hash, saved_at FROM pages"
+        if pending_only:
+            query += " WHERE extracted_at IS NULL"
+        query += " ORDER BY airport, from_date, to_date, page"
+        with self.lock:
+            rows = self.conn.execute(query).fetchall()
+        return [StoredPage(self.folder, *row) for row in rows]
+
+    def mark_extracted(self, pages):
+        extracted_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        with self.lock:
+            self.conn.executemany(
+                "UPDATE pages SET extracted_at = ? WHERE airport = ? AND from_date = ? AND to_date = ? AND page = ? AND content_hash = ?",
+                [(extracted_at, p.airport, p.from_date, p.to_date, p.page, p.content_hash) for p in pages])
+            self.conn.commit()
+
+    def train_dictionary(self, sample_pages=DICT_SAMPLE_PAGES, dict_size=DICT_SIZE):
+        """Train a shared dictionary from the most recent pages; used for blobs written afterwards."""
+        with self.lock:
+            hashes = [row[0] for row in self.conn.execute(
+                "SELECT content_hash FROM blobs ORDER BY rowid DESC LIMIT ?", (sample_pages,))]
+        if len(hashes) < 10:
+            print(f"[!] Only {len(hashes)} pages stored, need at least 10 to train a dictionary.")
+            return None
+        samples = [self.read_bytes(h) for h in hashes]
+        dictionary = zstd.train_dictionary(dict_size, samples)
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO dictionaries (dict_id, data, created_at) VALUES (?, ?, ?)",
+                              (dictionary.dict_id(), dictionary.as_bytes(), datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+            self.conn.commit()
+            self._compressor = None
+        print(f"[✓] Trained zstd dictionary {dictionary.dict_id()} from {len(samples)} pages.")
+        return dictionary.dict_id()
+
+    def stats(self):
+        with self.lock:
+            pages, pending = self.conn.execute(
+                "SELECT COUNT(*), COUNT(*) - COUNT(extracted_at) FROM pages").fetchone()
+            blobs, size, stored = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(stored_size), 0) FROM blobs").fetchone()
+        return {"pages": pages, "pending": pending, "blobs": blobs, "raw_bytes": size, "stored_bytes": stored}
+
+    def close(self):
+        self.conn.close()
+
+_open_stores = {}
+_open_lock = threading.Lock()
+
+def get_store(folder=DEFAULT_STORE_FOLDER):
+    """One store connection per process and folder."""
+    with _open_lock:
+        if folder not in _open_stores:
+            _open_stores[folder] = PageStore(folder)
+        return _open_stores[folder]
+
+if __name__ == "__main__":
+    import sys
+    store = get_store(sys.argv[2] if len(sys.argv) > 2 else DEFAULT_STORE_FOLDER)
+    if len(sys.argv) > 1 and sys.argv[1] == "train":
+        store.train_dictionary()
+    stats = store.stats()
+    ratio = stats["raw_bytes"] / stats["stored_bytes"] if stats["stored_bytes"] else 0
+    print(f"[⋅] {stats['pages']} pages ({stats['pending']} not extracted), {stats['blobs']} unique blobs, "
+          f"{stats['raw_bytes'] / 1e6:.1f} MB raw → {stats['stored_bytes'] / 1e6:.1f} MB stored ({ratio:.1f}x)")
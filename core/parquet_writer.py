@@ -0,0 +1,140 @@
+import os
+import glob
+from datetime import datetime
+from core.writers import airport_filename
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional
+    pa = None
+
+ROWS_PER_FILE = 100000
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+# Rows of one extracted page share these; a page extracted again replaces its earlier rows
+PAGE_KEY = ("ScrapeLink", "ParkingFromDt", "ParkingToDt", "ScrapedAt")
+
+if pa is not None:
+    _DICT = pa.dictionary(pa.int32(), pa.string())
+    SCHEMA = pa.schema([
+        ("Title", pa.string()),
+        ("Place", pa.string()),
+        ("ParkingFromDt", pa.timestamp("s")),
+        ("ParkingToDt", pa.timestamp("s")),
+        ("DurationDays", pa.int32()),
+        ("DurationHours", pa.int32()),
+        ("Price", pa.float64()),
+        ("Currency", _DICT),
+        ("PricePerDay", pa.float64()),
+        ("PricePerHour", pa.float64()),
+        ("ParkingType", _DICT),
+        ("ParkingDetailType", _DICT),
+        ("ParkingSlug", _DICT),
+        ("Address", pa.string()),
+        ("IncludedServices", pa.list_(pa.string())),
+        ("BookingLink", pa.string()),
+        ("ScrapeLink", pa.string()),
+        ("ScrapedAt", pa.timestamp("s")),
+        ("Availability", _DICT),
+    ])
+    _TIMESTAMP_FIELDS = ("ParkingFromDt", "ParkingToDt", "ScrapedAt")
+    _FLOAT_FIELDS = ("Price", "PricePerDay", "PricePerHour")
+
+def _typed_value(field, value):
+    if value is None:
+        return None
+    if field in _TIMESTAMP_FIELDS:
+        return datetime.strptime(value, TIMESTAMP_FORMAT)
+    if field in _FLOAT_FIELDS:
+        return float(value)
+    return value
+
+def _page_keys(table):
+    return pc.binary_join_element_wise(*[pc.cast(table[name], pa.string()) for name in PAGE_KEY], "|")
+
+class ParquetWriter:
+    """Write records as a typed Parquet dataset partitioned by airport and scrape date.
+
+    Layout: <folder>/airport=<slug>/scrape_date=<YYYY-MM-DD>/part-<run>-<n>.parquet
+    (hive style, so pandas/pyarrow read the partition keys back as columns).
+    Rows are buffered per partition and flushed every ROWS_PER_FILE rows.
+
+    Writing is idempotent per page: on close, rows of earlier runs that belong to a
+    page written again in this run (same PAGE_KEY) are dropped from the partition,
+    so re-extracting an archive doesn't duplicate them.
+    """
+
+    def __init__(self, folder, rows_per_file=ROWS_PER_FILE):
+        if pa is None:
+            raise RuntimeError("Parquet output needs pyarrow: pip install pyarrow")
+        self.folder = folder
+        self.rows_per_file = rows_per_file
+        self.run_id = datetime.now().strftime("%Y%m%d%H%M%S")
+        self.buffers = {}
+        self.parts = {}
+        self.page_keys = {}
+        self.count = 0
+
+    def write(self, airport_slug, record):
+        partition = (airport_filename(airport_slug), record["ScrapedAt"][:10])
+        rows = self.buffers.setdefault(partition, [])
+        rows.append(record)
+        self.count += 1
+        if len(rows) >= self.rows_per_file:
+            self._flush(partition)
+
+    def _flush(self, partition):
+        rows = self.buffers.pop(partition, [])
+        if not rows:
+            return
+        columns = {
+            field.name: pa.array([_typed_value(field.name, row[field.name]) for row in rows], type=field.type)
+            for field in SCHEMA
+        }
+        table = pa.Table.from_pydict(columns, schema=SCHEMA)
+        self.page_keys.setdefault(partition, set()).update(_page_keys(table).to_pylist())
+        self._write_part(partition, table)
+
+    def _partition_folder(self, partition):
+        airport, scrape_date = partition
+        return os.path.join(self.folder, f"airport={airport}", f"scrape_date={scrape_date}")
+
+    def _write_part(self, partition, table):
+        folder = self._partition_folder(partition)
+        os.makedirs(folder, exist_ok=True)
+        n = self.parts.get(partition, 0)
+        self.parts[partition] = n + 1
+        pq.write_table(table, os.path.join(folder, f"part-{self.run_id}-{n:05d}.parquet"), compression="zstd")
+
+    def _drop_rewritten_pages(self, partition):
+        """Remove rows of earlier runs for the pages this run wrote to the partition."""
+        folder = self._partition_folder(partition)
+        own_prefix = os.path.join(folder, f"part-{self.run_id}-")
+        older = [path for path in sorted(glob.glob(os.path.join(folder, "part-*.parquet")))
+                 if not path.startswith(own_prefix)]
+        if not older:
+            return
+        table = pq.read_table(older, schema=SCHEMA, partitioning=None)
+        rewritten = pa.array(sorted(self.page_keys[partition]), type=pa.string())
+        kept = table.filter(pc.invert(pc.is_in(_page_keys(table), value_set=rewritten)))
+        if kept.num_rows == table.num_rows:
+            return
+        # Write what is kept before deleting, so a crash in between duplicates rows instead of losing them
+        if kept.num_rows:
+            self._write_part(partition, kept)
+        for path in older:
+            os.remove(path)
+
+    def close(self):
+        for partition in list(self.buffers):
+            self._flush(partition)
+        for partition in list(self.page_keys):
+            self._drop_rewritten_pages(partition)
+        self.page_keys.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,249 @@
+import re
+import json
+from bs4 import BeautifulSoup
+
+try:
+    from lxml import etree, html as lxml_html
+except ImportError:  # lxml is optional, BeautifulSoup is always available
+    etree = None
+
+# Bump when a backend starts extracting different card values; invalidates core.extract_cache
+EXTRACTOR_VERSION = "1"
+
+ADDRESS_PATTERN = re.compile("Adresse", re.IGNORECASE)
+BOOKING_PATTERN = re.compile("jetzt buchen", re.IGNORECASE)
+
+# Every backend returns (title, place, cards). A card holds the raw values of one
+# div.airport_search; turning them into records is done by extract_parking_data.
+#   available     False if the card contains div.not_available
+#   price_text    text of div.kjll, None if missing
+#   icons         data-bg values (lowercase) of the <p> tags in div.iconDiv
+#   slug          alt text of the logo image, "unknown" if missing
+#   covered       True if the card text mentions "überdacht" or "gedeckt"
+#   address       text of the element after the "Adresse" label, "unknown" if missing
+#   services      texts of the <li> tags in div.air_desript
+#   booking_link  href of the "Jetzt buchen" link, None if missing
+
+def _is_covered(text):
+    text = text.lower()
+    return 'überdacht' in text or 'gedeckt' in text
+
+def parse_page_bs4(html):
+    soup = BeautifulSoup(html, 'html.parser')
+
+    title = soup.title.string.strip() if soup.title else "unknown"
+    place_tag = soup.find('h2')
+    place = place_tag.get_text(strip=True) if place_tag else "unknown"
+
+    cards = []
+    for entry in soup.find_all('div', class_='airport_search'):
+        price_tag = entry.find('div', class_='kjll')
+
+        icon_div = entry.find('div', class_='iconDiv')
+        icons = [p.get('data-bg', '').lower() for p in icon_div.find_all('p')] if icon_div else []
+
+        slug_tag = entry.find('div', class_='logoIcon')
+        slug_img = slug_tag.find('img') if slug_tag else None
+
+        address_tag = entry.find(string=ADDRESS_PATTERN)
+        services_div = entry.find('div', class_='air_desript')
+        book_link_tag = entry.find('a', string=BOOKING_PATTERN)
+
+        cards.append({
+            "available": entry.find('div', class_='not_available') is None,
+            "price_text": price_tag.get_text() if price_tag else None,
+            "icons": icons,
+            "slug": slug_img.get('alt', '').strip() if slug_img else "unknown",
+            "covered": _is_covered(entry.get_text()),
+            "address": address_tag.find_next().get_text(strip=True) if address_tag else "unknown",
+            "services": [li.get_text(strip=True) for li in services_div.find_all('li')] if services_div else [],
+            "booking_link": book_link_tag['href'] if book_link_tag else None,
+        })
+    return title, place, cards
+
+if etree is not None:
+    def _has_class(name):
+        return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+    # get_text() in bs4 skips comments and the contents of script/style/template
+    _TEXT = ".//text()[not(ancestor::script) and not(ancestor::style) and not(ancestor::template)]"
+
+    _X_TITLE = etree.XPath("(//title)[1]")
+    _X_PLACE = etree.XPath("(//h2)[1]")
+    _X_CARDS = etree.XPath(f"//div[{_has_class('airport_search')}]")
+    _X_NOT_AVAILABLE = etree.XPath(f"boolean(.//div[{_has_class('not_available')}])")
+    _X_PRICE = etree.XPath(f"(.//div[{_has_class('kjll')}])[1]")
+    _X_ICON_DIV = etree.XPath(f"(.//div[{_has_class('iconDiv')}])[1]")
+    _X_LOGO = etree.XPath(f"(.//div[{_has_class('logoIcon')}])[1]")
+    _X_FIRST_IMG = etree.XPath("(.//img)[1]")
+    _X_SERVICES = etree.XPath(f"(.//div[{_has_class('air_desript')}])[1]")
+    _X_LI = etree.XPath(".//li")
+    _X_P = etree.XPath(".//p")
+    _X_LINKS = etree.XPath(".//a")
+    _X_TEXT = etree.XPath(_TEXT)
+    _X_ALL_TEXT = etree.XPath(".//text()")
+    _X_NEXT_AFTER_TEXT = etree.XPath("(descendant::*|following::*)[1]")
+    _X_NEXT_AFTER_TAIL = etree.XPath("following::*[1]")
+
+    def _get_text(el, strip=False):
+        if strip:
+            return "".join(t.strip() for t in _X_TEXT(el))
+        return "".join(_X_TEXT(el))
+
+    def _single_string(el):
+        """Equivalent of bs4's Tag.string: the only child string, descending through single children."""
+        contents = []
+        if el.text:
+            contents.append(el.text)
+        for child in el:
+            contents.append(child)
+            if child.tail:
+                contents.append(child.tail)
+        if len(contents) != 1:
+            return None
+        child = contents[0]
+        if isinstance(child, str):
+            return child
+        if not isinstance(child.tag, str):  # comment or processing instruction
+            return child.text
+        return _single_string(child)
+
+    def _find_next_element(text_node):
+        parent = text_node.getparent()
+        if text_node.is_tail:
+            found = _X_NEXT_AFTER_TAIL(parent)
+        else:
+            found = _X_NEXT_AFTER_TEXT(parent)
+        return found[0] if found else None
+
+    def parse_page_lxml(html):
+        if isinstance(html, str):
+            html = html.encode('utf-8')
+        root = lxml_html.document_fromstring(html, parser=lxml_html.HTMLParser(encoding='utf-8'))
+
+        title_tags = _X_TITLE(root)
+        title = _single_string(title_tags[0]).strip() if title_tags else "unknown"
+        place_tags = _X_PLACE(root)
+        place = _get_text(place_tags[0], strip=True) if place_tags else "unknown"
+
+        cards = []
+        for entry in _X_CARDS(root):
+            price_tags = _X_PRICE(entry)
+
+            icon_divs = _X_ICON_DIV(entry)
+            icons = [p.get('data-bg', '').lower() for p in _X_P(icon_divs[0])] if icon_divs else []
+
+            logo_divs = _X_LOGO(entry)
+            slug_imgs = _X_FIRST_IMG(logo_divs[0]) if logo_divs else []
+
+            address = "unknown"
+            for text_node in _X_ALL_TEXT(entry):
+                if ADDRESS_PATTERN.search(text_node):
+                    next_tag = _find_next_element(text_node)
+                    address = _get_text(next_tag, strip=True)
+                    break
+
+            services_divs = _X_SERVICES(entry)
+
+            booking_link = None
+            for link in _X_LINKS(entry):
+                link_text = _single_string(link)
+                if link_text is not None and BOOKING_PATTERN.search(link_text):
+                    booking_link = link.attrib['href']
+                    break
+
+            cards.append({
+                "available": not _X_NOT_AVAILABLE(entry),
+                "price_text": _get_text(price_tags[0]) if price_tags else None,
+                "icons": icons,
+                "slug": slug_imgs[0].get('alt', '').strip() if slug_imgs else "unknown",
+                "covered": _is_covered(_get_text(entry)),
+                "address": address,
+                "services": [_get_text(li, strip=True) for li in _X_LI(services_divs[0])] if services_divs else [],
+                "booking_link": booking_link,
+            })
+        return title, place, cards
+
+# In-browser version of the parsers above for main.py --browser-extract: one execute_script
+# returns [title, place, cards] with the same card fields, so only that JSON leaves the
+# browser instead of the whole page_source. Uses plain DOM traversal, no selectors.
+BROWSER_EXTRACT_JS = r"""
+const SKIP = {SCRIPT: 1, STYLE: 1, TEMPLATE: 1};
+function hasClass(el, name) {
+    return (' ' + (el.getAttribute('class') || '').replace(/\s+/g, ' ') + ' ').indexOf(' ' + name + ' ') !== -1;
+}
+function elements(root, out) {
+    for (const child of root.childNodes) {
+        if (child.nodeType === 1) { out.push(child); elements(child, out); }
+    }
+    return out;
+}
+function find(els, tag, cls) {
+    return els.filter(el => el.tagName.toLowerCase() === tag && (!cls || hasClass(el, cls)));
+}
+function texts(root, out, all) {
+    for (const child of root.childNodes) {
+        if (child.nodeType === 3) out.push(child);
+        else if (child.nodeType === 1 && (all || !SKIP[child.tagName.toUpperCase()])) texts(child, out, all);
+    }
+    return out;
+}
+function getText(el, strip) {
+    return texts(el, [], false).map(t => strip ? t.nodeValue.trim() : t.nodeValue).join('');
+}
+function singleString(el) {
+    if (el.childNodes.length !== 1) return null;
+    const child = el.childNodes[0];
+    return child.nodeType === 1 ? singleString(child) : child.nodeValue;
+}
+function nextElement(node) {
+    for (let n = node; n; n = n.parentNode) {
+        for (let s = n.nextSibling; s; s = s.nextSibling) if (s.nodeType === 1) return s;
+    }
+    return null;
+}
+const all = elements(document, []);
+const titleTag = find(all, 'title')[0];
+const placeTag = find(all, 'h2')[0];
+const cards = find(all, 'div', 'airport_search').map(entry => {
+    const els = elements(entry, []);
+    const price = find(els, 'div', 'kjll')[0];
+    const iconDiv = find(els, 'div', 'iconDiv')[0];
+    const logo = find(els, 'div', 'logoIcon')[0];
+    const img = logo ? find(elements(logo, []), 'img')[0] : null;
+    const services = find(els, 'div', 'air_desript')[0];
+    const addressText = texts(entry, [], true).find(t => /Adresse/i.test(t.nodeValue));
+    const addressTag = addressText ? nextElement(addressText) : null;
+    const booking = find(els, 'a').find(a => { const s = singleString(a); return s !== null && /jetzt buchen/i.test(s); });
+    const text = getText(entry, false).toLowerCase();
+    return {
+        available: find(els, 'div', 'not_available').length === 0,
+        price_text: price ? getText(price, false) : null,
+        icons: iconDiv ? find(elements(iconDiv, []), 'p').map(p => (p.getAttribute('data-bg') || '').toLowerCase()) : [],
+        slug: img ? (img.getAttribute('alt') || '').trim() : 'unknown',
+        covered: text.includes('überdacht') || text.includes('gedeckt'),
+        address: addressTag ? getText(addressTag, true) : 'unknown',
+        services: services ? find(elements(services, []), 'li').map(li => getText(li, true)) : [],
+        booking_link: booking ? booking.getAttribute('href') : null,
+    };
+});
+return [titleTag ? (singleString(titleTag) || '').trim() : 'unknown',
+        placeTag ? getText(placeTag, true) : 'unknown', cards];
+"""
+
+def page_size(content):
+    """Bytes of a collected page: its HTML, or the JSON of a page extracted in the browser."""
+    if isinstance(content, str):
+        return len(content.encode('utf-8'))
+    return len(json.dumps(content, ensure_ascii=False).encode('utf-8'))
+
+BACKENDS = {"bs4": parse_page_bs4}
+if etree is not None:
+    BACKENDS["lxml"] = parse_page_lxml
+DEFAULT_BACKEND = "lxml" if "lxml" in BACKENDS else "bs4"
+
+def parse_page(html, backend=None):
+    backend = backend or DEFAULT_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown parser backend '{backend}'. Available: {', '.join(sorted(BACKENDS))}")
+    return BACKENDS[backend](html)
@@ -0,0 +1,92 @@
+import os
+import queue
+import threading
+from datetime import datetime
+from core.writers import NdjsonWriter
+from core.extract_cache import DEFAULT_CACHE_PATH, content_hash
+from core import metrics
+
+LIVE_FOLDER = os.path.join("json_out", "live")
+QUEUE_SIZE = 8   # Combos waiting for extraction before the scraper has to wait
+
+class ExtractionPipeline:
+    """Extract result pages in a background thread while the scraper loads the next combo.
+
+    submit() hands over the pages of one combo through a bounded queue, so the scraper
+    only blocks when extraction falls QUEUE_SIZE combos behind. Records are appended to
+    one NDJSON file per airport in LIVE_FOLDER and flushed after every combo. Parses go
+    to the extract cache, so the final extract_parking_data.py run doesn't parse these
+    pages again.
+    """
+
+    def __init__(self, folder=LIVE_FOLDER, backend=None, cache_path=DEFAULT_CACHE_PATH, queue_size=QUEUE_SIZE):
+        self.writer = NdjsonWriter(folder)
+        self.folder = folder
+        self.backend = backend
+        self.cache_path = cache_path
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.thread = threading.Thread(target=self._run, name="extraction-pipeline", daemon=True)
+        self.combos = 0
+        self.errors = 0
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def submit(self, pages, url, combo):
+        scraped_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self.queue.put((pages, url, combo, scraped_at))
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            pages, url, combo, scraped_at = item
+            try:
+                records = self._extract(pages, url, combo, scraped_at)
+                for airport_slug, record in records:
+                    self.writer.write(airport_slug, record)
+                self.writer.flush()
+                self.combos += 1
+                print(f"[✓] Extracted {len(records)} records for {url.split('/')[-1]} "
+                      f"{combo['from_raw']} → {combo['to_raw']}")
+            except Exception as e:
+                self.errors += 1
+                print(f"❌ Extraction failed for {url} {combo['from_raw']} → {combo['to_raw']}: {e}")
+
+    def _extract(self, pages, url, combo, scraped_at):
+        # Imported here: extract_parking_data is the top-level extraction script
+        from extract_parking_data import parse_cached, parse_content, parse_dates_from_filename, build_records
+        start_dt, end_dt = parse_dates_from_filename(f"{combo['from_raw']}→{combo['to_raw']}")
+        records = []
+        for _, page in pages:
+            if not isinstance(page, str):
+                # Already extracted in the browser (--browser-extract)
+                records.extend(build_records(page, url, start_dt, end_dt, scraped_at))
+                continue
+            # Same bytes as the saved page, so the final run finds this parse in the cache
+            content = page.encode("utf-8")
+            with metrics.stage("extract_page", airport=url.split("/")[-1], bytes=len(content), pipeline=True) as info:
+                if self.cache_path:
+                    parsed = parse_cached(content_hash(content), lambda: content, self.backend, self.cache_path)
+                else:
+                    parsed = parse_content(content, self.backend)
+                page_records = build_records(parsed, url, start_dt, end_dt, scraped_at)
+                info["records"] = len(page_records)
+            records.extend(page_records)
+        return records
+
+    def close(self):
+        """Extract whatever is still queued, then stop the thread."""
+        self.queue.put(None)
+        self.thread.join()
+        self.writer.close()
+        print(f"[⋅] Pipeline: {self.writer.count} records from {self.combos} combinations in {self.folder}"
+              + (f", {self.errors} failed" if self.errors else ""))
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,365 @@
+import json
+import time
+import sqlite3
+import argparse
+import threading
+from datetime import datetime
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+DEFAULT_PRICE_STORE = "prices.sqlite"
+DEFAULT_ADDRESS = "127.0.0.1:8767"
+BATCH_SIZE = 5000   # Records per write transaction
+QUERIES = ("cheapest", "history", "curve", "airports")
+# Pages of one scrape of a combo are saved this close together; offers last seen earlier
+# than that before the combo's latest scrape are no longer on the site
+SCRAPE_WINDOW = "-30 minutes"
+
+class PriceStore:
+    """Offers and their price history in SQLite, indexed for the usual questions.
+
+    offers has one row per (airport, from_day, to_day, provider, parking_type) with the
+    latest price; cheapest and duration_curve only count offers that were in the latest
+    scrape of their combo, so one that dropped off the site doesn't keep its last price; prices keeps every (offer, scraped_at) price, so re-extracting the
+    same pages adds nothing. Queries read only the index ranges they need, never the
+    whole dataset.
+    """
+
+    def __init__(self, path=DEFAULT_PRICE_STORE):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.lock = threading.Lock()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS offers (
+                id INTEGER PRIMARY KEY,
+                airport TEXT NOT NULL,
+                from_day TEXT NOT NULL,
+                to_day TEXT NOT NULL,
+                provider TEXT NOT NULL,
+                parking_type TEXT NOT NULL,
+                detail_type TEXT,
+                title TEXT,
+                from_dt TEXT,
+                to_dt TEXT,
+                duration_days INTEGER,
+                duration_hours INTEGER,
+                price REAL NOT NULL,
+                price_per_day REAL,
+                available INTEGER NOT NULL,
+                booking_link TEXT,
+                scraped_at TEXT NOT NULL,
+                UNIQUE (airport, from_day, to_day, provider, parking_type)
+            );
+            CREATE INDEX IF NOT EXISTS offers_cheapest ON offers (airport, from_day, to_day, available, price);
+            CREATE INDEX IF NOT EXISTS offers_duration ON offers (airport, duration_days, price);
+            CREATE TABLE IF NOT EXISTS prices (
+                offer_id INTEGER NOT NULL,
+                scraped_at TEXT NOT NULL,
+                price REAL NOT NULL,
+                available INTEGER NOT NULL,
+                PRIMARY KEY (offer_id, scraped_at)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS airports (airport TEXT PRIMARY KEY);
+        """)
+        self.conn.commit()
+
+    def add(self, records):
+        """Add (airport_slug, record) pairs from extract_parking_data in one transaction.
+        The latest price of an offer only moves forward in scrape time."""
+        offers = []
+        for airport_slug, record in records:
+            offers.append({
+                "airport": airport_slug,
+                "from_day": record["ParkingFromDt"][:10],
+                "to_day": record["ParkingToDt"][:10],
+                "provider": record["ParkingSlug"],
+                "parking_type": record["ParkingType"],
+                "detail_type": record["ParkingDetailType"],
+                "title": record["Title"],
+                "from_dt": record["ParkingFromDt"],
+                "to_dt": record["ParkingToDt"],
+                "duration_days": record["DurationDays"],
+                "duration_hours": record["DurationHours"],
+                "price": float(record["Price"]),
+                "price_per_day": record["PricePerDay"],
+                "available": int(record["Availability"] == "available"),
+                "booking_link": record["BookingLink"],
+                "scraped_at": record["ScrapedAt"],
+            })
+        with self.lock, self.conn:
+            self.conn.executemany("INSERT OR IGNORE INTO airports (airport) VALUES (?)",
+                                  [(airport,) for airport in {offer["airport"] for offer in offers}])
+            self.conn.executemany("""
+                INSERT INTO offers (airport, from_day, to_day, provider, parking_type, detail_type, title, from_dt,
+                                    to_dt, duration_days, duration_hours, price, price_per_day, available,
+                                    booking_link, scraped_at)
+                VALUES (:airport, :from_day, :to_day, :provider, :parking_type, :detail_type, :title, :from_dt,
+                        :to_dt, :duration_days, :duration_hours, :price, :price_per_day, :available,
+                        :booking_link, :scraped_at)
+                ON CONFLICT (airport, from_day, to_day, provider, parking_type) DO UPDATE SET
+                    detail_type = excluded.detail_type, title = excluded.title, from_dt = excluded.from_dt,
+                    to_dt = excluded.to_dt, duration_days = excluded.duration_days,
+                    duration_hours = excluded.duration_hours, price = excluded.price,
+                    price_per_day = excluded.price_per_day, available = excluded.available,
+                    booking_link = excluded.booking_link, scraped_at = excluded.scraped_at
+                WHERE excluded.scraped_at > offers.scraped_at
+                   OR (excluded.scraped_at = offers.scraped_at AND excluded.price < offers.price)""", offers)
+            # Two cards of one provider and type in the same scrape keep the cheaper price
+            self.conn.executemany("""
+                INSERT INTO prices (offer_id, scraped_at, price, available)
+                SELECT id, :scraped_at, :price, :available FROM offers
+                WHERE airport = :airport AND from_day = :from_day AND to_day = :to_day
+                  AND provider = :provider AND parking_type = :parking_type
+                ON CONFLICT (offer_id, scraped_at) DO UPDATE SET price = MIN(price, excluded.price)""", offers)
+        return len(offers)
+
+    def _rows(self, query, params=()):
+        # One connection shared by the API's threads
+        with self.lock:
+            return [dict(row) for row in self.conn.execute(query, params)]
+
+    def resolve_airport(self, name):
+        """Stored airport name for 'hannover', 'Frankfurt', ...: exact match first (any case),
+        then the only airport containing the name. Raises ValueError otherwise."""
+        airports = self.airports()
+        exact = [a for a in airports if a.lower() == name.lower()]
+        if exact:
+            return exact[0]
+        matches = [a for a in airports if name.lower() in a.lower()]
+        if len(matches) == 1:
+            return matches[0]
+        if not matches:
+            raise ValueError(f"no airport matches {name!r}")
+        raise ValueError(f"{name!r} matches several airports: {', '.join(matches)}")
+
+    def airports(self):
+        return [row["airport"] for row in self._rows("SELECT airport FROM airports ORDER BY airport")]
+
+    def cheapest(self, airport, from_day, to_day, n=5, parking_type=None, include_unavailable=False):
+        """The n cheapest offers in the latest scrape of one combo."""
+        airport = self.resolve_airport(airport)
+        query = ("SELECT provider, parking_type, detail_type, price, price_per_day, available, scraped_at, booking_link "
+                 "FROM offers WHERE airport = ? AND from_day = ? AND to_day = ? "
+                 "AND scraped_at >= (SELECT datetime(MAX(scraped_at), ?) FROM offers "
+                 "WHERE airport = ? AND from_day = ? AND to_day = ?)")
+        params = [airport, from_day, to_day, SCRAPE_WINDOW, airport, from_day, to_day]
+        if not include_unavailable:
+            query += " AND available = 1"
+        if parking_type:
+            # 'shuttle' also matches 'shuttle | valet'
+            query += " AND parking_type LIKE ?"
+            params.append(f"%{parking_type}%")
+        query += " ORDER BY price LIMIT ?"
+        params.append(n)
+        return self._rows(query, params)
+
+    def history(self, airport, from_day, to_day, provider=None, parking_type=None):
+        """Every scraped price of one combo, per provider and type, oldest first."""
+        query = ("SELECT o.provider, o.parking_type, p.scraped_at, p.price, p.available "
+                 "FROM offers o JOIN prices p ON p.offer_id = o.id "
+                 "WHERE o.airport = ? AND o.from_day = ? AND o.to_day = ?")
+        params = [self.resolve_airport(airport), from_day, to_day]
+        if provider:
+            query += " AND o.provider = ?"
+            params.append(provider)
+        if parking_type:
+            query += " AND o.parking_type LIKE ?"
+            params.append(f"%{parking_type}%")
+        query += " ORDER BY o.provider, o.parking_type, p.scraped_at"
+        return self._rows(query, params)
+
+    def duration_curve(self, airport, provider=None, parking_type=None, from_day=None):
+        """Available prices in the latest scrape of each combo, by stay length:
+        offers, min, average and max price, min per day."""
+        airport = self.resolve_airport(airport)
+        query = ("WITH latest AS (SELECT from_day, to_day, datetime(MAX(scraped_at), ?) AS since "
+                 "FROM offers WHERE airport = ? GROUP BY from_day, to_day) "
+                 "SELECT o.duration_days, COUNT(*) AS offers, MIN(o.price) AS min_price, "
+                 "ROUND(AVG(o.price), 2) AS avg_price, MAX(o.price) AS max_price, MIN(o.price_per_day) AS min_per_day "
+                 "FROM offers o JOIN latest l ON o.from_day = l.from_day AND o.to_day = l.to_day "
+                 "WHERE o.airport = ? AND o.available = 1 AND o.scraped_at >= l.since")
+        params = [SCRAPE_WINDOW, airport, airport]
+        if provider:
+            query += " AND o.provider = ?"
+            params.append(provider)
+        if parking_type:
+            query += " AND o.parking_type LIKE ?"
+            params.append(f"%{parking_type}%")
+        if from_day:
+            query += " AND o.from_day = ?"
+            params.append(from_day)
+        query += " GROUP BY o.duration_days ORDER BY o.duration_days"
+        return self._rows(query, params)
+
+    def stats(self):
+        return self._rows("SELECT (SELECT COUNT(*) FROM airports) AS airports, "
+                          "(SELECT COUNT(*) FROM offers) AS offers, (SELECT COUNT(*) FROM prices) AS prices")[0]
+
+    def close(self):
+        self.conn.close()
+
+class PriceStoreWriter:
+    """Writer for extract_parking_data.py (--format sqlite): buffers records and adds
+    them to the price store BATCH_SIZE at a time."""
+
+    def __init__(self, path=DEFAULT_PRICE_STORE, batch_size=BATCH_SIZE):
+        self.store = PriceStore(path)
+        self.batch_size = batch_size
+        self.buffer = []
+        self.count = 0
+
+    def write(self, airport_slug, record):
+        self.buffer.append((airport_slug, record))
+        self.count += 1
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.store.add(self.buffer)
+            self.buffer = []
+
+    def close(self):
+        self.flush()
+        self.store.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def day(value):
+    """argparse type: YYYY-MM-DD."""
+    return datetime.strptime(value, "%Y-%m-%d").strftime("%Y-%m-%d")
+
+def combo_days(value):
+    """'2025-12-02→2025-12-05' or '2025-12-02:2025-12-05' -> (from_day, to_day)."""
+    for separator in ("→", ":", ","):
+        if separator in value:
+            from_day, to_day = value.split(separator, 1)
+            return day(from_day.strip()), day(to_day.strip())
+    raise argparse.ArgumentTypeError(f"expected FROM→TO, e.g. 2025-12-02→2025-12-05, got {value!r}")
+
+def run_query(store, command, params):
+    """Run one query by name with string parameters (CLI and HTTP). Returns a list of rows."""
+    if command == "airports":
+        return [{"airport": airport} for airport in store.airports()]
+    if command == "cheapest":
+        from_day, to_day = combo_days(params["combo"])
+        return store.cheapest(params["airport"], from_day, to_day, n=int(params.get("n") or 5),
+                              parking_type=params.get("type"),
+                              include_unavailable=params.get("all") in (True, "1", "true"))
+    if command == "history":
+        from_day, to_day = combo_days(params["combo"])
+        return store.history(params["airport"], from_day, to_day, provider=params.get("provider"),
+                             parking_type=params.get("type"))
+    if command == "curve":
+        return store.duration_curve(params["airport"], provider=params.get("provider"),
+                                    parking_type=params.get("type"),
+                                    from_day=day(params["from"]) if params.get("from") else None)
+    raise ValueError(f"unknown query {command!r}")
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        if url.path.strip("/") not in QUERIES:
+            self._send(404, {"error": f"unknown query {url.path}, use one of /{', /'.join(QUERIES)}"})
+            return
+        start = time.perf_counter()
+        try:
+            rows = run_query(self.server.store, url.path.strip("/"), params)
+        except KeyError as e:
+            self._send(400, {"error": f"missing parameter {e}"})
+            return
+        except (ValueError, argparse.ArgumentTypeError) as e:
+            self._send(400, {"error": str(e)})
+            return
+        self._send(200, {"rows": rows, "ms": round((time.perf_counter() - start) * 1000, 3)})
+
+    def _send(self, status, result):
+        body = json.dumps(result, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def serve(store, address=DEFAULT_ADDRESS):
+    """Answer the queries over HTTP: GET /cheapest?airport=hannover&combo=2025-12-02:2025-12-05&type=shuttle&n=3,
+    /history?airport=..&combo=..[&provider=..], /curve?airport=..[&provider=..&from=..], /airports."""
+    host, _, port = address.rpartition(":")
+    server = ThreadingHTTPServer((host or "127.0.0.1", int(port)), _Handler)
+    server.daemon_threads = True
+    server.store = store
+    print(f"[⋅] Price store API on http://{host}:{server.server_address[1]} "
+          f"(/cheapest, /history, /curve, /airports)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+def print_rows(rows):
+    if not rows:
+        print("[⋅] No matching offers.")
+        return
+    columns = list(rows[0])
+    widths = [max(len(str(column)), *(len(str(row[column])) for row in rows)) for column in columns]
+    print("  ".join(f"{column:<{width}}" for column, width in zip(columns, widths)).rstrip())
+    for row in rows:
+        print("  ".join(f"{str(row[column]):<{width}}" for column, width in zip(columns, widths)).rstrip())
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Query the price store written by extract_parking_data.py --format sqlite.")
+    parser.add_argument("--db", default=DEFAULT_PRICE_STORE, help=f"Price store file (default: {DEFAULT_PRICE_STORE})")
+    parser.add_argument("--json", action="store_true", help="Print the rows as JSON")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("airports", help="Airports in the store")
+    cheapest = commands.add_parser("cheapest", help="Cheapest offers of one combo")
+    cheapest.add_argument("airport")
+    cheapest.add_argument("combo", help="FROM→TO or FROM:TO, e.g. 2025-12-02:2025-12-05")
+    cheapest.add_argument("-n", type=int, default=5)
+    cheapest.add_argument("--type", help="Parking type, e.g. shuttle or valet")
+    cheapest.add_argument("--all", action="store_true", help="Include offers that were unavailable")
+    history = commands.add_parser("history", help="Price history of one combo")
+    history.add_argument("airport")
+    history.add_argument("combo")
+    history.add_argument("--provider", help="ParkingSlug of one provider")
+    history.add_argument("--type")
+    curve = commands.add_parser("curve", help="Price by stay length")
+    curve.add_argument("airport")
+    curve.add_argument("--provider")
+    curve.add_argument("--type")
+    curve.add_argument("--from", help="Only stays starting on this day (YYYY-MM-DD)")
+    api = commands.add_parser("serve", help="Answer the same queries over HTTP")
+    api.add_argument("address", nargs="?", default=DEFAULT_ADDRESS, help=f"HOST:PORT (default: {DEFAULT_ADDRESS})")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    # python -m core.price_store cheapest hannover 2025-12-02:2025-12-05 --type shuttle -n 3
+    args = parse_args()
+    store = PriceStore(args.db)
+    if args.command == "serve":
+        serve(store, args.address)
+    else:
+        start = time.perf_counter()
+        try:
+            rows = run_query(store, args.command, vars(args))
+        except (ValueError, argparse.ArgumentTypeError) as e:
+            print(f"❌ {e}")
+            raise SystemExit(1)
+        elapsed = (time.perf_counter() - start) * 1000
+        if args.json:
+            print(json.dumps(rows, ensure_ascii=False, indent=2))
+        else:
+            print_rows(rows)
+            print(f"[⋅] {len(rows)} rows in {elapsed:.2f} ms")
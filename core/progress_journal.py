@@ -0,0 +1,284 @@
+import os
+import time
+import sqlite3
+from core.failures import ERROR, max_attempts, retry_delay
+
+DEFAULT_JOURNAL_PATH = "progress.sqlite"
+
+PENDING = "pending"
+IN_FLIGHT = "in_flight"
+DONE = "done"
+FAILED = "failed"
+
+class ProgressJournal:
+    """Durable per-combo progress in SQLite (WAL mode).
+
+    One row per (airport_url, from_raw, to_raw) with its state, attempt count and timings.
+    Every state change is its own committed transaction, so a crash loses at most the
+    combo that was being scraped, and claim() hands each pending combo to exactly one
+    worker even when several processes share the journal.
+    """
+
+    def __init__(self, path=DEFAULT_JOURNAL_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS combos (
+                airport_url TEXT NOT NULL,
+                from_raw TEXT NOT NULL,
+                to_raw TEXT NOT NULL,
+                from_date TEXT NOT NULL,
+                to_date TEXT NOT NULL,
+                state TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                claimed_by TEXT,
+                started_at REAL,
+                finished_at REAL,
+                duration REAL,
+                last_error TEXT,
+                priority REAL NOT NULL DEFAULT 0,
+                failure_kind TEXT,
+                next_attempt_at REAL,
+                lease_until REAL,
+                PRIMARY KEY (airport_url, from_raw, to_raw)
+            );
+            CREATE INDEX IF NOT EXISTS combos_state ON combos (state, airport_url);
+        """)
+        # Journals written by older versions lack the newer columns
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(combos)")]
+        for column, definition in (("priority", "REAL NOT NULL DEFAULT 0"),
+                                   ("failure_kind", "TEXT"),
+                                   ("next_attempt_at", "REAL"),
+                                   ("lease_until", "REAL")):
+            if column not in columns:
+                self.conn.execute(f"ALTER TABLE combos ADD COLUMN {column} {definition}")
+
+    def seed(self, schedule, airport_urls=None):
+        """Add the scheduled (airport_url, combo, priority) entries that aren't in the journal yet
+        and update the priority of unfinished ones.
+
+        Unfinished combos outside the schedule (dates that are in the past by now, or
+        combos the scheduler skipped) are dropped so they are never claimed. With
+        airport_urls (a schedule of only some airports) that is limited to those airports;
+        the unfinished combos of the others are kept.
+        """
+        rows = [(url, c["from_raw"], c["to_raw"], c["from"], c["to"], priority) for url, c, priority in schedule]
+        with self.conn:
+            self.conn.execute("BEGIN")
+            self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS grid (airport_url, from_raw, to_raw)")
+            self.conn.execute("DELETE FROM grid")
+            self.conn.executemany("INSERT INTO grid VALUES (?, ?, ?)", [row[:3] for row in rows])
+            scope = ""
+            if airport_urls is not None:
+                self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS scope (airport_url)")
+                self.conn.execute("DELETE FROM scope")
+                self.conn.executemany("INSERT INTO scope VALUES (?)", [(url,) for url in airport_urls])
+                scope = " AND airport_url IN (SELECT airport_url FROM scope)"
+            self.conn.execute(
+                "DELETE FROM combos WHERE state != 'done' AND (airport_url, from_raw, to_raw) NOT IN "
+                "(SELECT airport_url, from_raw, to_raw FROM grid)" + scope)
+            self.conn.executemany(
+                "INSERT INTO combos (airport_url, from_raw, to_raw, from_date, to_date, priority) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (airport_url, from_raw, to_raw) DO UPDATE SET priority = excluded.priority "
+                "WHERE state != 'done'",
+                rows)
+
+    def import_legacy_log(self, log_file):
+        """Mark the combos listed in an old progress.log as done, then empty the log."""
+        if not os.path.exists(log_file) or os.stat(log_file).st_size == 0:
+            return 0
+        with open(log_file, "r", encoding="utf-8") as f:
+            keys = [line.strip().split("|") for line in f if line.strip()]
+        keys = [k for k in keys if len(k) == 3]
+        with self.conn:
+            self.conn.execute("BEGIN")
+            self.conn.executemany(
+                "UPDATE combos SET state = 'done' WHERE airport_url = ? AND from_raw = ? AND to_raw = ?", keys)
+        open(log_file, "w", encoding="utf-8").close()
+        print(f"[✓] Imported {len(keys)} completed combinations from {log_file}")
+        return len(keys)
+
+    def requeue(self, claimed_by=None, include_failed=False):
+        """Return in-flight combos (left by a crash) to pending. Returns the number requeued.
+
+        claimed_by limits it to one worker's combos. include_failed also gives combos
+        that ran out of attempts a new set of attempts.
+        """
+        states = "('in_flight', 'failed')" if include_failed else "('in_flight')"
+        query = (f"UPDATE combos SET state = 'pending', next_attempt_at = NULL, "
+                 f"attempts = CASE WHEN state = 'failed' THEN 0 ELSE attempts END WHERE state IN {states}")
+        params = []
+        if claimed_by is not None:
+            query += " AND claimed_by = ?"
+            params.append(claimed_by)
+        return self.conn.execute(query, params).rowcount
+
+    def fail_in_flight(self, claimed_by, error):
+        """Fail the combos a (dead) worker still holds, so they are retried. Returns how many there were."""
+        rows = self.conn.execute(
+            "SELECT airport_url, from_raw, to_raw FROM combos WHERE state = 'in_flight' AND claimed_by = ?",
+            (claimed_by,)).fetchall()
+        for airport_url, from_raw, to_raw in rows:
+            self.mark_failed(airport_url, {"from_raw": from_raw, "to_raw": to_raw}, error, ERROR)
+        return len(rows)
+
+    def claim(self, worker, airport_url=None, lease=None):
+        """Atomically take the pending combo with the highest priority whose retry time has come.
+        Returns (airport_url, combo) or None.
+
+        A retry goes to a different worker than the one it failed on when another worker asks first.
+        With lease (seconds), the claim expires unless renew() extends it (see expire_leases).
+        """
+        now = time.time()
+        query = "SELECT rowid FROM combos WHERE state = 'pending' AND (next_attempt_at IS NULL OR next_attempt_at <= ?)"
+        params = [IN_FLIGHT, worker, now, now + lease if lease else None, now]
+        if airport_url is not None:
+            query += " AND airport_url = ?"
+            params.append(airport_url)
+        query += " ORDER BY claimed_by IS ?, priority DESC, airport_url, from_raw, to_raw LIMIT 1"
+        params.append(worker)
+        row = self.conn.execute(
+            f"UPDATE combos SET state = ?, attempts = attempts + 1, claimed_by = ?, started_at = ?, lease_until = ?, "
+            f"finished_at = NULL, duration = NULL, next_attempt_at = NULL WHERE rowid = ({query}) "
+            f"RETURNING airport_url, from_raw, to_raw, from_date, to_date", params).fetchone()
+        if row is None:
+            return None
+        url, from_raw, to_raw, from_date, to_date = row
+        return url, {"from": from_date, "to": to_date, "from_raw": from_raw, "to_raw": to_raw}
+
+    def renew(self, worker, lease, airport_url, combo):
+        """Extend the lease of the combo the worker is scraping. Returns 1 if it still holds it, else 0.
+
+        Only that combo: one the worker failed to deliver must still expire.
+        """
+        return self.conn.execute(
+            "UPDATE combos SET lease_until = ? WHERE state = 'in_flight' AND claimed_by = ? AND lease_until IS NOT NULL "
+            "AND airport_url = ? AND from_raw = ? AND to_raw = ?",
+            (time.time() + lease, worker, airport_url, combo["from_raw"], combo["to_raw"])).rowcount
+
+    def release(self, worker, airport_url, combo):
+        """Put a combo the worker holds back to pending right away (it couldn't deliver it). Returns 1 or 0."""
+        return self.conn.execute(
+            "UPDATE combos SET state = 'pending', lease_until = NULL, next_attempt_at = NULL "
+            "WHERE state = 'in_flight' AND claimed_by = ? AND airport_url = ? AND from_raw = ? AND to_raw = ?",
+            (worker, airport_url, combo["from_raw"], combo["to_raw"])).rowcount
+
+    def expire_leases(self):
+        """Fail in-flight combos whose lease ran out (their node stopped sending heartbeats),
+        so they are handed out again. Returns the workers that lost combos."""
+        # One write transaction, so a combo finished in the meantime is never put back
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = self.conn.execute(
+                "SELECT airport_url, from_raw, to_raw, claimed_by FROM combos "
+                "WHERE state = 'in_flight' AND lease_until IS NOT NULL AND lease_until < ?", (time.time(),)).fetchall()
+            for airport_url, from_raw, to_raw, claimed_by in rows:
+                self.mark_failed(airport_url, {"from_raw": from_raw, "to_raw": to_raw},
+                                 f"lease of {claimed_by} expired", ERROR)
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        return [claimed_by for *_, claimed_by in rows]
+
+    def state(self, airport_url, combo):
+        """(state, claimed_by) of one combo, or None if it isn't in the journal."""
+        return self.conn.execute(
+            "SELECT state, claimed_by FROM combos WHERE airport_url = ? AND from_raw = ? AND to_raw = ?",
+            (airport_url, combo["from_raw"], combo["to_raw"])).fetchone()
+
+    def _finish(self, airport_url, combo, state, error=None, kind=None, next_attempt_at=None):
+        now = time.time()
+        self.conn.execute(
+            "UPDATE combos SET state = ?, finished_at = ?, duration = ? - started_at, last_error = ?, "
+            "failure_kind = ?, next_attempt_at = ? WHERE airport_url = ? AND from_raw = ? AND to_raw = ?",
+            (state, now, now, error, kind, next_attempt_at, airport_url, combo["from_raw"], combo["to_raw"]))
+
+    def mark_done(self, airport_url, combo):
+        self._finish(airport_url, combo, DONE)
+
+    def mark_failed(self, airport_url, combo, error, kind=ERROR):
+        """Put the combo back to pending with a backoff delay, or give up on it once
+        it has used the attempts of its failure kind (core/failures.py).
+        Returns the retry delay in seconds, or None when it was given up."""
+        row = self.conn.execute(
+            "SELECT attempts FROM combos WHERE airport_url = ? AND from_raw = ? AND to_raw = ?",
+            (airport_url, combo["from_raw"], combo["to_raw"])).fetchone()
+        attempts = row[0] if row else 0
+        if attempts < max_attempts(kind):
+            delay = retry_delay(kind, attempts)
+            self._finish(airport_url, combo, PENDING, error, kind, time.time() + delay)
+            return delay
+        self._finish(airport_url, combo, FAILED, error, kind)
+        return None
+
+    def next_retry_at(self, airport_url=None):
+        """Earliest time a pending combo may be claimed, or None if nothing is pending."""
+        query = "SELECT COUNT(*), MAX(COALESCE(next_attempt_at, 0) = 0), MIN(next_attempt_at) FROM combos WHERE state = 'pending'"
+        params = []
+        if airport_url is not None:
+            query += " AND airport_url = ?"
+            params.append(airport_url)
+        pending, claimable_now, earliest = self.conn.execute(query, params).fetchone()
+        if not pending:
+            return None
+        return time.time() if claimable_now else earliest
+
+    def is_complete(self, airport_url):
+        """True once every combo of the airport is done or has run out of attempts."""
+        row = self.conn.execute(
+            "SELECT COUNT(*) FROM combos WHERE airport_url = ? AND state IN ('pending', 'in_flight')",
+            (airport_url,)).fetchone()
+        return row[0] == 0
+
+    def counts(self, airport_url=None):
+        query = "SELECT state, COUNT(*) FROM combos"
+        params = []
+        if airport_url is not None:
+            query += " WHERE airport_url = ?"
+            params.append(airport_url)
+        return dict(self.conn.execute(query + " GROUP BY state", params).fetchall())
+
+    def has_entries(self):
+        return self.conn.execute("SELECT 1 FROM combos LIMIT 1").fetchone() is not None
+
+    def reset(self):
+        """Forget all progress (start of a new scraping cycle)."""
+        self.conn.execute("DELETE FROM combos")
+        self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self):
+        self.conn.close()
+
+def wait_for_retry(journal, airport_url=None, max_wait=None):
+    """Sleep until the next pending combo may be retried. Returns False if nothing is pending."""
+    retry_at = journal.next_retry_at(airport_url)
+    if retry_at is None:
+        return False
+    delay = max(retry_at - time.time(), 0)
+    if max_wait is not None:
+        delay = min(delay, max_wait)
+    if delay > 0:
+        print(f"[⋅] Waiting {delay:.0f}s before the next retry...")
+        time.sleep(delay)
+    return True
+
+def format_counts(counts):
+    return ", ".join(f"{counts.get(state, 0)} {state}" for state in (DONE, PENDING, IN_FLIGHT, FAILED))
+
+if __name__ == "__main__":
+    journal = ProgressJournal()
+    print(f"[⋅] {format_counts(journal.counts())}")
+    for url, state, n, avg in journal.conn.execute(
+            "SELECT airport_url, state, COUNT(*), AVG(duration) FROM combos GROUP BY airport_url, state"):
+        avg_text = f", avg {avg:.1f}s" if avg else ""
+        print(f"    {url} {state}: {n}{avg_text}")
+    for url, from_raw, to_raw, attempts, kind, error in journal.conn.execute(
+            "SELECT airport_url, from_raw, to_raw, attempts, failure_kind, last_error FROM combos WHERE state = 'failed'"):
+        print(f"[!] {url}|{from_raw}|{to_raw} gave up after {attempts} attempt(s) ({kind}): {error}")
+    for kind, n in journal.conn.execute(
+            "SELECT failure_kind, COUNT(*) FROM combos WHERE state = 'pending' AND failure_kind IS NOT NULL "
+            "GROUP BY failure_kind"):
+        print(f"[⋅] {n} combination(s) waiting for a retry after: {kind}")
@@ -0,0 +1,162 @@
+import os
+import json
+import sqlite3
+import hashlib
+from datetime import datetime
+from statistics import mean, pstdev
+
+DEFAULT_HISTORY_PATH = "combo_history.sqlite"
+PRUNED_PATH = os.path.join("json_out", "pruned_combos.json")   # Combos the last schedule skipped
+HISTORY_RUNS = 5          # Most recent observations of a combo used for scoring
+STABLE_RUNS = 3           # Identical results in a row before a combo may be skipped
+MAX_SKIP_AGE_DAYS = 3     # Skipped combos are scraped again once their last scrape is this old
+UNSEEN_PRIORITY = 1e9     # Combos that were never scraped go first
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+def airport_key(link):
+    """Airport part of an airport URL or scrape link: '.../parken-flughafen-bremen' -> 'parken-flughafen-bremen'.
+
+    Also works for the dummy links extraction builds from file names
+    ('https://dummy-link/parken-flughafen-bremen_2025-05-21→2025-05-29.html').
+    """
+    return link.rstrip("/").split("/")[-1].split("_")[0]
+
+def record_combo_key(record):
+    """(airport, from date, to date) of a parking_data.json record, as combos are keyed here."""
+    return airport_key(record["ScrapeLink"]), record["ParkingFromDt"][:10], record["ParkingToDt"][:10]
+
+def save_pruned(skipped, path=PRUNED_PATH):
+    """Remember the combos a schedule skipped; extraction carries their previous records over."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(sorted(skipped), f)
+
+def load_pruned(path=PRUNED_PATH):
+    """{(airport, from date, to date)} skipped by the last schedule, empty if it skipped none."""
+    if not os.path.exists(path):
+        return set()
+    with open(path, "r", encoding="utf-8") as f:
+        return {tuple(key) for key in json.load(f)}
+
+class ComboHistory:
+    """Per-combo results of previous runs, read from parking_data.json.
+
+    One observation per (airport, from date, to date, scrape day): when it was
+    scraped, the cheapest available price and a signature of all offers
+    (slug, price, availability), so unchanged results can be recognised.
+    """
+
+    def __init__(self, path=DEFAULT_HISTORY_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS observations (
+                airport TEXT NOT NULL,
+                from_date TEXT NOT NULL,
+                to_date TEXT NOT NULL,
+                scrape_day TEXT NOT NULL,
+                scraped_at TEXT NOT NULL,
+                offers INTEGER NOT NULL,
+                min_price REAL,
+                signature TEXT NOT NULL,
+                PRIMARY KEY (airport, from_date, to_date, scrape_day)
+            )""")
+        self.conn.commit()
+
+    def ingest(self, json_path):
+        """Add the combos of a parking_data.json. Files seen before add nothing. Returns the number added."""
+        if not os.path.exists(json_path):
+            return 0
+        with open(json_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        combos = {}
+        for records in data.values():
+            for record in records:
+                key = (*record_combo_key(record), record["ScrapedAt"][:10])
+                combo = combos.setdefault(key, {"scraped_at": record["ScrapedAt"], "offers": []})
+                combo["scraped_at"] = max(combo["scraped_at"], record["ScrapedAt"])
+                combo["offers"].append((record["ParkingSlug"], record["Price"], record["Availability"]))
+
+        rows = []
+        for key, combo in combos.items():
+            offers = sorted(combo["offers"])
+            prices = []
+            for _, price, availability in offers:
+                try:
+                    if availability == "available":
+                        prices.append(float(price))
+                except (TypeError, ValueError):
+                    pass
+            signature = hashlib.sha1(json.dumps(offers, ensure_ascii=False).encode("utf-8")).hexdigest()
+            rows.append((*key, combo["scraped_at"], len(offers), min(prices) if prices else None, signature))
+
+        before = self.conn.total_changes
+        with self.conn:
+            self.conn.executemany("INSERT OR IGNORE INTO observations VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return self.conn.total_changes - before
+
+    def observations(self, airport, limit=HISTORY_RUNS):
+        """{(from_date, to_date): [(scraped_at, min_price, signature), ...]} for one airport, newest first."""
+        result = {}
+        rows = self.conn.execute(
+            "SELECT from_date, to_date, scraped_at, min_price, signature FROM observations "
+            "WHERE airport = ? ORDER BY scraped_at DESC", (airport,))
+        for from_date, to_date, scraped_at, min_price, signature in rows:
+            runs = result.setdefault((from_date, to_date), [])
+            if len(runs) < limit:
+                runs.append((scraped_at, min_price, signature))
+        return result
+
+    def close(self):
+        self.conn.close()
+
+def score_combo(observations, now):
+    """Return (priority, skip) for one combo from its recent observations (newest first).
+
+    Priority grows with the age of the last scrape, weighted by how volatile the
+    combo has been: how often its offers changed between runs plus the relative
+    spread of its cheapest price. A combo whose last STABLE_RUNS results were
+    identical is skipped until its last scrape is MAX_SKIP_AGE_DAYS old.
+    """
+    if not observations:
+        return UNSEEN_PRIORITY, False
+
+    last_scrape = datetime.strptime(observations[0][0], TIMESTAMP_FORMAT)
+    age_days = max((now - last_scrape).total_seconds() / 86400, 0)
+
+    signatures = [signature for _, _, signature in observations]
+    if len(signatures) > 1:
+        changes = sum(a != b for a, b in zip(signatures, signatures[1:]))
+        volatility = changes / (len(signatures) - 1)
+    else:
+        volatility = 1.0  # Unknown, treat as volatile
+    prices = [price for _, price, _ in observations if price is not None]
+    if len(prices) > 1 and mean(prices):
+        volatility += pstdev(prices) / mean(prices)
+
+    stable = len(signatures) >= STABLE_RUNS and len(set(signatures[:STABLE_RUNS])) == 1
+    skip = stable and age_days < MAX_SKIP_AGE_DAYS
+    return age_days * (1 + volatility), skip
+
+def build_schedule(airport_urls, dates_for, history, now=None, prune=True):
+    """Score every combo of every airport's grid.
+
+    dates_for(airport_url) returns the date combos of that airport.
+    Returns ([(airport_url, combo, priority), ...], [(airport, from date, to date) of skipped combos]).
+    With prune=False nothing is skipped, combos are only ordered.
+    """
+    now = now or datetime.now()
+    schedule = []
+    skipped = []
+    for airport_url in airport_urls:
+        airport = airport_key(airport_url)
+        observed = history.observations(airport)
+        for combo in dates_for(airport_url):
+            priority, skip = score_combo(observed.get((combo["from_raw"], combo["to_raw"]), []), now)
+            if skip and prune:
+                skipped.append((airport, combo["from_raw"], combo["to_raw"]))
+                continue
+            schedule.append((airport_url, combo, priority))
+    return schedule, skipped
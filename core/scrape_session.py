@@ -0,0 +1,97 @@
+import shutil
+import threading
+from core.browser_controller import create_driver, initialize_session, load_parking_results
+from core.http_fetcher import create_http_session, load_parking_results_http
+from core.failures import ScrapeFailure, RESTART_KINDS
+
+PROFILE_ROOT = "browser_profiles"
+
+# undetected_chromedriver patches its driver binary on start; browsers must not race on it.
+# Threads of one process share this lock, worker processes pass a multiprocessing lock.
+_start_lock = threading.Lock()
+
+def combo_key_for(airport_url, combo):
+    return f"{airport_url}|{combo['from_raw']}|{combo['to_raw']}"
+
+class ScrapeSession:
+    """One browser (or, with no_browser, a plain HTTP session) that scrapes one combo at a time.
+
+    Used by the serial loop, the worker processes, the daemon's browser pool and
+    coordinator nodes. The session (cookies & popup) is set up on the first combo's
+    airport page. After a failure that spoils it (RESTART_KINDS) the browser and its
+    profile are thrown away, and the next combo starts a fresh one.
+    """
+
+    def __init__(self, name="main", headless=False, profile_dir=None, block_resources=False, use_http=False,
+                 no_browser=False, reuse_page=False, extract_in_browser=False, start_lock=None, driver=None):
+        self.name = name
+        self.headless = headless
+        self.profile_dir = profile_dir
+        self.block_resources = block_resources
+        self.use_http = use_http or no_browser
+        self.no_browser = no_browser
+        self.reuse_page = reuse_page
+        self.extract_in_browser = extract_in_browser
+        self.start_lock = start_lock or _start_lock
+        self.driver = driver
+        self.http_session = None
+        self.ready = False
+
+    def start(self, airport_url):
+        """Start the browser if there is none and set up its session on airport_url."""
+        if self.driver is None and not self.no_browser:
+            with self.start_lock:
+                self.driver = create_driver(headless=self.headless, profile_dir=self.profile_dir,
+                                            block_resources=self.block_resources)
+        if self.driver is not None:
+            print(f"[⋅] {self.name}: initializing session on {airport_url}")
+            self.driver.get(airport_url)
+            initialize_session(self.driver)
+        self.http_session = create_http_session(self.driver) if self.use_http else None
+        self.ready = True
+
+    def scrape(self, airport_url, combo):
+        """Result pages of one combo -> (pages, url). Raises ScrapeFailure, after
+        restarting the browser when the failure spoiled its session."""
+        if not self.ready:
+            self.start(airport_url)
+        print(f"[⋅] {self.name}: {combo['from']} → {combo['to']} ({airport_url})")
+        try:
+            if self.http_session is not None:
+                return load_parking_results_http(airport_url, self.driver, combo["from"], combo["to"],
+                                                 session=self.http_session, reuse_page=self.reuse_page,
+                                                 extract_in_browser=self.extract_in_browser)
+            return load_parking_results(airport_url, self.driver, combo["from"], combo["to"],
+                                        reuse_page=self.reuse_page, extract_in_browser=self.extract_in_browser)
+        except ScrapeFailure as e:
+            if e.kind in RESTART_KINDS and self.driver is not None:
+                self.restart()
+            raise
+
+    def restart(self):
+        """Throw the browser away with its profile (cookies of a blocked session would get
+        blocked again); the next combo starts a fresh one."""
+        print(f"[⋅] {self.name}: restarting the browser with a fresh profile.")
+        self.quit()
+        if self.profile_dir:
+            shutil.rmtree(self.profile_dir, ignore_errors=True)
+
+    def quit(self):
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception:
+                pass  # Already dead
+        self.driver = None
+        self.http_session = None
+        self.ready = False
+
+def report_failure(journal, airport_url, combo, failure, name="main"):
+    """Put a failed combo up for retry. Returns the delay in seconds, None if it was given up."""
+    delay = journal.mark_failed(airport_url, combo, str(failure), failure.kind)
+    combo_key = combo_key_for(airport_url, combo)
+    if delay is None:
+        print(f"[✖] {name}: giving up on {combo_key} ({failure.kind}): {failure}")
+    else:
+        print(f"[!] {name}: {failure.kind} for {combo_key}, retrying in {delay:.0f}s: {failure}")
+    return delay
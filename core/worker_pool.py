@@ -0,0 +1,78 @@
+import os
+import multiprocessing as mp
+from core.browser_controller import enable_screenshots
+from core.page_saver import save_pages
+from core.progress_journal import ProgressJournal, wait_for_retry
+from core.failures import ScrapeFailure
+from core.scrape_session import ScrapeSession, PROFILE_ROOT, report_failure
+
+RETRY_POLL = 30   # Longest a worker sleeps before checking the journal again while only retries are left
+
+def worker_name(worker_id):
+    return f"worker-{worker_id}"
+
+def _worker(worker_id, journal_path, start_lock, use_http=False, store_folder=None,
+            reuse_page=False, block_resources=False, extract_in_browser=False):
+    """Own one headless browser and scrape combos claimed from the journal until none are pending."""
+    journal = ProgressJournal(journal_path)
+    name = worker_name(worker_id)
+    session = ScrapeSession(name=f"Worker {worker_id}", headless=True,
+                            profile_dir=os.path.join(PROFILE_ROOT, f"worker_{worker_id}"),
+                            block_resources=block_resources, use_http=use_http, reuse_page=reuse_page,
+                            extract_in_browser=extract_in_browser, start_lock=start_lock)
+    try:
+        while True:
+            unit = journal.claim(name)
+            if unit is None:
+                # Other workers may still fail combos back to pending, so poll instead of sleeping it out
+                if wait_for_retry(journal, max_wait=RETRY_POLL):
+                    continue
+                break
+            airport_url, combo = unit
+            try:
+                pages, url = session.scrape(airport_url, combo)
+            except ScrapeFailure as e:
+                report_failure(journal, airport_url, combo, e, name=session.name)
+                continue
+
+            save_pages(pages, url, combo, store_folder=store_folder)
+            journal.mark_done(airport_url, combo)
+    except Exception as e:
+        print(f"[✖] Worker {worker_id} crashed: {e}")
+    finally:
+        session.quit()
+        journal.close()
+
+def run_worker_pool(journal_path, workers, use_http=False, store_folder=None, reuse_page=False, block_resources=False,
+                    screenshots=False, extract_in_browser=False):
+    """Scrape every pending combo of the journal with `workers` browser processes.
+
+    Workers claim combos from the journal themselves, so no combo is handed out twice.
+    A failed combo goes back to pending with a backoff delay and is preferably picked
+    up by another worker. A combo left in flight by a crashed worker is failed the same way
+    and retried on the next run.
+    """
+    if screenshots:
+        enable_screenshots()
+    journal = ProgressJournal(journal_path)
+    pending = journal.counts().get("pending", 0)
+    if not pending:
+        journal.close()
+        return
+
+    ctx = mp.get_context("spawn")
+    start_lock = ctx.Lock()
+    workers = min(workers, pending)
+    processes = [ctx.Process(target=_worker, args=(i, journal_path, start_lock, use_http, store_folder,
+                                                   reuse_page, block_resources, extract_in_browser), daemon=True)
+                 for i in range(workers)]
+    for p in processes:
+        p.start()
+    print(f"[⋅] Started {workers} browser workers for {pending} combinations.")
+
+    for i, p in enumerate(processes):
+        p.join()
+        lost = journal.fail_in_flight(worker_name(i), "worker exited")
+        if lost:
+            print(f"[!] Worker {i} exited with {lost} combination(s) in flight.")
+    journal.close()
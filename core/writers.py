@@ -0,0 +1,221 @@
+import os
+import re
+import json
+import heapq
+import shutil
+import tempfile
+
+INDEX_FILE = "index.json"
+SORT_CHUNK_SIZE = 50000  # Records held in memory per sorted run
+
+def airport_filename(airport_slug):
+    return re.sub(r"[^\w.-]+", "_", airport_slug).strip("_") or "unknown"
+
+class NdjsonWriter:
+    """Append records to one NDJSON file per airport as soon as they arrive.
+
+    index.json in the same folder maps each file back to its airport name.
+    """
+
+    def __init__(self, folder):
+        self.folder = folder
+        os.makedirs(folder, exist_ok=True)
+        self.index = load_index(folder)
+        self.files = {}
+        self.count = 0
+
+    def write(self, airport_slug, record):
+        f = self.files.get(airport_slug)
+        if f is None:
+            filename = self.index.get(airport_slug) or self._new_filename(airport_slug)
+            self.index[airport_slug] = filename
+            f = open(os.path.join(self.folder, filename), "a", encoding="utf-8")
+            self.files[airport_slug] = f
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.count += 1
+
+    def _new_filename(self, airport_slug):
+        base = airport_filename(airport_slug)
+        taken = set(self.index.values())
+        filename = f"{base}.ndjson"
+        n = 2
+        while filename in taken:
+            filename = f"{base}_{n}.ndjson"
+            n += 1
+        return filename
+
+    def flush(self):
+        """Make everything written so far visible to readers of the folder."""
+        for f in self.files.values():
+            f.flush()
+        self._write_index()
+
+    def close(self):
+        for f in self.files.values():
+            f.close()
+        self.files = {}
+        self._write_index()
+
+    def _write_index(self):
+        with open(os.path.join(self.folder, INDEX_FILE), "w", encoding="utf-8") as f:
+            json.dump(self.index, f, indent=2, ensure_ascii=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def text_log_line(record):
+    """A record in the line format of text_out/parkinglist_saved_pages.log."""
+    airport_code = record["ScrapeLink"].split("?")[0].rstrip("/").split("/")[-1].replace("parken-flughafen-", "")
+    return json.dumps({
+        "ScrapeSource": "parkinglist",
+        "AirportSlug": airport_code,
+        "IATA": airport_code.upper(),
+        "ParkingSlug": record["ParkingSlug"],
+        "ParkingType": record["ParkingType"],
+        "ParkingFromDt": record["ParkingFromDt"][:16],
+        "ParkingToDt": record["ParkingToDt"][:16],
+        "Price": record["Price"],
+        "Currency": record["Currency"],
+        "ScrapeLink": record["ScrapeLink"],
+    }, ensure_ascii=False)
+
+class TextLogWriter:
+    """Write records as text log lines. The log is replaced when the writer is closed."""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.tmp_path = path + ".tmp"
+        self.file = open(self.tmp_path, "w", encoding="utf-8")
+        self.count = 0
+
+    def write(self, airport_slug, record):
+        self.file.write(text_log_line(record) + "\n")
+        self.count += 1
+
+    def close(self):
+        if self.file is None:
+            return
+        self.file.close()
+        self.file = None
+        os.replace(self.tmp_path, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class MultiWriter:
+    """Hand every record to several writers, so one extraction pass feeds all outputs."""
+
+    def __init__(self, writers):
+        self.writers = list(writers)
+        self.count = 0
+
+    def write(self, airport_slug, record):
+        for writer in self.writers:
+            writer.write(airport_slug, record)
+        self.count += 1
+
+    def close(self):
+        for writer in self.writers:
+            writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def load_index(folder):
+    path = os.path.join(folder, INDEX_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def _sort_key(field):
+    return lambda line: json.loads(line)[field]
+
+def iter_sorted_lines(path, sort_field="DurationDays", reverse=True, chunk_size=SORT_CHUNK_SIZE):
+    """External merge sort of an NDJSON file. Yields the lines in sorted order.
+
+    Sorted runs of at most chunk_size lines are spilled to temporary files and merged,
+    so memory stays bounded by the chunk size. Both steps are stable, so records with
+    the same key keep their file order, like sorted() on the whole list.
+    """
+    key = _sort_key(sort_field)
+    run_dir = tempfile.mkdtemp(prefix="sort_runs_")
+    run_files = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            chunk = []
+            for line in f:
+                if line.strip():
+                    chunk.append(line if line.endswith("\n") else line + "\n")
+                if len(chunk) >= chunk_size:
+                    run_files.append(_write_run(run_dir, len(run_files), sorted(chunk, key=key, reverse=reverse)))
+                    chunk = []
+            if chunk or not run_files:
+                run_files.append(_write_run(run_dir, len(run_files), sorted(chunk, key=key, reverse=reverse)))
+
+        handles = [open(run, "r", encoding="utf-8") for run in run_files]
+        try:
+            yield from heapq.merge(*handles, key=key, reverse=reverse)
+        finally:
+            for h in handles:
+                h.close()
+    finally:
+        shutil.rmtree(run_dir, ignore_errors=True)
+
+def _write_run(run_dir, n, lines):
+    run_path = os.path.join(run_dir, f"run_{n}.ndjson")
+    with open(run_path, "w", encoding="utf-8") as f:
+        f.writelines(lines)
+    return run_path
+
+def sort_ndjson_folder(folder, sort_field="DurationDays", reverse=True):
+    """Sort every airport file of an NDJSON folder in place."""
+    for filename in load_index(folder).values():
+        path = os.path.join(folder, filename)
+        tmp_path = path + ".sorting"
+        with open(tmp_path, "w", encoding="utf-8") as out:
+            out.writelines(iter_sorted_lines(path, sort_field, reverse))
+        os.replace(tmp_path, path)
+
+def write_grouped_json(folder, output_json, sort_field="DurationDays", reverse=True):
+    """Stream an NDJSON folder into the airport-keyed JSON layout of parking_data.json.
+
+    The output is identical to json.dump(data, indent=2, ensure_ascii=False) with each
+    airport's list sorted by sort_field (pass sort_field=None to keep file order).
+    """
+    index = load_index(folder)
+    tmp_path = output_json + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as out:
+        if not index:
+            out.write("{}")
+        else:
+            out.write("{")
+            for i, (airport_slug, filename) in enumerate(index.items()):
+                path = os.path.join(folder, filename)
+                if sort_field:
+                    lines = iter_sorted_lines(path, sort_field, reverse)
+                else:
+                    lines = open(path, "r", encoding="utf-8")
+                out.write(("," if i else "") + "\n  " + json.dumps(airport_slug, ensure_ascii=False) + ": [")
+                first = True
+                for line in lines:
+                    if not line.strip():
+                        continue
+                    record = json.dumps(json.loads(line), indent=2, ensure_ascii=False)
+                    out.write(("" if first else ",") + "\n    " + record.replace("\n", "\n    "))
+                    first = False
+                out.write("]" if first else "\n  ]")
+                if not sort_field:
+                    lines.close()
+            out.write("\n}")
+    os.replace(tmp_path, output_json)
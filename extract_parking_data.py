@@ -1,16 +1,40 @@
 import os
 import json
 import re
-from bs4 import BeautifulSoup
+import argparse
+import shutil
 from datetime import datetime
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from core.parsers import parse_page, BACKENDS, DEFAULT_BACKEND
+from core.writers import NdjsonWriter, TextLogWriter, MultiWriter, write_grouped_json, sort_ndjson_folder
+from core.parquet_writer import ParquetWriter
+from core.price_store import PriceStoreWriter, DEFAULT_PRICE_STORE
+from core.extract_cache import get_cache, content_hash, DEFAULT_CACHE_PATH
+from core.page_store import StoredPage, get_store, DEFAULT_STORE_FOLDER
+from core.page_saver import PARSED_SUFFIX
+from core.scheduler import load_pruned, record_combo_key
+from core import metrics
 
 INPUT_FOLDER = 'saved_pages'
 AIRPORTS_FILE = os.path.join('core', 'airports.txt')
 OUTPUT_FOLDER = 'json_out'
 os.makedirs(OUTPUT_FOLDER, exist_ok=True)
 OUTPUT_JSON = os.path.join(OUTPUT_FOLDER, 'parking_data.json')
+NDJSON_FOLDER = os.path.join(OUTPUT_FOLDER, 'ndjson')
+STAGING_FOLDER = os.path.join(OUTPUT_FOLDER, '.staging')
+PARQUET_FOLDER = os.path.join(OUTPUT_FOLDER, 'parquet')
+TEXT_LOG = os.path.join('text_out', 'parkinglist_saved_pages.log')
+SITE_URL = 'https://www.parkinglist.de/flughafen-parken'
+FORMATS = ("json", "ndjson", "parquet", "sqlite", "text")
+
+# Field order of the compact tuples returned by process workers
+RECORD_FIELDS = (
+    "Title", "Place", "ParkingFromDt", "ParkingToDt", "DurationDays", "DurationHours",
+    "Price", "Currency", "PricePerDay", "PricePerHour", "ParkingType", "ParkingDetailType",
+    "ParkingSlug", "Address", "IncludedServices", "BookingLink", "ScrapeLink", "ScrapedAt",
+    "Availability",
+)
 
 
 def parse_dates_from_filename(filename):
@@ -22,61 +46,108 @@ def parse_dates_from_filename(filename):
         return start, end
     return None, None
 
-def detect_parking_type(icon_div):
-    parking_types = set()
-    if icon_div:
-        for icon in icon_div.find_all('p'):
-            bg = icon.get('data-bg', '').lower()
-            if 'shuttle' in bg:
-                parking_types.add('shuttle')
-            if 'valet' in bg:
-                parking_types.add('valet')
+def detect_parking_type(icons):
+    # dict keeps the first-seen order so the output doesn't depend on set hashing
+    parking_types = {}
+    for bg in icons:
+        if 'shuttle' in bg:
+            parking_types['shuttle'] = True
+        if 'valet' in bg:
+            parking_types['valet'] = True
     return ' | '.join(parking_types) if parking_types else 'unknown'
 
-def extract_parking_data(filepath, scrape_link):
+def parse_price(price_text):
+    """'47,00 €', '47.00 €', '1.234,50 €' or '1,234.50' -> float; None if there is no number."""
+    match = re.search(r"\d[\d.,]*", price_text)
+    if not match:
+        return None
+    number = match.group().rstrip('.,')
+    last_separator = max(number.rfind('.'), number.rfind(','))
+    # The last separator is the decimal point if one or two digits follow it, otherwise it groups thousands
+    if last_separator != -1 and len(number) - last_separator - 1 in (1, 2):
+        integer, decimals = number[:last_separator], number[last_separator + 1:]
+    else:
+        integer, decimals = number, ''
+    integer = integer.replace('.', '').replace(',', '')
+    return float(f"{integer}.{decimals}" if decimals else integer)
+
+def parse_content(content, backend=None):
+    # Same newline handling as reading the file in text mode
+    with metrics.stage("parse", bytes=len(content)):
+        html = content.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+        return parse_page(html, backend)
+
+def parse_cached(page_hash, load_content, backend=None, cache_path=None):
+    """Return the cached parse for page_hash; load_content() is only called on a cache miss."""
+    cache = get_cache(cache_path)
+    parsed = cache.get(page_hash, backend)
+    if parsed is None:
+        parsed = parse_content(load_content(), backend)
+        cache.put(page_hash, parsed, backend)
+    return parsed
+
+def read_page(filepath, backend=None, cache_path=None):
+    if str(filepath).endswith(PARSED_SUFFIX):
+        # Cards already extracted in the browser (main.py --browser-extract)
+        with open(filepath, 'r', encoding='utf-8') as file:
+            title, place, cards = json.load(file)
+        return title, place, cards
+    with open(filepath, 'rb') as file:
+        content = file.read()
+    if not cache_path:
+        return parse_content(content, backend)
+    return parse_cached(content_hash(content), lambda: content, backend, cache_path)
+
+def airport_slug_from_link(scrape_link):
     airport_slug = scrape_link.split('/')[-1].replace('parken-flughafen-', '').replace('-', ' ').title()
-    airport_slug = airport_slug.replace("Am Main", "am Main").replace("Koeln", "Köln").replace("Muenchen", "München")
-
-    with open(filepath, 'r', encoding='utf-8') as file:
-        soup = BeautifulSoup(file.read(), 'html.parser')
+    return airport_slug.replace("Am Main", "am Main").replace("Koeln", "Köln").replace("Muenchen", "München")
+
+def extract_parking_data(filepath, scrape_link, backend=None, cache_path=None):
+    airport = os.path.basename(filepath).split('_')[0]
+    with metrics.stage("extract_page", airport=airport, bytes=os.path.getsize(filepath)) as info:
+        parsed = read_page(filepath, backend, cache_path)
+        start_dt, end_dt = parse_dates_from_filename(filepath)
+        scraped_timestamp = os.path.getmtime(filepath)
+        scraped_at = datetime.fromtimestamp(scraped_timestamp).strftime('%Y-%m-%d %H:%M:%S')
+        records = build_records(parsed, scrape_link, start_dt, end_dt, scraped_at)
+        info["records"] = len(records)
+    return records
 
-    page_title = soup.title.string.strip() if soup.title else "unknown"
-    place_tag = soup.find('h2')
-    place_text = place_tag.get_text(strip=True) if place_tag else "unknown"
+def extract_stored_page(page, scrape_link, backend=None, cache_path=None):
+    with metrics.stage("extract_page", airport=page.airport) as info:
+        store = get_store(page.store_folder)
+        if cache_path:
+            parsed = parse_cached(page.content_hash, lambda: store.read_bytes(page.content_hash), backend, cache_path)
+        else:
+            parsed = parse_content(store.read_bytes(page.content_hash), backend)
+        start_dt, end_dt = parse_dates_from_filename(f"{page.from_date}→{page.to_date}")
+        records = build_records(parsed, scrape_link, start_dt, end_dt, page.saved_at)
+        info["records"] = len(records)
+    return records
 
-    parking_entries = soup.find_all('div', class_='airport_search')
-    start_dt, end_dt = parse_dates_from_filename(filepath)
-    scraped_timestamp = os.path.getmtime(filepath)
-    scraped_at = datetime.fromtimestamp(scraped_timestamp).strftime('%Y-%m-%d %H:%M:%S')
+def build_records(parsed, scrape_link, start_dt, end_dt, scraped_at):
+    airport_slug = airport_slug_from_link(scrape_link)
+    page_title, place_text, cards = parsed
 
     records = []
-    for entry in parking_entries:
+    for card in cards:
         # ✅ Check availability
-        is_unavailable = entry.find('div', class_='not_available') is not None
-        availability = "unavailable" if is_unavailable else "available"
+        availability = "available" if card["available"] else "unavailable"
 
         # ❗ Uncomment this line if you want to **exclude** unavailable ones
         # if availability == "unavailable":
         #     continue
 
-        price_tag = entry.find('div', class_='kjll')
-        if not price_tag:
+        price_text = card["price_text"]
+        if price_text is None:
             continue
-        price_text = price_tag.get_text()
-        price_match = re.findall(r"[-+]?\d[\d,\.]*", price_text)
-        if not price_match:
-            continue
-        price = price_match[0].replace('.', '').replace(',', '')
-        try:
-            price_num = float(price)
-        except ValueError:
+        price_num = parse_price(price_text)
+        if price_num is None:
             continue
+        price = f"{price_num:.2f}"
 
-        parking_type = detect_parking_type(entry.find('div', class_='iconDiv'))
-
-        slug_tag = entry.find('div', class_='logoIcon')
-        slug_img = slug_tag.find('img') if slug_tag else None
-        parking_slug = slug_img.get('alt', '').strip() if slug_img else "unknown"
+        parking_type = detect_parking_type(card["icons"])
+        parking_slug = card["slug"]
 
         duration_days = (end_dt - start_dt).days if start_dt and end_dt else 0
         duration_hours = int((end_dt - start_dt).total_seconds() // 3600) if start_dt and end_dt else 0
@@ -84,17 +155,10 @@ def extract_parking_data(filepath, scrape_link):
         price_per_day = round(price_num / duration_days, 2) if duration_days else 0
         price_per_hour = round(price_num / duration_hours, 2) if duration_hours else 0
 
-        detail_text = entry.get_text().lower()
-        parking_detail_type = 'covered' if 'überdacht' in detail_text or 'gedeckt' in detail_text else 'open'
-
-        address_tag = entry.find(string=re.compile("Adresse", re.IGNORECASE))
-        address = address_tag.find_next().get_text(strip=True) if address_tag else "unknown"
-
-        services_div = entry.find('div', class_='air_desript')
-        included_services = [li.get_text(strip=True) for li in services_div.find_all('li')] if services_div else []
-
-        book_link_tag = entry.find('a', string=re.compile("jetzt buchen", re.IGNORECASE))
-        booking_link = book_link_tag['href'] if book_link_tag else scrape_link
+        parking_detail_type = 'covered' if card["covered"] else 'open'
+        address = card["address"]
+        included_services = card["services"]
+        booking_link = card["booking_link"] or scrape_link
 
         record = {
             "Title": page_title,
@@ -121,43 +185,289 @@ def extract_parking_data(filepath, scrape_link):
         records.append((airport_slug, record))
     return records
 
-def process_file(html_file, scrape_links):
-    matched = [link for link in scrape_links if link.split("/")[-1] in html_file.name]
-    scrape_link = matched[0] if matched else f"https://dummy-link/{html_file.name}"
-    return extract_parking_data(str(html_file), scrape_link)
-
-def main():
-    if not os.path.exists(INPUT_FOLDER) or not os.path.exists(AIRPORTS_FILE):
-        print("❌ 'saved_pages' folder or 'core/airports.txt' file is missing.")
-        return
-
-    with open(AIRPORTS_FILE, 'r', encoding='utf-8') as f:
-        scrape_links = [line.strip() for line in f if line.strip()]
-
-    html_files = sorted(Path(INPUT_FOLDER).glob("*.html"))
-    if not html_files:
-        print("❌ No HTML files found in 'saved_pages'.")
+def scrape_link_for(airport, scrape_links=()):
+    """Airport URL from airports.txt, else built from the airport part of the page name
+    ('parken-flughafen-bremen'), so finished airports keep their real link."""
+    matched = [link for link in scrape_links if link.split("/")[-1] == airport]
+    return matched[0] if matched else f"{SITE_URL}/{airport}"
+
+def process_file(html_file, scrape_links, backend=None, cache_path=None):
+    if isinstance(html_file, StoredPage):
+        scrape_link = scrape_link_for(html_file.airport, scrape_links)
+        return extract_stored_page(html_file, scrape_link, backend, cache_path)
+
+    scrape_link = scrape_link_for(html_file.name.split("_")[0], scrape_links)
+    return extract_parking_data(str(html_file), scrape_link, backend, cache_path)
+
+def process_batch(items, scrape_links, backend=None, cache_path=None):
+    """Process worker entry point: extract a batch of files (or stored pages) and return compact tuples.
+
+    Returns (rows, errors) where each row is (airport_slug, values in RECORD_FIELDS order).
+    """
+    rows = []
+    errors = []
+    for item in items:
+        if isinstance(item, str):
+            item = Path(item)
+        try:
+            for airport_slug, record in process_file(item, scrape_links, backend, cache_path):
+                rows.append((airport_slug, tuple(record[field] for field in RECORD_FIELDS)))
+        except Exception as e:
+            errors.append(f"{describe_item(item)}: {e}")
+    return rows, errors
+
+def describe_item(item):
+    if isinstance(item, StoredPage):
+        return f"{item.airport}_{item.from_date}→{item.to_date}_page{item.page}"
+    return item.name
+
+THREADS = 10
+
+def iter_completed(submit, items, window):
+    """Yield the futures of submit(item) as they finish, with at most `window` submitted
+    at a time. Finished futures are dropped once yielded, so peak memory stays flat
+    however many items there are."""
+    items = iter(items)
+    pending = set()
+    for item in items:
+        pending.add(submit(item))
+        if len(pending) >= window:
+            break
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            # Refill the window before handing out the result
+            item = next(items, None)
+            if item is not None:
+                pending.add(submit(item))
+        while done:
+            yield done.pop()
+
+def iter_records(html_files, scrape_links, backend=None, processes=0, batch_size=None, cache_path=None):
+    """Yield (airport_slug, record) for every file as soon as it is parsed.
+
+    processes=0 keeps the thread pool; processes>0 parses chunked batches of files in a
+    process pool, which scales with CPU cores because parsing is pure-Python work.
+    """
+    if processes <= 0:
+        with ThreadPoolExecutor(max_workers=THREADS) as executor:
+            submit = lambda html_file: executor.submit(process_file, html_file, scrape_links, backend, cache_path)
+            for future in iter_completed(submit, html_files, THREADS * 2):
+                try:
+                    yield from future.result()
+                except Exception as e:
+                    print(f"❌ Error processing a file: {e}")
         return
 
-    data = {}
+    paths = [item if isinstance(item, StoredPage) else str(item) for item in html_files]
+    if not batch_size:
+        # A few batches per worker keeps them all busy until the end without per-file overhead
+        batch_size = max(1, min(200, -(-len(paths) // (processes * 4))))
+    batches = (paths[i:i + batch_size] for i in range(0, len(paths), batch_size))
 
-    with ThreadPoolExecutor(max_workers=10) as executor:
-        futures = {executor.submit(process_file, html_file, scrape_links): html_file for html_file in html_files}
-        for future in as_completed(futures):
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        submit = lambda batch: executor.submit(process_batch, batch, scrape_links, backend, cache_path)
+        for future in iter_completed(submit, batches, processes * 2):
             try:
-                results = future.result()
-                for airport_slug, record in results:
-                    data.setdefault(airport_slug, []).append(record)
+                rows, errors = future.result()
             except Exception as e:
-                print(f"❌ Error processing a file: {e}")
-
-    for airport in data:
-        data[airport] = sorted(data[airport], key=lambda x: x["DurationDays"], reverse=True)
+                print(f"❌ Error processing a batch: {e}")
+                continue
+            for error in errors:
+                print(f"❌ Error processing a file: {error}")
+            for airport_slug, values in rows:
+                yield airport_slug, dict(zip(RECORD_FIELDS, values))
+
+def _records_or_error(html_file, backend):
+    # Cards as parsed too: records leave out cards without a price
+    try:
+        return json.dumps([read_page(html_file, backend), process_file(html_file, [], backend)], ensure_ascii=False)
+    except Exception as e:
+        return f"error: {type(e).__name__}"
+
+def check_parity(html_files, backend, reference="bs4"):
+    """Compare the cards and records of two parser backends file by file. Returns the number of mismatches."""
+    mismatches = 0
+    for html_file in html_files:
+        expected = _records_or_error(html_file, reference)
+        actual = _records_or_error(html_file, backend)
+        if expected.startswith("error:"):
+            mismatches += 1
+            print(f"❌ {reference} failed on {html_file}: {expected}")
+        elif expected != actual:
+            mismatches += 1
+            print(f"❌ Parser mismatch ({reference} vs {backend}): {html_file}")
+    print(f"✅ {len(html_files) - mismatches}/{len(html_files)} files identical ({reference} vs {backend})")
+    return mismatches
+
+def carry_pruned_records(writer, extracted, json_path=OUTPUT_JSON):
+    """Write the previous records of combos the schedule skipped (main.py --prune) and this
+    run didn't extract, so the new parking_data.json still has them. Returns the number carried."""
+    pruned = load_pruned() - extracted
+    if not pruned or not os.path.exists(json_path):
+        return 0
+    with open(json_path, 'r', encoding='utf-8') as f:
+        previous = json.load(f)
+    carried = 0
+    for airport_slug, records in previous.items():
+        for record in records:
+            if record_combo_key(record) in pruned:
+                writer.write(airport_slug, record)
+                carried += 1
+    return carried
+
+def parse_formats(value):
+    formats = [f.strip() for f in value.split(",") if f.strip()]
+    unknown = [f for f in formats if f not in FORMATS]
+    if unknown or not formats:
+        raise argparse.ArgumentTypeError(f"unknown format {', '.join(unknown)!r}, choose from {', '.join(FORMATS)}")
+    return formats
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Extract parking offers from saved result pages into JSON.")
+    parser.add_argument("--parser", choices=sorted(BACKENDS), default=DEFAULT_BACKEND,
+                        help=f"HTML parser backend (default: {DEFAULT_BACKEND})")
+    parser.add_argument("--processes", type=int, default=None, metavar="N",
+                        help="Parse in N worker processes (0 = number of CPUs). Default: thread pool")
+    parser.add_argument("--batch-size", type=int, default=None,
+                        help="Files per process batch (default: sized from the file count)")
+    parser.add_argument("--format", type=parse_formats, default="json,text,sqlite",
+                        help="Comma-separated outputs, all written in one pass (default: json,text,sqlite). "
+                             "json: grouped parking_data.json; ndjson: one file per airport in json_out/ndjson; "
+                             "parquet: typed dataset in json_out/parquet partitioned by airport and scrape date; "
+                             f"sqlite: indexed price store with history in {DEFAULT_PRICE_STORE} (query with python -m core.price_store); "
+                             f"text: the text log {TEXT_LOG}")
+    parser.add_argument("--sort", action="store_true",
+                        help="With --format ndjson: sort each airport file by DurationDays afterwards")
+    parser.add_argument("--input", default=INPUT_FOLDER,
+                        help="Folder with saved pages, searched recursively (default: saved_pages). "
+                             "Pages outside saved_pages are not archived")
+    parser.add_argument("--store", nargs="?", const=DEFAULT_STORE_FOLDER, default=None, metavar="FOLDER",
+                        help=f"Read pages from the page store manifest instead of --input (default folder: {DEFAULT_STORE_FOLDER})")
+    parser.add_argument("--all", action="store_true",
+                        help="With --store: extract every stored page, not only those not extracted yet")
+    parser.add_argument("--cache", default=DEFAULT_CACHE_PATH,
+                        help=f"SQLite cache of parsed pages keyed by content hash (default: {DEFAULT_CACHE_PATH})")
+    parser.add_argument("--no-cache", action="store_true", help="Parse every page, don't read or write the cache")
+    parser.add_argument("--prune-cache", action="store_true",
+                        help="Only delete cache entries of older extractor versions")
+    parser.add_argument("--no-archive", action="store_true",
+                        help="Leave the pages in place instead of moving them to old_saved_pages")
+    parser.add_argument("--check-parity", metavar="FOLDER",
+                        help="Only compare --parser against bs4 on every .html file in FOLDER (recursive)")
+    parser.add_argument("--metrics", nargs="?", const=metrics.DEFAULT_METRICS_PATH, default=None, metavar="PATH",
+                        help=f"Append per-page timings to a JSONL metrics file (default: {metrics.DEFAULT_METRICS_PATH})")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.metrics:
+        metrics.configure(args.metrics)
+    if args.check_parity:
+        html_files = sorted(Path(args.check_parity).rglob("*.html"))
+        return check_parity(html_files, args.parser)
+
+    cache_path = None if args.no_cache else args.cache
+    if args.prune_cache:
+        removed = get_cache(args.cache).prune()
+        print(f"✅ Removed {removed} outdated cache entries from '{args.cache}'")
+        return
 
-    with open(OUTPUT_JSON, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    if args.store:
+        if not os.path.exists(args.store):
+            print(f"❌ '{args.store}' page store is missing.")
+            return
+        html_files = get_store(args.store).iter_pages(pending_only=not args.all)
+        if not html_files:
+            print(f"❌ No pages to extract in '{args.store}'.")
+            return
+    else:
+        if not os.path.exists(args.input):
+            print(f"❌ '{args.input}' folder is missing.")
+            return
+        html_files = sorted(path for path in Path(args.input).rglob("*")
+                            if path.suffix in (".html", PARSED_SUFFIX))
+        if not html_files:
+            print(f"❌ No HTML files found in '{args.input}'.")
+            return
+
+    # Links of airports still in airports.txt; finished airports get theirs from the page name
+    scrape_links = []
+    if os.path.exists(AIRPORTS_FILE):
+        with open(AIRPORTS_FILE, 'r', encoding='utf-8') as f:
+            scrape_links = [line.strip() for line in f if line.strip()]
+
+    processes = 0
+    if args.processes is not None:
+        processes = args.processes or os.cpu_count() or 1
+
+    # Every page is parsed once and its records go to all requested outputs.
+    # Records are streamed to the writers as each page finishes,
+    # so memory use doesn't grow with the number of pages.
+    formats = args.format
+    writers = []
+    ndjson_folder = ndjson_writer = None
+    if "json" in formats or "ndjson" in formats:
+        # The grouped JSON is built from the NDJSON files after the pass
+        ndjson_folder = NDJSON_FOLDER if "ndjson" in formats else STAGING_FOLDER
+        shutil.rmtree(ndjson_folder, ignore_errors=True)
+        ndjson_writer = NdjsonWriter(ndjson_folder)
+        writers.append(ndjson_writer)
+    if "parquet" in formats:
+        # The Parquet dataset keeps every scrape date, so it is appended to, not replaced
+        writers.append(ParquetWriter(PARQUET_FOLDER))
+    if "sqlite" in formats:
+        # Like Parquet, the price store keeps every scrape and is added to
+        writers.append(PriceStoreWriter(DEFAULT_PRICE_STORE))
+    if "text" in formats:
+        writers.append(TextLogWriter(TEXT_LOG))
+    # Only a run over the scraped pages replaces parking_data.json's view of the skipped combos
+    carry = ndjson_writer is not None and (args.store or Path(args.input).resolve() == Path(INPUT_FOLDER).resolve())
+    extracted = set()
+    carried = 0
+    writer = MultiWriter(writers)
+    with writer:
+        for airport_slug, record in iter_records(html_files, scrape_links, args.parser, processes, args.batch_size, cache_path):
+            writer.write(airport_slug, record)
+            if carry:
+                extracted.add(record_combo_key(record))
+        if carry:
+            # Into the JSON outputs only; Parquet, the price store and the text log already hold them
+            carried = carry_pruned_records(ndjson_writer, extracted)
+    if carried:
+        print(f"♻️ Carried over {carried} records of combinations the schedule skipped as unchanged")
+
+    if "ndjson" in formats:
+        if args.sort:
+            sort_ndjson_folder(NDJSON_FOLDER)
+        print(f"✅ {writer.count} records saved to '{NDJSON_FOLDER}'")
+    if "json" in formats:
+        write_grouped_json(ndjson_folder, OUTPUT_JSON)
+        if ndjson_folder == STAGING_FOLDER:
+            shutil.rmtree(ndjson_folder, ignore_errors=True)
+        print(f"✅ Data successfully saved to '{OUTPUT_JSON}'")
+    if "parquet" in formats:
+        print(f"✅ {writer.count} records saved to '{PARQUET_FOLDER}'")
+    if "sqlite" in formats:
+        print(f"✅ {writer.count} records added to '{DEFAULT_PRICE_STORE}'")
+    if "text" in formats:
+        print(f"✅ {writer.count} entries saved to '{TEXT_LOG}'")
+
+    if cache_path:
+        cache = get_cache(cache_path)
+        # Counters are per process; with --processes the workers keep their own
+        if cache.hits or cache.misses:
+            print(f"♻️ Cache: {cache.hits} pages reused, {cache.misses} parsed")
+
+    if args.store:
+        # Stored pages stay in the store; they are only flagged as extracted
+        if not args.no_archive:
+            get_store(args.store).mark_extracted(html_files)
+            print(f"📦 {len(html_files)} stored pages marked as extracted")
+        return
 
-    print(f"✅ Data successfully saved to '{OUTPUT_JSON}'")
+    if args.no_archive or Path(args.input).resolve() != Path(INPUT_FOLDER).resolve():
+        return
 
     # Move processed files
     from shutil import move
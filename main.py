@@ -1,18 +1,35 @@
 import os
+import argparse
 import datetime
 import warnings
 import contextlib
 import sys
-import undetected_chromedriver as uc
-from core.browser_controller import load_parking_results, initialize_session
-from core.airport_loader import generate_airport_list
+import socket
+import inspect
+from core.browser_controller import create_driver, enable_screenshots
+from core.airport_loader import generate_airport_list, load_date_grids, grid_for_airport
+from core.page_saver import save_pages
+from core.page_store import DEFAULT_STORE_FOLDER
+from core.worker_pool import run_worker_pool
+from core.scrape_session import ScrapeSession, report_failure
+from core.progress_journal import ProgressJournal, DEFAULT_JOURNAL_PATH, format_counts, wait_for_retry
+from core.failures import ScrapeFailure
+from core.pipeline import ExtractionPipeline, LIVE_FOLDER
+from core.coordinator import run_coordinator, run_node, CoordinatorClient, DEFAULT_ADDRESS
+from core.daemon import WarmBrowserPool, ScrapeDaemon, MAX_PAGES, MAX_RSS_MB, DEFAULT_ADDRESS as DAEMON_ADDRESS
+from core.scheduler import ComboHistory, build_schedule, save_pruned, DEFAULT_HISTORY_PATH, STABLE_RUNS
 import core.finalizer
+from core import metrics
 
-def build_target_dates():
+OUTPUT_JSON = os.path.join("json_out", "parking_data.json")
+
+def build_target_dates(start_days=5, durations=14):
+    """start_days from-dates starting tomorrow × durations (1..N days, or a list of days)."""
     target_dates = []
     today = datetime.date.today()
-    durations = range(1, 15)  # 14 durations
-    for n in range(1, 6):     # 5 from-dates
+    if isinstance(durations, int):
+        durations = range(1, durations + 1)
+    for n in range(1, start_days + 1):
         parking_from_date = today + datetime.timedelta(days=n)
         for duration in durations:
             parking_to_date = parking_from_date + datetime.timedelta(days=duration)
@@ -24,10 +41,10 @@ def build_target_dates():
             })
     return target_dates
 
-def read_airport_list(file_path):
+def read_airport_list(file_path, driver_factory=None):
     if not os.path.exists(file_path) or os.stat(file_path).st_size == 0:
         print("[⋅] Airport list is empty or missing. Generating new list...")
-        generate_airport_list(output_file=file_path)
+        generate_airport_list(output_file=file_path, driver_factory=driver_factory)
     with open(file_path, "r", encoding="utf-8") as f:
         return [line.strip() for line in f if line.strip()]
 
@@ -35,109 +52,300 @@ def update_airport_list(file_path, processed_url):
     with open(file_path, "r", encoding="utf-8") as f:
         airports = [line.strip() for line in f if line.strip()]
     updated_list = [url for url in airports if url != processed_url]
-    with open(file_path, "w", encoding="utf-8") as f:
+    # Write a temp file and swap it in, so a crash never leaves a truncated list
+    tmp_path = file_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
         for url in updated_list:
             f.write(url + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, file_path)
+
+def load_grids():
+    """date_grids of included_airports.yaml; raises ValueError on a setting build_target_dates doesn't take."""
+    return load_date_grids(allowed_keys=list(inspect.signature(build_target_dates).parameters))
+
+def schedule_combos(airport_urls, prune=False):
+    """Date grid of every airport, ordered by staleness and volatility from previous runs.
+
+    With prune, combos whose results stayed the same over the last runs are left out
+    (see core/scheduler.py); extraction then carries their previous records over.
+    """
+    date_grids = load_grids()
+    history = ComboHistory(DEFAULT_HISTORY_PATH)
+    try:
+        added = history.ingest(OUTPUT_JSON)
+        if added:
+            print(f"[⋅] Added {added} combinations from {OUTPUT_JSON} to the price history.")
+        schedule, skipped = build_schedule(
+            airport_urls, lambda url: build_target_dates(**grid_for_airport(date_grids, url)), history, prune=prune)
+    finally:
+        history.close()
+    save_pruned(skipped)
+    print(f"[⋅] Scheduled {len(schedule)} combinations"
+          + (f", skipped {len(skipped)} unchanged in the last {STABLE_RUNS} runs." if skipped else "."))
+    return schedule
+
+def open_journal(journal_path, log_file, schedule, retry_failed=False, airport_urls=None):
+    """Journal seeded with the schedule; airport_urls limits the clean-up of unscheduled
+    combos to those airports (see ProgressJournal.seed)."""
+    journal = ProgressJournal(journal_path)
+    journal.seed(schedule, airport_urls)
+    # progress.log from older versions: its combos count as done
+    journal.import_legacy_log(log_file)
+    # Combos that were in flight when the last run stopped get another try,
+    # combos that ran out of attempts only with --retry-failed
+    requeued = journal.requeue(include_failed=retry_failed)
+    if requeued:
+        print(f"[⋅] Retrying {requeued} unfinished combinations from the last run.")
+    print(f"[⋅] Progress: {format_counts(journal.counts())}")
+    return journal
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape parkinglist.de results for all airport/date combinations.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of parallel headless browser workers (default: 1, single visible browser)")
+    parser.add_argument("--headless", action="store_true", help="Run the single browser in headless mode")
+    parser.add_argument("--http", action="store_true",
+                        help="Fetch result pages over plain HTTP, using the browser only as a fallback")
+    parser.add_argument("--no-browser", action="store_true",
+                        help="Plain HTTP only (implies --http), no browser and no browser fallback; single process")
+    parser.add_argument("--page-store", nargs="?", const=DEFAULT_STORE_FOLDER, default=None, metavar="FOLDER",
+                        help=f"Save pages into the compressed page store instead of saved_pages/ (default folder: {DEFAULT_STORE_FOLDER})")
+    parser.add_argument("--reuse-page", action="store_true",
+                        help="Keep the airport page loaded and re-submit its search form for every combination")
+    parser.add_argument("--block-resources", action="store_true",
+                        help="Block images, fonts and third-party trackers in the browser")
+    parser.add_argument("--metrics", nargs="?", const=metrics.DEFAULT_METRICS_PATH, default=None, metavar="PATH",
+                        help=f"Record per-stage timings to a JSONL metrics file, workers and extraction included "
+                             f"(default: {metrics.DEFAULT_METRICS_PATH})")
+    parser.add_argument("--prune", action="store_true",
+                        help="Skip combinations whose results were identical in the last runs; "
+                             "their previous records are carried into parking_data.json")
+    parser.add_argument("--full-grid", action="store_true",
+                        help="Scrape every combination of the date grid (the default; overrides --prune)")
+    parser.add_argument("--retry-failed", action="store_true",
+                        help="Give combinations that ran out of retries in earlier runs a new set of attempts")
+    parser.add_argument("--browser-extract", action="store_true",
+                        help="Extract the result cards in the browser and save them as compact .json pages; "
+                             "HTML is only kept for a sample of pages and on failures (not with --page-store)")
+    parser.add_argument("--pipeline", action="store_true",
+                        help=f"Extract every combo in the background as soon as it is scraped, into {LIVE_FOLDER} "
+                             f"(single process only)")
+    parser.add_argument("--screenshots", action="store_true",
+                        help="Save a screenshot when a page fails to load (rate limited, see core/browser_controller.py)")
+    parser.add_argument("--coordinator", nargs="?", const=DEFAULT_ADDRESS, default=None, metavar="HOST:PORT",
+                        help=f"Hand the combinations out to --node machines over HTTP instead of scraping here "
+                             f"(default address: {DEFAULT_ADDRESS}; use 0.0.0.0:PORT to accept other machines)")
+    parser.add_argument("--node", metavar="URL",
+                        help="Scrape combinations handed out by the coordinator at URL and send it the pages")
+    parser.add_argument("--node-name", default=f"{socket.gethostname()}-{os.getpid()}",
+                        help="Name this node reports to the coordinator (default: HOST-PID)")
+    parser.add_argument("--daemon", nargs="?", const=DAEMON_ADDRESS, default=None, metavar="HOST:PORT",
+                        help=f"Keep running with --workers warm browsers, scraping every --interval hours and on "
+                             f"POST /run; GET /health shows the browsers (default address: {DAEMON_ADDRESS})")
+    parser.add_argument("--interval", type=float, default=12,
+                        help="Hours between daemon cycles; 0 runs only the first cycle and posted jobs (default: 12)")
+    parser.add_argument("--recycle-pages", type=int, default=MAX_PAGES,
+                        help=f"Replace a daemon browser after this many result pages (default: {MAX_PAGES})")
+    parser.add_argument("--recycle-rss", type=int, default=MAX_RSS_MB, metavar="MB",
+                        help=f"Replace a daemon browser when Chrome uses more memory (default: {MAX_RSS_MB})")
+    return parser.parse_args(argv)
+
+def extract_args(args):
+    """Arguments for the extract_parking_data run started by the finalizer."""
+    return ["--store", args.page_store] if args.page_store else []
 
-def load_progress(log_file):
-    if not os.path.exists(log_file):
-        return set()
-    with open(log_file, "r", encoding="utf-8") as f:
-        return set(line.strip() for line in f if line.strip())
+def scrape_claimable(journal, session, pipeline, store_folder=None, airport_url=None):
+    """Scrape combos (of one airport, or any) until none can be claimed right now;
+    retries that aren't due yet are left for later."""
+    while True:
+        unit = journal.claim("main", airport_url)
+        if unit is None:
+            return
+        combo_airport, combo = unit
+        try:
+            pages, url = session.scrape(combo_airport, combo)
+        except ScrapeFailure as e:
+            report_failure(journal, combo_airport, combo, e)
+            continue
 
-def append_to_log(log_file, line):
-    with open(log_file, "a", encoding="utf-8") as f:
-        f.write(line + "\n")
+        save_pages(pages, url, combo, store_folder=store_folder)
+        journal.mark_done(combo_airport, combo)
+        if pipeline is not None:
+            pipeline.submit(pages, combo_airport, combo)
+
+def finish_airport(journal, airport_file, airport_url):
+    update_airport_list(airport_file, airport_url)
+    given_up = journal.counts(airport_url).get("failed", 0)
+    if given_up:
+        print(f"[!] Gave up on {given_up} combinations for: {airport_url} (--retry-failed retries them)")
+    print(f"[✓] All combinations done for: {airport_url}")
+
+def report_airports(journal, airport_urls, airport_file):
+    """After workers or nodes did the scraping: drop completed airports from the list."""
+    for airport_url in airport_urls:
+        if journal.is_complete(airport_url):
+            update_airport_list(airport_file, airport_url)
+            print(f"[✓] All combinations done for: {airport_url}")
+        else:
+            print(f"[!] Partial progress saved for: {airport_url} ({format_counts(journal.counts(airport_url))})")
+
+def daemon_cycle(args, pool, airport_file, airports=None):
+    """One scrape cycle of the daemon: the airport list, schedule and journal as in a
+    normal run, the scraping with the pool's warm browsers, then the finalizer."""
+    catalogue_drivers = []
+
+    def catalogue_driver():
+        catalogue_drivers.append(create_driver(headless=True, block_resources=args.block_resources))
+        return catalogue_drivers[-1]
+
+    try:
+        airport_urls = read_airport_list(airport_file, catalogue_driver)
+    finally:
+        for driver in catalogue_drivers:
+            driver.quit()
+    if airports:
+        airport_urls = [url for url in airport_urls if any(name in url for name in airports)]
+    if not airport_urls:
+        print("[✓] No airports to scrape in this cycle.")
+        return
 
-def main():
+    if pool.warm_url is None:
+        pool.start(airport_urls[0])
+    schedule = schedule_combos(airport_urls, prune=args.prune and not args.full_grid)
+    # A cycle limited to some airports must not drop the unfinished combos of the others
+    journal = open_journal(DEFAULT_JOURNAL_PATH, "progress.log", schedule, retry_failed=args.retry_failed,
+                           airport_urls=airport_urls if airports else None)
+    try:
+        pool.drain(DEFAULT_JOURNAL_PATH, store_folder=args.page_store, reuse_page=args.reuse_page,
+                   extract_in_browser=args.browser_extract)
+        report_airports(journal, airport_urls, airport_file)
+    finally:
+        journal.close()
+    core.finalizer.finalize_progress(airport_file, extract_args=extract_args(args))
+
+def main(args=None):
+    args = args or parse_args()
+    if args.metrics:
+        metrics.configure(args.metrics)
+    if args.node:
+        # The coordinator owns the airport list, the journal and the saved pages
+        if args.screenshots:
+            enable_screenshots()
+        run_node(CoordinatorClient(args.node), args.node_name, headless=args.headless,
+                 use_http=args.http, no_browser=args.no_browser, reuse_page=args.reuse_page,
+                 block_resources=args.block_resources, extract_in_browser=args.browser_extract)
+        return
     airport_file = os.path.join("core", "airports.txt")
     log_file = "progress.log"
+    load_grids()   # A bad date_grids setting fails here, before any browser is started
 
-    airport_urls = read_airport_list(airport_file)
-    target_dates = build_target_dates()
-    progress_set = load_progress(log_file)
+    if args.daemon:
+        if args.screenshots:
+            enable_screenshots()
+        if args.browser_extract and args.page_store:
+            print("[!] The page store holds HTML only, ignoring --browser-extract.")
+            args.browser_extract = False
+        pool = WarmBrowserPool(max(args.workers, 1), headless=args.headless or args.workers > 1,
+                               block_resources=args.block_resources, use_http=args.http,
+                               max_pages=args.recycle_pages, max_rss_mb=args.recycle_rss)
+        ScrapeDaemon(pool, lambda airports: daemon_cycle(args, pool, airport_file, airports),
+                     interval_hours=args.interval, address=args.daemon).run()
+        return
 
+    # Only needed when the airport dropdown isn't in the plain HTML; the browser is then kept for scraping
+    catalogue_drivers = []
+
+    def catalogue_driver():
+        catalogue_drivers.append(create_driver(headless=args.headless, block_resources=args.block_resources))
+        return catalogue_drivers[-1]
+
+    airport_urls = read_airport_list(airport_file, None if args.no_browser else catalogue_driver)
+    driver = catalogue_drivers[0] if catalogue_drivers else None
+
+    if not airport_urls or args.workers > 1 or args.coordinator:
+        if driver is not None:
+            driver.quit()
+            driver = None
     if not airport_urls:
         print("[✓] All airports processed. Nothing to do.")
         return
 
-    # Launch browser
-    options = uc.ChromeOptions()
-    # Maximized window (for better element rendering)
-    options.add_argument("--start-maximized")
-    # Optional: enable headless mode (runs browser in background, no GUI)
-    # Uncomment the next line to run in headless (hidden) mode:
-    # options.add_argument("--headless=new")  # Use "new" for better stability
-
-    # Performance and compatibility flags
-    options.add_argument("--disable-gpu")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--window-size=1920,1080")
-    options.add_argument("--disable-blink-features=AutomationControlled")
-    # Start the Chrome driver
-
-    driver = uc.Chrome(options=options, use_subprocess=True)
+    if args.screenshots:
+        enable_screenshots()
+    if args.browser_extract and args.page_store:
+        print("[!] The page store holds HTML only, ignoring --browser-extract.")
+        args.browser_extract = False
 
+    schedule = schedule_combos(airport_urls, prune=args.prune and not args.full_grid)
+    journal = open_journal(DEFAULT_JOURNAL_PATH, log_file, schedule, retry_failed=args.retry_failed)
+
+    if args.coordinator:
+        run_coordinator(DEFAULT_JOURNAL_PATH, args.coordinator, store_folder=args.page_store)
+        report_airports(journal, airport_urls, airport_file)
+        return
+    if args.workers > 1 and args.no_browser:
+        print("[!] --no-browser runs in a single process, ignoring --workers.")
+    elif args.workers > 1:
+        if args.pipeline:
+            print("[!] --pipeline runs in a single process, ignoring it with --workers.")
+        run_worker_pool(DEFAULT_JOURNAL_PATH, args.workers, use_http=args.http, store_folder=args.page_store,
+                        reuse_page=args.reuse_page, block_resources=args.block_resources,
+                        screenshots=args.screenshots, extract_in_browser=args.browser_extract)
+        report_airports(journal, airport_urls, airport_file)
+        return
+
+    # Background extraction of every scraped combo (--pipeline)
+    pipeline = ExtractionPipeline().start() if args.pipeline else None
+
+    # Launch browser
+    session = ScrapeSession(headless=args.headless, block_resources=args.block_resources, use_http=args.http,
+                            no_browser=args.no_browser, reuse_page=args.reuse_page,
+                            extract_in_browser=args.browser_extract, driver=driver)
     try:
-        print(f"[⋅] Initializing session on: {airport_urls[0]}")
-        driver.get(airport_urls[0])
-        initialize_session(driver)
+        session.start(airport_urls[0])
 
+        deferred = []
         for airport_url in airport_urls:
             print(f"\n[→] Starting airport: {airport_url}")
-            completed_combos = 0
-
-            for combo in target_dates:
-                combo_key = f"{airport_url}|{combo['from_raw']}|{combo['to_raw']}"
-                if combo_key in progress_set:
-                    print(f"[⏩] Skipping already processed: {combo_key}")
-                    completed_combos += 1
-                    continue
-
-                print(f"[⋅] Processing: {combo['from']} → {combo['to']}")
-
-                pages, url = load_parking_results(
-                    airport_url,
-                    driver,
-                    combo["from"],
-                    combo["to"]
-                )
-
-                if pages:
-                    os.makedirs("saved_pages", exist_ok=True)
-                    name = url.split("/")[-1]
-                    for page_number, html in pages:
-                        suffix = f"_page{page_number}" if page_number > 1 else ""
-                        filename = f"{name}_{combo['from_raw']}→{combo['to_raw']}{suffix}.html"
-                        output_file = os.path.join("saved_pages", filename)
-
-                        with open(output_file, "w", encoding="utf-8") as f:
-                            f.write(html)
-                        print(f"[✓] Saved: {output_file}")
-
-                    append_to_log(log_file, combo_key)
-                    progress_set.add(combo_key)
-                    completed_combos += 1
-                else:
-                    print(f"[!] No results for {combo_key}")
-
-            if completed_combos == len(target_dates):
-                update_airport_list(airport_file, airport_url)
-                print(f"[✓] All combinations done for: {airport_url}")
+            done = journal.counts(airport_url).get("done", 0)
+            if done:
+                print(f"[⏩] Skipping {done} already processed combinations")
+
+            scrape_claimable(journal, session, pipeline, args.page_store, airport_url)
+            if journal.is_complete(airport_url):
+                finish_airport(journal, airport_file, airport_url)
             else:
-                print(f"[!] Partial progress saved for: {airport_url}")
+                # Don't sit out its backoff while other airports have work
+                waiting = journal.counts(airport_url).get("pending", 0)
+                print(f"[⋅] {waiting} combinations wait for a retry, coming back to them after the other airports.")
+                deferred.append(airport_url)
+
+        # Only sleep once no airport has a claimable combination left
+        while deferred and wait_for_retry(journal):
+            scrape_claimable(journal, session, pipeline, args.page_store)
+            for airport_url in [url for url in deferred if journal.is_complete(url)]:
+                finish_airport(journal, airport_file, airport_url)
+                deferred.remove(airport_url)
+        for airport_url in deferred:
+            print(f"[!] Partial progress saved for: {airport_url}")
 
     finally:
-        driver.quit()
+        session.quit()
+        if pipeline is not None:
+            pipeline.close()
 
 if __name__ == "__main__":
+    args = parse_args()
     try:
-        main()
+        main(args)
     except Exception as e:
         print(f"❌ Unexpected error: {e}")
     else:
-        import core.finalizer
-        core.finalizer.finalize_progress()
+        # Nodes only scrape, the coordinator's machine runs the extraction; the daemon runs it every cycle
+        if not args.node and not args.daemon:
+            import core.finalizer
+            core.finalizer.finalize_progress(extract_args=extract_args(args))
 
     print("✅ Program ended successfully (Chrome was closed).")
@@ -0,0 +1,190 @@
+import os
+import json
+import argparse
+from datetime import datetime
+from core.scheduler import airport_key
+
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError:  # Analytics are optional, scraping and extraction don't need pandas
+    pd = None
+
+INPUT_JSON = os.path.join('json_out', 'parking_data.json')
+OUTPUT_FOLDER = os.path.join('json_out', 'analytics')
+SNAPSHOT_FOLDER = os.path.join(OUTPUT_FOLDER, 'snapshots')
+
+# Record fields used by the analytics; everything else is dropped on load
+COLUMNS = ["ScrapeLink", "ParkingSlug", "ParkingFromDt", "ParkingToDt", "Price", "Availability",
+           "ParkingType", "ParkingDetailType", "ScrapedAt"]
+OFFER_KEY = ["airport", "provider", "from_date", "to_date"]
+COMBO_KEY = ["airport", "from_date", "to_date"]
+
+def _read_source(path):
+    """Raw records from parking_data.json, an NDJSON folder or a Parquet dataset folder."""
+    if os.path.isfile(path):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return pd.DataFrame.from_records([record for records in data.values() for record in records], columns=COLUMNS)
+    ndjson_files = sorted(name for name in os.listdir(path) if name.endswith(".ndjson"))
+    if ndjson_files:
+        return pd.concat([pd.read_json(os.path.join(path, name), lines=True, dtype=False)[COLUMNS]
+                          for name in ndjson_files], ignore_index=True)
+    # Parquet dataset written by --format parquet (needs pyarrow)
+    return pd.read_parquet(path, columns=COLUMNS)
+
+def load_offers(path=INPUT_JSON):
+    """One row per offer with typed columns; the derived values are computed once, column-wise."""
+    raw = _read_source(path)
+    links = raw["ScrapeLink"].astype(str)
+    df = pd.DataFrame({
+        # airport_key only runs once per distinct link
+        "airport": links.map({link: airport_key(link) for link in links.unique()}).astype("category"),
+        "provider": raw["ParkingSlug"].astype("category"),
+        "from_dt": pd.to_datetime(raw["ParkingFromDt"]),
+        "to_dt": pd.to_datetime(raw["ParkingToDt"]),
+        "price": pd.to_numeric(raw["Price"], errors="coerce"),
+        "available": raw["Availability"].to_numpy() == "available",
+        "parking_type": raw["ParkingType"].astype("category"),
+        "detail_type": raw["ParkingDetailType"].astype("category"),
+        "scraped_at": pd.to_datetime(raw["ScrapedAt"]),
+    })
+    df = df[df["price"].notna()]
+    df["from_date"] = df["from_dt"].dt.normalize()
+    df["to_date"] = df["to_dt"].dt.normalize()
+    df["duration_days"] = (df["to_dt"] - df["from_dt"]).dt.days
+    hours = (df["to_dt"] - df["from_dt"]).dt.total_seconds() // 3600
+    # Same convention as extraction: 0 for zero-length stays
+    df["price_per_day"] = (df["price"] / df["duration_days"].where(df["duration_days"] > 0)).fillna(0.0)
+    df["price_per_hour"] = (df["price"] / hours.where(hours > 0)).fillna(0.0)
+    return df.reset_index(drop=True)
+
+def price_curves(df):
+    """Price by duration per airport and provider: the curve a traveller sees when staying longer."""
+    available = df[df["available"]]
+    curves = available.groupby(["airport", "provider", "duration_days"], observed=True).agg(
+        offers=("price", "size"),
+        min_price=("price", "min"),
+        median_price=("price", "median"),
+        max_price=("price", "max"),
+        median_per_day=("price_per_day", "median"),
+    )
+    return curves.round(2).reset_index()
+
+def cheapest_per_combo(df):
+    """Cheapest available provider of every (airport, from, to) combo, with the runner-up's price."""
+    available = df[df["available"]].sort_values(COMBO_KEY + ["price"], kind="stable")
+    groups = available.groupby(COMBO_KEY, observed=True)
+    rank = groups.cumcount().to_numpy()
+    result = available[rank == 0].set_index(COMBO_KEY)[["provider", "price", "price_per_day", "duration_days"]]
+    result["runner_up_price"] = available[rank == 1].set_index(COMBO_KEY)["price"]
+    result["offers"] = groups.size()
+    result["median_price"] = groups["price"].median()
+    return result.round(2).reset_index()
+
+def airport_summary(df):
+    """One row per airport: offers, providers, combos and price levels."""
+    grouped = df.groupby("airport", observed=True)
+    available = df[df["available"]].groupby("airport", observed=True)
+    summary = pd.DataFrame({
+        "offers": grouped.size(),
+        "available_share": grouped["available"].mean().round(3),
+        "providers": grouped["provider"].nunique(),
+        "combos": df.drop_duplicates(COMBO_KEY).groupby("airport", observed=True).size(),
+        "min_per_day": available["price_per_day"].min(),
+        "median_per_day": available["price_per_day"].median(),
+        "max_per_day": available["price_per_day"].max(),
+    }).round(2)
+    summary["last_scraped"] = grouped["scraped_at"].max()
+    return summary.reset_index()
+
+def snapshot(df):
+    """The compact per-offer table that the next run compares against."""
+    return (df[OFFER_KEY + ["price", "available", "scraped_at"]]
+            .sort_values(OFFER_KEY + ["price"], kind="stable")
+            .drop_duplicates(OFFER_KEY))
+
+def price_deltas(current, previous):
+    """Offer price changes between two snapshots. status is changed, unchanged, new or gone."""
+    merged = current.merge(previous, on=OFFER_KEY, how="outer", suffixes=("", "_previous"), indicator=True)
+    merged["delta"] = merged["price"] - merged["price_previous"]
+    merged["delta_pct"] = (merged["delta"] / merged["price_previous"] * 100).round(2)
+    merged["status"] = np.select(
+        [merged["_merge"] == "left_only", merged["_merge"] == "right_only", merged["delta"].abs() > 0.005],
+        ["new", "gone", "changed"], "unchanged")
+    merged["abs_delta"] = merged["delta"].abs()
+    merged = merged.sort_values(["airport", "abs_delta"], ascending=[True, False], kind="stable")
+    columns = OFFER_KEY + ["price_previous", "price", "delta", "delta_pct", "status"]
+    return merged[columns].reset_index(drop=True)
+
+def _snapshot_path(scrape_day, folder=SNAPSHOT_FOLDER):
+    return os.path.join(folder, f"offers_{scrape_day}.csv.gz")
+
+def previous_snapshot(scrape_day, folder=SNAPSHOT_FOLDER):
+    """The latest snapshot from a scrape day before scrape_day, or None."""
+    if not os.path.isdir(folder):
+        return None, None
+    days = sorted(name[len("offers_"):-len(".csv.gz")] for name in os.listdir(folder)
+                  if name.startswith("offers_") and name.endswith(".csv.gz"))
+    days = [day for day in days if day < scrape_day]
+    if not days:
+        return None, None
+    previous = pd.read_csv(_snapshot_path(days[-1], folder), parse_dates=["from_date", "to_date", "scraped_at"])
+    return previous, days[-1]
+
+def write_table(table, name, folder=OUTPUT_FOLDER):
+    path = os.path.join(folder, f"{name}.csv")
+    table.to_csv(path, index=False)
+    print(f"[✓] {len(table)} rows → {path}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Summary tables of the extracted parking prices.")
+    parser.add_argument("--input", default=INPUT_JSON,
+                        help=f"parking_data.json, an NDJSON folder or a Parquet dataset folder (default: {INPUT_JSON})")
+    parser.add_argument("--output", default=OUTPUT_FOLDER, help=f"Folder for the CSV tables (default: {OUTPUT_FOLDER})")
+    parser.add_argument("--no-snapshot", action="store_true",
+                        help="Don't save this run's offers for the next run's price deltas")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if pd is None:
+        print("❌ price_analytics.py needs pandas: pip install pandas")
+        return
+    if not os.path.exists(args.input):
+        print(f"❌ '{args.input}' is missing. Run extract_parking_data.py first.")
+        return
+
+    start = datetime.now()
+    df = load_offers(args.input)
+    if df.empty:
+        print(f"❌ No records in '{args.input}'.")
+        return
+    print(f"[⋅] {len(df)} offers, {df['airport'].nunique()} airports, {df['provider'].nunique()} providers")
+
+    os.makedirs(args.output, exist_ok=True)
+    write_table(airport_summary(df), "airport_summary", args.output)
+    write_table(price_curves(df), "price_curves", args.output)
+    write_table(cheapest_per_combo(df), "cheapest_per_combo", args.output)
+
+    current = snapshot(df)
+    scrape_day = df["scraped_at"].max().strftime("%Y-%m-%d")
+    snapshot_folder = os.path.join(args.output, "snapshots")
+    previous, previous_day = previous_snapshot(scrape_day, snapshot_folder)
+    if previous is not None:
+        deltas = price_deltas(current, previous)
+        write_table(deltas, "price_deltas", args.output)
+        counts = deltas["status"].value_counts()
+        print(f"[⋅] Compared with {previous_day}: " + ", ".join(
+            f"{counts.get(status, 0)} {status}" for status in ("changed", "unchanged", "new", "gone")))
+    else:
+        print("[⋅] No earlier snapshot, price deltas start with the next run.")
+
+    if not args.no_snapshot:
+        os.makedirs(snapshot_folder, exist_ok=True)
+        current.to_csv(_snapshot_path(scrape_day, snapshot_folder), index=False)
+
+    print(f"✅ Analytics written to '{args.output}' in {(datetime.now() - start).total_seconds():.2f}s")
+
+if __name__ == "__main__":
+    main()